@@ -0,0 +1,70 @@
+"""Benchmark: pd.read_csv x cache binário (cache_csv.py) sobre os CSVs de data/.
+
+Para cada arquivo mede a melhor de N leituras com pd.read_csv, a conversão
+(primeira leitura, feita uma vez por conteúdo) e as leituras seguintes pelo
+cache (DataFrame com tipos do read_csv e, com --categorias, com as colunas de
+dicionário como Categorical), conferindo que o resultado é igual ao do read_csv.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_cache_csv.py [--repeticoes 5] [--categorias] [arquivo.csv ...]
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import cache_csv
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def melhor_tempo(funcao, repeticoes):
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return resultado, melhor
+
+
+def _comparavel(df):
+    # read_csv usa NaN e o Arrow, None, para textos ausentes
+    return df.astype(object).where(df.notna(), None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("arquivos", nargs="*")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--categorias", action="store_true", help="Mede também a leitura com Categorical")
+    args = parser.parse_args()
+
+    arquivos = args.arquivos or [os.path.join(DATA_DIR, nome) for nome in sorted(os.listdir(DATA_DIR))
+                                 if nome.endswith(".csv")]
+    # Cache em pasta temporária: a conversão medida é sempre a primeira
+    cache_csv.CACHE_DIR = os.path.join(DATA_DIR, ".cache_bench")
+    shutil.rmtree(cache_csv.CACHE_DIR, ignore_errors=True)
+
+    try:
+        for arquivo in arquivos:
+            referencia, t_csv = melhor_tempo(lambda: pd.read_csv(arquivo), args.repeticoes)
+            _, t_conversao = melhor_tempo(lambda: cache_csv.ler_csv(arquivo), 1)
+            df, t_cache = melhor_tempo(lambda: cache_csv.ler_csv(arquivo), args.repeticoes)
+            pd.testing.assert_frame_equal(_comparavel(df), _comparavel(referencia))
+
+            print(f"📄 {os.path.basename(arquivo)} ({len(referencia):,} linhas, "
+                  f"{os.path.getsize(arquivo) / 1024 / 1024:.1f} MB)")
+            print(f"   read_csv        : {t_csv * 1000:8.1f} ms")
+            print(f"   conversão (1ª)  : {t_conversao * 1000:8.1f} ms")
+            print(f"   cache           : {t_cache * 1000:8.1f} ms ({t_csv / t_cache:.1f}x) ✅ igual ao read_csv")
+            if args.categorias:
+                _, t_categorias = melhor_tempo(lambda: cache_csv.ler_csv(arquivo, categorias=True), args.repeticoes)
+                print(f"   cache (Categorical): {t_categorias * 1000:5.1f} ms ({t_csv / t_categorias:.1f}x)")
+    finally:
+        shutil.rmtree(cache_csv.CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,60 @@
+"""Benchmark: escalabilidade da transformação do ETL com TransformadorParalelo.
+
+Não precisa do MongoDB: gera um DataFrame sintético no formato de performance
+(Homework_Completion_% como texto "85%", o caminho mais caro de transformar) e
+mede o tempo com 1, 2, 4... workers, conferindo que o resultado é idêntico ao
+sequencial.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_etl_paralelo.py [--linhas 2000000] [--workers 1,2,4,8] [--por student|subject]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from etl_pandas import criar_transformador, transformar
+
+
+def gerar_performance(n, seed=42):
+    rng = np.random.default_rng(seed)
+    materias = np.array(["Math", "Science", "History", "English", "Arabic", "Geography"])
+    return pd.DataFrame({
+        "Student_ID": pd.Series(rng.integers(1, 12000, n)).map("S{:05d}".format),
+        "Subject": materias[rng.integers(0, len(materias), n)],
+        "Exam_Score": rng.integers(0, 101, n),
+        "Homework_Completion_%": pd.Series(rng.integers(0, 101, n)).map("{}%".format),
+        "Teacher_Comments": np.where(rng.random(n) < 0.5, "Good progress", "Needs improvement"),
+    })
+
+
+def medir(df, workers, por):
+    transformador = criar_transformador(workers, por)
+    with transformador:
+        inicio = time.perf_counter()
+        resultado = (transformar(df.copy(), avisar=False) if workers <= 1
+                     else transformador.aplicar(df.copy()))
+        return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=2_000_000)
+    parser.add_argument("--workers", default="1,2,4,8", help="Quantidades de workers separadas por vírgula")
+    parser.add_argument("--por", choices=["student", "subject"], default="student")
+    args = parser.parse_args()
+
+    df = gerar_performance(args.linhas)
+    print(f"📦 {len(df):,} linhas, {os.cpu_count()} CPUs, partições por {args.por}")
+
+    referencia, base = medir(df, 1, args.por)
+    print(f"   1 worker : {base:7.2f}s (referência)")
+    for workers in [int(w) for w in args.workers.split(",") if int(w) > 1]:
+        resultado, duracao = medir(df, workers, args.por)
+        pd.testing.assert_frame_equal(resultado, referencia)
+        print(f"   {workers} workers: {duracao:7.2f}s ({base / duracao:.2f}x) ✅ idêntico ao sequencial")
@@ -0,0 +1,81 @@
+"""Benchmark: serialização padrão do FastAPI vs RespostaJSON (orjson) e bytes comprimidos.
+
+Não precisa do MongoDB: usa documentos sintéticos com o formato das coleções.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_respostas.py [--repeticoes 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from respostas import brotli, dumps, orjson
+
+
+def gerar_attendance(n):
+    inicio = datetime(2024, 9, 1)
+    materias = ["Math", "Science", "History", "English", "Arabic", "Geography"]
+    return [{
+        "Student_ID": f"S{random.randint(1, 12000):05d}",
+        "Subject": random.choice(materias),
+        "Date": inicio + timedelta(days=random.randint(0, 180)),
+        "Attendance_Status": random.choice(["Present", "Absent"]),
+    } for _ in range(n)]
+
+
+def gerar_students(n):
+    return [{
+        "Student_ID": f"S{i:05d}",
+        "Full_Name": f"Aluno {i}",
+        "Emergency_Contact": f"+1-555-{random.randint(0, 9999):04d}",
+    } for i in range(1, n + 1)]
+
+
+def serializar_padrao(docs):
+    # Equivalente ao caminho padrão: jsonable_encoder + JSONResponse.render
+    return json.dumps(jsonable_encoder(docs), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def cpu_por_requisicao(funcao, docs, repeticoes):
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        funcao(docs)
+    return (time.process_time() - inicio) / repeticoes * 1000
+
+
+def medir(nome, docs, repeticoes):
+    padrao_ms = cpu_por_requisicao(serializar_padrao, docs, repeticoes)
+    rapido_ms = cpu_por_requisicao(dumps, docs, repeticoes)
+    corpo = dumps(docs)
+    gz = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    tamanho_gzip = len(gz.compress(corpo) + gz.flush())
+    tamanho_br = len(brotli.compress(corpo, quality=4)) if brotli else None
+
+    print(f"\n📦 {nome} ({len(docs)} documentos)")
+    print(f"   CPU padrão (jsonable_encoder + json): {padrao_ms:8.2f} ms/req")
+    print(f"   CPU RespostaJSON ({'orjson' if orjson else 'json'}):      {rapido_ms:8.2f} ms/req "
+          f"({padrao_ms / rapido_ms if rapido_ms else float('inf'):.1f}x)")
+    print(f"   Bytes sem compressão: {len(corpo):>10,}")
+    print(f"   Bytes gzip:           {tamanho_gzip:>10,} ({tamanho_gzip / len(corpo):.0%})")
+    if tamanho_br is not None:
+        print(f"   Bytes brotli:         {tamanho_br:>10,} ({tamanho_br / len(corpo):.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    medir("/attendance (página de 500)", gerar_attendance(500), args.repeticoes)
+    medir("/students (coleção inteira)", gerar_students(12156), max(1, args.repeticoes // 10))
@@ -0,0 +1,73 @@
+"""Busca textual em Teacher_Comments (performance) e Message_Content (comunicações).
+
+Cada campo tem um índice de texto (indexes.py): o MongoDB guarda os termos já
+normalizados (minúsculas, sem stop words, com stemming em inglês) apontando
+para os documentos, então a busca não varre a coleção como um $regex faria.
+Os resultados vêm por relevância (textScore) e os filtros de disciplina/data
+são aplicados sobre os documentos que casaram com os termos.
+
+A paginação é por posição: next_cursor codifica quantos resultados já foram
+entregues. O índice de texto não permite continuar a partir de um score como
+o keyset em _id, e o MongoDB já precisa pontuar todos os documentos que
+casaram para ordenar; por isso a profundidade é limitada a SEARCH_MAX_RESULTS.
+"""
+import base64
+import binascii
+import os
+
+from fastapi import HTTPException
+
+from indexes import IDIOMA_TEXTO
+
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+# fonte -> (coleção, campo de texto, campos devolvidos)
+FONTES = {
+    "comments": ("performance", "Teacher_Comments", ["Student_ID", "Subject", "Exam_Score"]),
+    "communications": ("teacher_parent_communication", "Message_Content",
+                       ["Student_ID", "Date", "Message_Type"]),
+}
+
+
+def codificar_posicao(posicao):
+    return base64.urlsafe_b64encode(str(posicao).encode()).decode().rstrip("=")
+
+
+def decodificar_posicao(token):
+    try:
+        posicao = int(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if posicao < 0:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return posicao
+
+
+def filtro_texto(termos, **filtros):
+    """$text com os termos (aspas = frase exata, -termo = exclusão) e os demais filtros"""
+    return {"$text": {"$search": termos, "$language": IDIOMA_TEXTO}, **filtros}
+
+
+async def buscar(db, fonte, termos, filtros, page_size, after=None):
+    """Uma página de resultados por relevância: {"items": [...], "next_cursor": ...}"""
+    collection_name, campo, campos = FONTES[fonte]
+    inicio = decodificar_posicao(after) if after else 0
+    # Não passa do limite de profundidade, nem no tamanho da última página
+    quantidade = min(page_size, SEARCH_MAX_RESULTS - inicio)
+    if quantidade <= 0:
+        return {"items": [], "next_cursor": None}
+
+    projecao = {"_id": 0, campo: 1, **dict.fromkeys(campos, 1), "score": {"$meta": "textScore"}}
+    # _id desempata scores iguais: a ordem entre páginas é estável
+    cursor = (db[collection_name].find(filtro_texto(termos, **filtros), projecao)
+              .sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+              .skip(inicio)
+              .limit(quantidade + 1))
+    docs = await cursor.to_list(length=quantidade + 1)
+
+    items = docs[:quantidade]
+    for doc in items:
+        doc["score"] = round(doc["score"], 4)
+    fim = inicio + len(items)
+    proxima = len(docs) > quantidade and fim < SEARCH_MAX_RESULTS
+    return {"items": items, "next_cursor": codificar_posicao(fim) if proxima else None}
@@ -0,0 +1,129 @@
+"""Cache de respostas da API com TTL por endpoint, ETag e invalidação por coleção.
+
+A chave combina caminho + parâmetros normalizados + versão de cada coleção
+da qual o endpoint depende (ver invalidacao.py). Quando a ingestão ou o ETL
+grava uma coleção a versão muda e as entradas antigas deixam de ser usadas.
+
+Backends:
+    CACHE_BACKEND=memoria  LRU no processo, limitado por CACHE_MAX_ITENS (padrão)
+    CACHE_BACKEND=redis    servidor compatível com Redis em REDIS_URL (pacote `redis`)
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict, namedtuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+Politica = namedtuple("Politica", ["ttl", "colecoes"])
+Entrada = namedtuple("Entrada", ["body", "etag", "media_type"])
+
+
+class BackendLRU:
+    """LRU em memória com expiração por entrada"""
+
+    def __init__(self, max_itens=1024):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+
+    async def get(self, chave):
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        expira_em, entrada = item
+        if expira_em < time.monotonic():
+            del self._itens[chave]
+            return None
+        self._itens.move_to_end(chave)
+        return entrada
+
+    async def set(self, chave, entrada, ttl):
+        self._itens[chave] = (time.monotonic() + ttl, entrada)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    async def limpar(self):
+        self._itens.clear()
+
+
+class BackendRedis:
+    """Servidor compatível com Redis; o TTL fica a cargo do próprio servidor"""
+
+    def __init__(self, url):
+        import redis.asyncio as redis  # dependência opcional
+        self._redis = redis.from_url(url)
+
+    async def get(self, chave):
+        bruto = await self._redis.get(f"api-cache:{chave}")
+        if bruto is None:
+            return None
+        etag, media_type, body = bruto.split(b"\n", 2)
+        return Entrada(body, etag.decode(), media_type.decode())
+
+    async def set(self, chave, entrada, ttl):
+        bruto = f"{entrada.etag}\n{entrada.media_type}\n".encode() + entrada.body
+        await self._redis.set(f"api-cache:{chave}", bruto, ex=ttl)
+
+    async def limpar(self):
+        async for chave in self._redis.scan_iter("api-cache:*"):
+            await self._redis.delete(chave)
+
+
+def criar_backend():
+    if os.getenv("CACHE_BACKEND", "memoria") == "redis":
+        return BackendRedis(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return BackendLRU(int(os.getenv("CACHE_MAX_ITENS", "1024")))
+
+
+def _sem_fraco(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _confere(etag, if_none_match):
+    """Comparação fraca do If-None-Match (RFC 9110): ignora o prefixo W/"""
+    if if_none_match.strip() == "*":
+        return True
+    return _sem_fraco(etag) in {_sem_fraco(t.strip()) for t in if_none_match.split(",")}
+
+
+class CacheMiddleware(BaseHTTPMiddleware):
+    """Serve GETs cacheáveis do backend e responde 304 quando o ETag confere"""
+
+    def __init__(self, app, politicas, backend, monitor):
+        super().__init__(app)
+        self.politicas = politicas
+        self.backend = backend
+        self.monitor = monitor
+
+    def _chave(self, request, politica):
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+        versoes = [(c, self.monitor.versao(c)) for c in politica.colecoes]
+        bruto = repr((request.url.path, params, versoes)).encode()
+        return hashlib.blake2b(bruto, digest_size=16).hexdigest()
+
+    async def dispatch(self, request, call_next):
+        politica = self.politicas.get(request.url.path)
+        if (request.method != "GET" or politica is None
+                or request.query_params.get("formato") == "ndjson"):
+            return await call_next(request)
+
+        chave = self._chave(request, politica)
+        entrada = await self.backend.get(chave)
+        status_cache = "HIT"
+        if entrada is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([parte async for parte in response.body_iterator])
+            # Fraco: o CompressaoMiddleware pode entregar o mesmo corpo em br/gzip ou sem compressão
+            etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            entrada = Entrada(body, etag, response.headers.get("content-type", "application/json"))
+            await self.backend.set(chave, entrada, politica.ttl)
+            status_cache = "MISS"
+
+        headers = {"ETag": entrada.etag, "Cache-Control": "no-cache", "X-Cache": status_cache}
+        if _confere(entrada.etag, request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        return Response(entrada.body, headers={**headers, "Content-Type": entrada.media_type})
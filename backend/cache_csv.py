@@ -0,0 +1,256 @@
+"""Cache binário dos CSVs de origem, lido por memory map.
+
+Na primeira leitura cada CSV é convertido (uma única vez por conteúdo) para
+um arquivo Arrow IPC sem compressão em data/.cache/<nome>-<sha256>.arrow,
+lendo o CSV em blocos (a conversão não carrega o arquivo inteiro):
+
+- colunas numéricas em largura fixa (int64/float64) com bitmap de nulos
+- colunas de texto repetitivas (Subject, Status, Message_Type, ...) codificadas
+  por dicionário: índices inteiros + os valores distintos uma vez só
+- demais textos em heap de bytes UTF-8 indexado por offsets (large_string)
+
+As leituras seguintes mapeiam o arquivo em memória (pa.memory_map): a
+pyarrow.Table de abrir() aponta direto para as páginas do arquivo, sem parsear
+texto nem copiar. A conversão para pandas não é sem cópia: com o padrão
+(categorias=False) cada texto vira um str Python por linha, como no
+pd.read_csv, porque a ingestão, os pipelines e o ETL tratam essas colunas
+como object (strip, normalização, to_dict). O ganho nesses casos é só não
+parsear o CSV; categorias=True mantém as colunas de dicionário como
+Categorical para quem consome direto. A chave é o SHA-256 do CSV;
+data/.cache/indice.json guarda tamanho e mtime de cada arquivo para não
+recalcular o hash quando nada mudou.
+
+Variáveis de ambiente:
+    CSV_CACHE=0        desliga o cache (leitura direta com pd.read_csv)
+    CSV_CACHE_DIR      pasta do cache (padrão: .cache ao lado do CSV)
+    CSV_CACHE_LOTE     linhas por bloco na conversão (padrão 100000)
+
+Uso (a partir de backend/):
+    python cache_csv.py                 # converte todos os CSVs de data/
+    python cache_csv.py --limpar        # apaga o cache
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+ATIVO = os.getenv("CSV_CACHE", "1") != "0"
+CACHE_DIR = os.getenv("CSV_CACHE_DIR")
+# Textos com até esta fração de valores distintos viram dicionário
+LIMITE_DICIONARIO = 0.5
+# Acima disso a coluna não vira dicionário (a conversão guarda os distintos em memória)
+MAX_DICIONARIO = 1 << 16
+INDICE = "indice.json"
+LINHAS_POR_LOTE = int(os.getenv("CSV_CACHE_LOTE", "100000"))
+
+
+def pasta_cache(csv_path):
+    return CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(csv_path)), ".cache")
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _ler_indice(pasta):
+    caminho = os.path.join(pasta, INDICE)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _salvar_indice(pasta, indice):
+    caminho = os.path.join(pasta, INDICE)
+    tmp_path = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=2)
+    os.replace(tmp_path, caminho)
+
+
+def chave_arquivo(csv_path):
+    """SHA-256 do CSV, reaproveitado do índice se tamanho e mtime não mudaram"""
+    pasta = pasta_cache(csv_path)
+    stat = os.stat(csv_path)
+    nome = os.path.abspath(csv_path)
+    indice = _ler_indice(pasta)
+    registro = indice.get(nome)
+    if registro and registro["size"] == stat.st_size and registro["mtime_ns"] == stat.st_mtime_ns:
+        return registro["sha256"]
+    sha256 = hash_arquivo(csv_path)
+    os.makedirs(pasta, exist_ok=True)
+    indice[nome] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    _salvar_indice(pasta, indice)
+    return sha256
+
+
+def caminho_cache(csv_path, sha256):
+    nome = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(pasta_cache(csv_path), f"{nome}-{sha256[:16]}.arrow")
+
+
+def _tipo_unificado(tipos):
+    """Tipo da coluna no arquivo inteiro a partir dos tipos inferidos em cada bloco"""
+    if len(tipos) == 1:
+        return next(iter(tipos))
+    if all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in tipos):
+        # Inteiros num bloco e NaN em outro: float64, como no read_csv do arquivo inteiro
+        return np.dtype("float64")
+    return np.dtype(object)
+
+
+def _analisar(csv_path, linhas_por_lote):
+    """Primeira passada: dtype de cada coluna no arquivo inteiro e dicionários dos textos repetitivos"""
+    tipos, distintos, linhas = {}, {}, 0
+    for bloco in pd.read_csv(csv_path, chunksize=linhas_por_lote):
+        linhas += len(bloco)
+        for coluna, tipo in bloco.dtypes.items():
+            tipos.setdefault(coluna, set()).add(tipo)
+            vistos = distintos.setdefault(coluna, {})
+            if tipo == object and vistos is not None:
+                # dict mantém a ordem de aparição, como o dictionary_encode
+                vistos.update(dict.fromkeys(bloco[coluna].dropna().unique()))
+                if len(vistos) > MAX_DICIONARIO:
+                    distintos[coluna] = None
+
+    dicionarios = {}
+    for coluna, vistos in distintos.items():
+        # Só colunas de texto em todos os blocos: números lidos como texto ficariam fora do dicionário
+        if vistos is not None and tipos[coluna] == {np.dtype(object)} and len(vistos) <= LIMITE_DICIONARIO * linhas:
+            valores = list(vistos)
+            dicionarios[coluna] = (pd.CategoricalDtype(valores), pa.array(valores, type=pa.large_string()))
+    return {coluna: _tipo_unificado(encontrados) for coluna, encontrados in tipos.items()}, dicionarios
+
+
+def _schema(tipos, dicionarios):
+    campos = []
+    for coluna, tipo in tipos.items():
+        if coluna in dicionarios:
+            campos.append((coluna, pa.dictionary(pa.int32(), pa.large_string())))
+        else:
+            campos.append((coluna, pa.large_string() if tipo == object else pa.from_numpy_dtype(tipo)))
+    return pa.schema(campos)
+
+
+def _lote_arrow(bloco, schema, dicionarios):
+    """Bloco do read_csv -> RecordBatch; as colunas de dicionário usam o mesmo dicionário em todos os lotes"""
+    arrays = []
+    for campo in schema:
+        serie = bloco[campo.name]
+        if campo.name in dicionarios:
+            categorias, valores = dicionarios[campo.name]
+            codigos = pd.Categorical(serie, dtype=categorias).codes
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codigos, type=pa.int32(), mask=codigos < 0), valores))
+        else:
+            arrays.append(pa.array(serie, type=campo.type, from_pandas=True))
+    return pa.record_batch(arrays, schema=schema)
+
+
+def converter(csv_path, destino, linhas_por_lote=LINHAS_POR_LOTE):
+    """Grava o Arrow IPC do CSV lendo-o em blocos, com os mesmos tipos do pd.read_csv
+
+    Duas passadas pelo CSV: a primeira descobre o tipo de cada coluna no
+    arquivo inteiro e os valores distintos dos textos repetitivos; a segunda
+    grava bloco a bloco. A memória fica limitada a um bloco e aos dicionários.
+    """
+    tipos, dicionarios = _analisar(csv_path, linhas_por_lote)
+    schema = _schema(tipos, dicionarios)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    tmp_path = f"{destino}.{os.getpid()}.tmp"
+    try:
+        # Sem compressão: os buffers no arquivo são os mesmos usados em memória
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as escritor:
+            for bloco in pd.read_csv(csv_path, chunksize=linhas_por_lote, dtype=tipos):
+                escritor.write_batch(_lote_arrow(bloco, schema, dicionarios))
+        os.replace(tmp_path, destino)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _remover_antigos(csv_path, destino)
+
+
+def _remover_antigos(csv_path, atual):
+    """Apaga caches de versões anteriores do mesmo CSV"""
+    pasta = pasta_cache(csv_path)
+    prefixo = os.path.splitext(os.path.basename(csv_path))[0] + "-"
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+        if nome.startswith(prefixo) and nome.endswith(".arrow") and caminho != atual:
+            os.remove(caminho)
+
+
+def abrir(csv_path):
+    """pyarrow.Table do CSV mapeada do cache em disco (converte se ainda não existir)"""
+    destino = caminho_cache(csv_path, chave_arquivo(csv_path))
+    if not os.path.exists(destino):
+        converter(csv_path, destino)
+    # Os buffers da tabela mantêm o mapeamento vivo enquanto forem usados
+    return pa.ipc.open_file(pa.memory_map(destino, "r")).read_all()
+
+
+def para_pandas(tabela, inicio=0, categorias=False):
+    """Tabela (ou fatia) -> DataFrame com os tipos do pd.read_csv
+
+    categorias=True mantém as colunas de dicionário como pandas.Categorical
+    (sem materializar uma string por linha).
+    """
+    df = tabela.to_pandas(split_blocks=True)
+    if not categorias:
+        for coluna in df.columns:
+            if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+                df[coluna] = df[coluna].astype(object)
+    df.index = pd.RangeIndex(inicio, inicio + len(df))
+    return df
+
+
+def ler_csv(csv_path, categorias=False):
+    """Equivalente a pd.read_csv(csv_path), servido pelo cache binário"""
+    if not ATIVO:
+        return pd.read_csv(csv_path)
+    return para_pandas(abrir(csv_path), categorias=categorias)
+
+
+def ler_blocos(csv_path, batch_size, categorias=False):
+    """Equivalente a pd.read_csv(csv_path, chunksize=batch_size); cada bloco é uma fatia sem cópia"""
+    if not ATIVO:
+        yield from pd.read_csv(csv_path, chunksize=batch_size)
+        return
+    tabela = abrir(csv_path)
+    for inicio in range(0, tabela.num_rows, batch_size):
+        yield para_pandas(tabela.slice(inicio, batch_size), inicio, categorias)
+
+
+if __name__ == "__main__":
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    parser = argparse.ArgumentParser(description="Gera o cache binário (Arrow, memory map) dos CSVs")
+    parser.add_argument("arquivos", nargs="*", help="CSVs a converter (padrão: todos de data/)")
+    parser.add_argument("--limpar", action="store_true", help="Apaga a pasta do cache")
+    args = parser.parse_args()
+
+    arquivos = args.arquivos or [os.path.join(data_dir, nome) for nome in sorted(os.listdir(data_dir))
+                                 if nome.endswith(".csv")]
+    if args.limpar:
+        for pasta in sorted({pasta_cache(arquivo) for arquivo in arquivos}):
+            shutil.rmtree(pasta, ignore_errors=True)
+            print(f"🧹 Cache removido: {pasta}")
+    else:
+        for arquivo in arquivos:
+            tabela = abrir(arquivo)
+            destino = caminho_cache(arquivo, chave_arquivo(arquivo))
+            dicionarios = [c.name for c in tabela.schema if pa.types.is_dictionary(c.type)]
+            print(f"✅ {os.path.basename(arquivo)}: {tabela.num_rows} linhas, "
+                  f"{os.path.getsize(arquivo) / 1024:.0f} KB -> {os.path.getsize(destino) / 1024:.0f} KB "
+                  f"(dicionário: {', '.join(dicionarios) or '-'})")
@@ -0,0 +1,64 @@
+"""Registro das cargas da ingestão (ingest.py -> ETL incremental).
+
+Cada execução da ingestão grava um documento em `ingest_loads` com _id igual
+ao `_ingest_ts` que ela carimba nos documentos: "em_andamento" ao começar e
+"concluida" (ou "falhou") ao terminar, com as coleções gravadas e as que
+foram substituídas por inteiro (recarga com remoção dos documentos antigos).
+
+O ETL incremental só avança o watermark sobre cargas terminadas: uma carga
+ainda em andamento pode gravar documentos com _ingest_ts menor que o de uma
+carga já concluída, então a leitura para nela até que termine.
+"""
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+CARGAS_COLLECTION = "ingest_loads"
+EM_ANDAMENTO, CONCLUIDA, FALHOU = "em_andamento", "concluida", "falhou"
+# Carga "em andamento" há mais tempo que isso: processo morto, tratada como falha
+ABANDONO = timedelta(hours=float(os.getenv("INGEST_ABANDONO_HORAS", "12")))
+
+
+@contextmanager
+def registrar_carga(db, carga):
+    """Registra a carga; concluída ao sair do bloco sem erro, falha caso contrário
+
+    O bloco anota em registro["colecoes"] e registro["substituidas"] o que gravou.
+    """
+    cargas = db[CARGAS_COLLECTION]
+    cargas.insert_one({"_id": carga, "status": EM_ANDAMENTO})
+    registro = {"colecoes": set(), "substituidas": set()}
+
+    def terminar(status):
+        cargas.update_one({"_id": carga}, {"$set": {
+            "status": status, "colecoes": sorted(registro["colecoes"]),
+            "substituidas": sorted(registro["substituidas"]), "fim": datetime.utcnow()}})
+
+    try:
+        yield registro
+    except BaseException:
+        terminar(FALHOU)
+        raise
+    terminar(CONCLUIDA)
+
+
+def cargas_terminadas(db, depois_de=None, abandono=ABANDONO):
+    """Cargas posteriores a `depois_de`, em ordem, até a primeira ainda em andamento (exclusive)
+
+    Cargas abandonadas voltam com status FALHOU: não se sabe o que chegaram a gravar ou remover.
+    """
+    filtro = {"_id": {"$gt": depois_de}} if depois_de else {}
+    abandonada_antes_de = datetime.utcnow() - abandono
+    terminadas = []
+    for doc in db[CARGAS_COLLECTION].find(filtro).sort("_id", 1):
+        if doc["status"] == EM_ANDAMENTO:
+            if doc["_id"] > abandonada_antes_de:
+                break
+            doc["status"] = FALHOU
+        terminadas.append(doc)
+    return terminadas
+
+
+def existe_registro(db):
+    """False para bancos carregados antes do registro de cargas"""
+    return db[CARGAS_COLLECTION].find_one({}, {"_id": 1}) is not None
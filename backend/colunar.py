@@ -0,0 +1,236 @@
+"""Exportação colunar (Arrow IPC / Parquet) direto dos lotes do cursor.
+
+Cada lote vira um RecordBatch com o schema Arrow da coleção e é enviado
+assim que fica pronto, então a memória não cresce com a coleção. Usado pelo
+endpoint /export/{collection} (motor) e pelo ETL (pymongo).
+
+Com o pacote pymongoarrow instalado os lotes são páginas em ordem de _id
+(keyset, atendidas pelos índices {filtros, _id} de indexes.py) decodificadas
+do BSON direto para Arrow, sem criar um dict por documento. Sem ele o driver
+ainda decodifica cada documento em dict; os valores vão direto para listas
+por coluna, sem acumular a lista de dicts do lote.
+"""
+import asyncio
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from schema import SCHEMAS, codificar
+
+try:
+    from pymongoarrow.api import find_arrow_all
+except ImportError:
+    find_arrow_all = None
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+# Colunas exportáveis por coleção e campos aceitos como filtro de igualdade
+EXPORTAVEIS = {
+    "performance": {
+        "campos": ["Student_ID", "Subject", "Exam_Score", "Homework_Completion_%", "Teacher_Comments"],
+        "filtros": ["Student_ID", "Subject"],
+    },
+    "homework": {
+        "campos": ["Student_ID", "Subject", "Assignment_Name", "Due_Date", "Status", "Grade_Feedback",
+                   "Guardian_Signature"],
+        "filtros": ["Student_ID", "Subject", "Status"],
+    },
+    "students": {
+        "campos": ["Student_ID", "Full_Name", "Date_of_Birth", "Grade_Level", "Emergency_Contact"],
+        "filtros": ["Student_ID", "Grade_Level"],
+    },
+    "teacher_parent_communication": {
+        "campos": ["Student_ID", "Date", "Message_Type", "Message_Content"],
+        "filtros": ["Student_ID", "Message_Type"],
+    },
+    "attendance": {
+        "campos": ["Student_ID", "Subject", "Date", "Attendance_Status"],
+        "filtros": ["Student_ID", "Subject", "Attendance_Status"],
+    },
+}
+
+_TIPOS_ARROW = {"int": pa.int64(), "date": pa.timestamp("ms")}
+
+
+def _tipo_arrow(spec):
+    if spec is None:
+        return pa.string()
+    if spec["tipo"] == "enum":
+        # Códigos booleanos (ex.: Guardian_Signature) ou textuais
+        valores = list(spec["valores"].values())
+        return pa.bool_() if all(isinstance(v, bool) for v in valores) else pa.string()
+    return _TIPOS_ARROW.get(spec["tipo"], pa.string())
+
+
+def schema_arrow(collection_name, campos):
+    """Schema Arrow derivado dos tipos declarados em schema.py"""
+    tipos = SCHEMAS.get(collection_name, {})
+    return pa.schema([(campo, _tipo_arrow(tipos.get(campo))) for campo in campos])
+
+
+def montar_consulta(collection_name, campos=None, filtros=None):
+    """Valida campos/filtros pedidos; retorna (filtro Mongo, lista de campos)"""
+    config = EXPORTAVEIS[collection_name]
+    campos = campos or config["campos"]
+    invalidos = [c for c in list(campos) + list(filtros or {}) if c not in config["campos"]]
+    if invalidos:
+        raise ValueError(f"Campos não exportáveis em '{collection_name}': {invalidos}")
+    nao_filtraveis = [c for c in filtros or {} if c not in config["filtros"]]
+    if nao_filtraveis:
+        raise ValueError(f"Filtros aceitos em '{collection_name}': {config['filtros']}")
+    filtro = {campo: codificar(collection_name, campo, valor) for campo, valor in (filtros or {}).items()}
+    return filtro, list(campos)
+
+
+class _SaidaIncremental:
+    """Destino de escrita que acumula bytes para serem drenados a cada lote.
+
+    Mantém a posição total para o Parquet calcular offsets do rodapé.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+        self.closed = False
+
+    def write(self, dados):
+        dados = bytes(dados)
+        self._partes.append(dados)
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drenar(self):
+        dados = b"".join(self._partes)
+        self._partes = []
+        return dados
+
+
+def _escritor(formato, saida, schema):
+    arquivo = pa.PythonFile(saida, mode="w")
+    if formato == "parquet":
+        return pq.ParquetWriter(arquivo, schema, compression="zstd")
+    return pa.ipc.new_stream(arquivo, schema)
+
+
+async def exportar(collection, filtro, campos, formato="arrow", batch_size=EXPORT_BATCH_SIZE):
+    """Gerador assíncrono de bytes Arrow IPC/Parquet, um RecordBatch por lote"""
+    schema = schema_arrow(collection.name, campos)
+    saida = _SaidaIncremental()
+    escritor = _escritor(formato, saida, schema)
+
+    if find_arrow_all is not None:
+        # pymongoarrow é síncrono: cada página é lida pela coleção pymongo do motor numa thread
+        paginas = _paginas_arrow(collection.delegate, filtro, schema, batch_size)
+        while True:
+            lote = await asyncio.to_thread(next, paginas, None)
+            if lote is None:
+                break
+            escritor.write_batch(lote)
+            yield saida.drenar()
+    else:
+        colunas = _Colunas(schema)
+        projecao = {"_id": 0, **{campo: 1 for campo in campos}}
+        async for doc in collection.find(filtro, projecao).batch_size(batch_size):
+            colunas.adicionar(doc)
+            if colunas.linhas >= batch_size:
+                escritor.write_batch(colunas.lote())
+                yield saida.drenar()
+        if colunas.linhas:
+            escritor.write_batch(colunas.lote())
+    escritor.close()
+    yield saida.drenar()
+
+
+def iterar_lotes(collection, campos=None, filtros=None, batch_size=EXPORT_BATCH_SIZE, filtro_extra=None):
+    """Itera a coleção (pymongo) como pyarrow.RecordBatch de até batch_size linhas
+
+    filtro_extra: condição Mongo adicional (ex.: cargas novas do ETL incremental)
+    """
+    filtro, campos = montar_consulta(collection.name, campos, filtros)
+    if filtro_extra:
+        filtro = {"$and": [filtro, filtro_extra]}
+    schema = schema_arrow(collection.name, campos)
+    if find_arrow_all is not None:
+        yield from _paginas_arrow(collection, filtro, schema, batch_size)
+        return
+    colunas = _Colunas(schema)
+    projecao = {"_id": 0, **{campo: 1 for campo in campos}}
+    for doc in collection.find(filtro, projecao).batch_size(batch_size):
+        colunas.adicionar(doc)
+        if colunas.linhas >= batch_size:
+            yield colunas.lote()
+    if colunas.linhas:
+        yield colunas.lote()
+
+
+class _Colunas:
+    """Valores do lote em uma lista por coluna, na ordem do schema"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._limpar()
+
+    def _limpar(self):
+        self.valores = [[] for _ in self.schema.names]
+        self.linhas = 0
+
+    def adicionar(self, doc):
+        for campo, valores in zip(self.schema.names, self.valores):
+            valores.append(doc.get(campo))
+        self.linhas += 1
+
+    def lote(self):
+        arrays = [pa.array(valores, type=campo.type) for valores, campo in zip(self.valores, self.schema)]
+        self._limpar()
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _paginas_arrow(collection, filtro, schema, batch_size):
+    """Páginas de até batch_size linhas decodificadas pelo pymongoarrow, em ordem de _id"""
+    from bson import ObjectId
+
+    schema_pymongoarrow = _schema_pymongoarrow(schema, _id=ObjectId)
+    ultimo = None
+    while True:
+        consulta = filtro if ultimo is None else {"$and": [filtro, {"_id": {"$gt": ultimo}}]}
+        tabela = find_arrow_all(collection, consulta, schema=schema_pymongoarrow,
+                                sort=[("_id", 1)], limit=batch_size)
+        if tabela.num_rows == 0:
+            return
+        ultimo = tabela.column("_id")[-1].as_py()
+        colunas = tabela.select(schema.names).combine_chunks()
+        yield pa.RecordBatch.from_arrays([colunas.column(c).chunk(0) for c in schema.names], schema=schema)
+        if tabela.num_rows < batch_size:
+            return
+
+
+def ler_tabela(collection, campos=None, filtros=None, batch_size=EXPORT_BATCH_SIZE):
+    """Lê uma coleção (pymongo) inteira como pyarrow.Table"""
+    filtro, campos = montar_consulta(collection.name, campos, filtros)
+    schema = schema_arrow(collection.name, campos)
+    if find_arrow_all is not None:
+        return find_arrow_all(collection, filtro, schema=_schema_pymongoarrow(schema))
+    return pa.Table.from_batches(list(iterar_lotes(collection, campos, filtros, batch_size)), schema=schema)
+
+
+def _schema_pymongoarrow(schema, **extras):
+    from pymongoarrow.api import Schema
+    return Schema({**extras, **{campo.name: campo.type for campo in schema}})
+
+
+def ler_dataframe(collection, campos=None, filtros=None):
+    """Atalho para o ETL: DataFrame pandas montado a partir das colunas Arrow"""
+    return ler_tabela(collection, campos, filtros).to_pandas()
@@ -1,6 +1,51 @@
+"""Conexão com o MongoDB: clientes síncrono (scripts) e assíncrono (API).
+
+Pool e timeouts configuráveis por variáveis de ambiente:
+    MONGODB_URI, MONGODB_DB
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS
+"""
+import os
+
+from dotenv import load_dotenv
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 
-# Conexão com o MongoDB Atlas (substitua pela sua URL)
-client = MongoClient("mongodb+srv://<usuario>:<senha>@cluster0.mongodb.net/tech_trends?retryWrites=true&w=majority")
-db = client["tech_trends"]
-collection = db["jobs"]  # Coleção para vagas de tecnologia
\ No newline at end of file
+load_dotenv()
+
+DB_NAME = os.getenv("MONGODB_DB", "tech_trends")
+
+
+def _env_int(nome, padrao):
+    return int(os.getenv(nome, str(padrao)))
+
+
+def opcoes_pool():
+    """Parâmetros do pool de conexões compartilhados pelos dois clientes"""
+    return {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 200),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 10),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 60000),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS", 30000),
+        # Tempo máximo esperando uma conexão livre quando o pool está cheio
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000),
+    }
+
+
+def criar_cliente():
+    """Cliente síncrono (pymongo) para scripts de ingestão/ETL"""
+    return MongoClient(os.getenv("MONGODB_URI"), **opcoes_pool())
+
+
+def criar_cliente_async():
+    """Cliente assíncrono (motor); deve ser criado dentro do event loop da API"""
+    return AsyncIOMotorClient(os.getenv("MONGODB_URI"), **opcoes_pool())
+
+
+def get_db(request: Request):
+    """Dependência FastAPI: banco aberto no lifespan da aplicação"""
+    return request.app.state.db
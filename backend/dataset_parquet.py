@@ -0,0 +1,208 @@
+"""Saída Parquet do ETL particionada por Subject e leitor com predicate pushdown.
+
+Layout (partições no estilo hive, lido direto por pyarrow, pandas, DuckDB, Spark):
+
+    performance_<data>/Subject=Math/part-0.parquet
+    performance_<data>/Subject=Science/part-0.parquet
+
+Cada lote gravado vira ao menos um row group com estatísticas min/max por
+coluna, então filtros como Final_Score >= 60 pulam row groups inteiros e só
+as colunas pedidas são lidas do disco.
+
+Uso do leitor (a partir de backend/):
+    python dataset_parquet.py ETL_OUTPUT/performance_20250101_120000 \\
+        --colunas Student_ID,Final_Score --filtro Subject=Math --filtro "Final_Score>=60"
+"""
+import argparse
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from colunar import EXPORTAVEIS, schema_arrow
+
+COMPRESSAO = os.getenv("ETL_PARQUET_COMPRESSAO", "zstd")
+ROW_GROUP_SIZE = int(os.getenv("ETL_ROW_GROUP_SIZE", "65536"))
+PARTICAO = "Subject"
+
+# Colunas de performance com os tipos de schema.py + notas calculadas pelo ETL
+SCHEMA_SCORES = schema_arrow("performance", EXPORTAVEIS["performance"]["campos"]).append(
+    pa.field("Homework_Score", pa.float64())).append(pa.field("Final_Score", pa.float64()))
+SCHEMA_ARQUIVO = SCHEMA_SCORES.remove(SCHEMA_SCORES.get_field_index(PARTICAO))
+
+
+def _tabela(df, schema=SCHEMA_ARQUIVO):
+    """DataFrame transformado -> pyarrow.Table no schema fixo (sem a coluna de partição)"""
+    colunas = {}
+    for campo in schema:
+        serie = df[campo.name] if campo.name in df.columns else pd.Series([None] * len(df), dtype=object)
+        if pa.types.is_integer(campo.type) or pa.types.is_floating(campo.type):
+            # Cargas antigas podem trazer números como texto ("100%")
+            serie = pd.to_numeric(serie.astype(str).str.rstrip("%") if serie.dtype == object else serie,
+                                  errors="coerce")
+        colunas[campo.name] = pa.array(serie, type=campo.type, from_pandas=True)
+    return pa.table(colunas, schema=schema)
+
+
+def _pasta_particao(raiz, valor, particao=PARTICAO):
+    return os.path.join(raiz, f"{particao}={valor}")
+
+
+class EscritorParticionado:
+    """Mantém um ParquetWriter aberto por partição; cada escrever() acrescenta row groups
+
+    O padrão é o schema de performance_scores particionado por Subject; com
+    schema=None o schema é inferido do primeiro lote, e particao=None grava
+    um único arquivo em raiz/part-0.parquet.
+    """
+
+    def __init__(self, raiz, compressao=COMPRESSAO, row_group_size=ROW_GROUP_SIZE,
+                 particao=PARTICAO, schema=SCHEMA_SCORES):
+        self.nome = f"parquet:{os.path.basename(raiz)}"
+        self.raiz = raiz
+        self.compressao = compressao
+        self.row_group_size = row_group_size
+        self.particao = particao
+        self.schema = schema
+        self.linhas = {}
+        self._escritores = {}
+        self._arquivos = []
+
+    def _schema_arquivo(self, df):
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(df, preserve_index=False)
+        if self.particao in self.schema.names:
+            return self.schema.remove(self.schema.get_field_index(self.particao))
+        return self.schema
+
+    def escrever(self, df):
+        schema = self._schema_arquivo(df)
+        grupos = df.groupby(self.particao) if self.particao else [(None, df)]
+        for valor, grupo in grupos:
+            escritor = self._escritores.get(valor)
+            if escritor is None:
+                pasta = _pasta_particao(self.raiz, valor, self.particao) if self.particao else self.raiz
+                os.makedirs(pasta, exist_ok=True)
+                caminho = os.path.join(pasta, "part-0.parquet")
+                self._arquivos.append(caminho)
+                escritor = pq.ParquetWriter(caminho, schema, compression=self.compressao, write_statistics=True)
+                self._escritores[valor] = escritor
+            escritor.write_table(_tabela(grupo, schema), row_group_size=self.row_group_size)
+            self.linhas[valor] = self.linhas.get(valor, 0) + len(grupo)
+
+    def fechar(self):
+        for escritor in self._escritores.values():
+            escritor.close()
+        self._escritores = {}
+        return self.linhas
+
+    def abortar(self):
+        """Execução com erro: fecha e remove os arquivos gravados e as pastas que ficarem vazias"""
+        for escritor in self._escritores.values():
+            try:
+                escritor.close()
+            except Exception:
+                pass
+        self._escritores = {}
+        for caminho in self._arquivos:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        pastas = {os.path.dirname(caminho) for caminho in self._arquivos} | {self.raiz}
+        # Mais profundas primeiro: as partições antes da raiz
+        for pasta in sorted(pastas, key=len, reverse=True):
+            if os.path.isdir(pasta) and not os.listdir(pasta):
+                os.rmdir(pasta)
+        self._arquivos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def gravar_arquivo(caminho, df, compressao=COMPRESSAO, row_group_size=ROW_GROUP_SIZE):
+    """Grava df (sem a coluna de partição) num único arquivo Parquet, de forma atômica"""
+    # Temporário oculto: leitores do dataset ignoram arquivos iniciados por "."
+    tmp_path = os.path.join(os.path.dirname(caminho), f".{os.path.basename(caminho)}.tmp")
+    pq.write_table(_tabela(df), tmp_path, compression=compressao,
+                   row_group_size=row_group_size, write_statistics=True)
+    os.replace(tmp_path, caminho)
+    return len(df)
+
+
+def ler_arquivo(caminho):
+    """Um arquivo de partição como DataFrame (sem a coluna de partição)"""
+    return pq.read_table(caminho, partitioning=None).to_pandas()
+
+
+_FILTRO = re.compile(r"^\s*([\w%]+)\s*(>=|<=|!=|==|=|>|<)\s*(.+?)\s*$")
+
+
+def parse_filtro(texto):
+    """'Final_Score>=60' -> ('Final_Score', '>=', 60.0); valores de colunas texto ficam str"""
+    casamento = _FILTRO.match(texto)
+    if not casamento:
+        raise ValueError(f"Filtro inválido (use Campo<op>valor): {texto}")
+    campo, operador, valor = casamento.groups()
+    if campo not in SCHEMA_SCORES.names:
+        raise ValueError(f"Coluna desconhecida: {campo}")
+    tipo = SCHEMA_SCORES.field(campo).type
+    if pa.types.is_integer(tipo):
+        valor = int(valor)
+    elif pa.types.is_floating(tipo):
+        valor = float(valor)
+    return campo, "=" if operador == "==" else operador, valor
+
+
+def ler_parquet(caminho, colunas=None, filtros=None):
+    """Lê o dataset (ou um arquivo) como DataFrame, só com as colunas e row groups necessários
+
+    filtros: lista de tuplas (coluna, operador, valor) ou strings 'Coluna>=valor';
+    filtros em Subject descartam partições sem abri-las.
+    """
+    filtros = [parse_filtro(f) if isinstance(f, str) else tuple(f) for f in filtros or []]
+    tabela = pq.read_table(caminho, columns=colunas, filters=filtros or None, partitioning="hive")
+    return tabela.to_pandas()
+
+
+def resumo(caminho):
+    """Arquivos, row groups e intervalo de Final_Score (estatísticas do rodapé) de cada partição"""
+    arquivos = [caminho] if os.path.isfile(caminho) else sorted(
+        os.path.join(pasta, nome)
+        for pasta, _, nomes in os.walk(caminho) for nome in nomes if nome.endswith(".parquet")
+    )
+    linhas = []
+    for arquivo in arquivos:
+        metadados = pq.ParquetFile(arquivo).metadata
+        indice = metadados.schema.to_arrow_schema().get_field_index("Final_Score")
+        for i in range(metadados.num_row_groups):
+            grupo = metadados.row_group(i)
+            estatisticas = grupo.column(indice).statistics if indice >= 0 else None
+            linhas.append({
+                "arquivo": os.path.relpath(arquivo, caminho) if arquivo != caminho else os.path.basename(arquivo),
+                "row_group": i,
+                "linhas": grupo.num_rows,
+                "bytes": grupo.total_byte_size,
+                "final_min": estatisticas.min if estatisticas is not None and estatisticas.has_min_max else None,
+                "final_max": estatisticas.max if estatisticas is not None and estatisticas.has_min_max else None,
+            })
+    return pd.DataFrame(linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lê a saída Parquet do ETL com projeção e filtros")
+    parser.add_argument("caminho", help="Pasta do dataset ou arquivo .parquet")
+    parser.add_argument("--colunas", help="Colunas separadas por vírgula (padrão: todas)")
+    parser.add_argument("--filtro", action="append", default=[], help="Ex.: Subject=Math, Final_Score>=60 (repetível)")
+    parser.add_argument("--resumo", action="store_true", help="Mostra row groups e estatísticas de Final_Score")
+    args = parser.parse_args()
+
+    if args.resumo:
+        print(resumo(args.caminho).to_string(index=False))
+    else:
+        df = ler_parquet(args.caminho, args.colunas.split(",") if args.colunas else None, args.filtro)
+        print(df.head(20).to_string(index=False))
+        print(f"\n📝 {len(df)} registros, colunas: {list(df.columns)}")
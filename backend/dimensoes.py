@@ -0,0 +1,64 @@
+"""Dimensões (valores distintos de campos categóricos) para filtros e listas de opções.
+
+Cada dimensão sai de um `distinct` sobre um campo que é prefixo de índice
+(plano DISTINCT_SCAN: lê só as chaves do índice, sem tocar nos documentos).
+O resultado fica serializado em memória até a ingestão/ETL publicar
+alteração na coleção de origem (MonitorVersoes), então uma requisição com
+o cache quente só devolve bytes prontos.
+"""
+import asyncio
+
+from respostas import dumps
+
+# nome -> (coleção, campo); o campo é prefixo de um índice em indexes.py
+DIMENSOES = {
+    "subjects": ("performance", "Subject"),
+    "grade-levels": ("students", "Grade_Level"),
+    "message-types": ("teacher_parent_communication", "Message_Type"),
+    # Códigos normalizados na ingestão (schema.STATUS_TAREFA): done, not_done, pending
+    "homework-statuses": ("homework", "Status"),
+}
+
+
+async def valores_distintos(collection, campo):
+    """Valores distintos não nulos, ordenados"""
+    valores = await collection.distinct(campo)
+    return sorted(v for v in valores if v not in (None, ""))
+
+
+class CacheDimensoes:
+    """Valores de cada dimensão já serializados, descartados quando a coleção muda"""
+
+    def __init__(self, dimensoes=DIMENSOES):
+        self.dimensoes = dimensoes
+        self._corpos = {}
+        self._geracoes = dict.fromkeys(dimensoes, 0)
+        # Criados no primeiro uso, dentro do loop: até o Python 3.9 o Lock se prende ao loop
+        # corrente na criação, e o cache é criado na importação de main.py
+        self._locks = {}
+
+    async def obter(self, db, nome):
+        """Bytes JSON da lista de valores; KeyError para dimensão desconhecida"""
+        collection_name, campo = self.dimensoes[nome]
+        corpo = self._corpos.get(nome)
+        if corpo is not None:
+            return corpo
+        # Lock: requisições simultâneas com o cache frio fazem um único distinct
+        if nome not in self._locks:
+            self._locks[nome] = asyncio.Lock()
+        async with self._locks[nome]:
+            corpo = self._corpos.get(nome)
+            if corpo is None:
+                geracao = self._geracoes[nome]
+                corpo = dumps(await valores_distintos(db[collection_name], campo))
+                # Alteração durante o distinct: entrega o resultado, mas não guarda
+                if self._geracoes[nome] == geracao:
+                    self._corpos[nome] = corpo
+        return corpo
+
+    def ao_alterar(self, colecoes):
+        """Callback do MonitorVersoes: recalcula no próximo acesso"""
+        for nome, (collection_name, _) in self.dimensoes.items():
+            if collection_name in colecoes:
+                self._geracoes[nome] += 1
+                self._corpos.pop(nome, None)
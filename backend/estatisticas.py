@@ -0,0 +1,163 @@
+"""Estatísticas calculadas no MongoDB sobre a coleção inteira (endpoints /stats/...).
+
+Nada de linhas brutas trafegando: cada função roda um pipeline de agregação
+($group/$bucket) e devolve só o resultado compacto. Mediana e quartis de
+Exam_Score (inteiro 0–100 desde a ingestão) saem exatos da tabela de
+frequências por nota, que tem no máximo 101 linhas por disciplina, então
+funcionam em qualquer versão do servidor (sem depender de $percentile).
+"""
+import math
+
+from pymongo.errors import OperationFailure
+
+CAMPOS_HISTOGRAMA = {"Exam_Score", "Homework_Completion_%", "Final_Score"}
+
+
+def _quantil(frequencias, total, q):
+    """Quantil exato (interpolação linear, como o pandas) a partir de [(valor, contagem)] ordenado"""
+    posicao = (total - 1) * q
+    abaixo, acima = math.floor(posicao), math.ceil(posicao)
+    valores = {}
+    acumulado = 0
+    for valor, contagem in frequencias:
+        for indice in (abaixo, acima):
+            if indice not in valores and acumulado <= indice < acumulado + contagem:
+                valores[indice] = valor
+        acumulado += contagem
+        if len(valores) == 2 or (abaixo == acima and valores):
+            break
+    return valores[abaixo] + (valores[acima] - valores[abaixo]) * (posicao - abaixo)
+
+
+async def estatisticas_notas(collection, subject=None, campo="Exam_Score"):
+    """Por disciplina: count, mean, std (amostral, como o pandas), min, q1, median, q3, max"""
+    filtro = {campo: {"$type": "number"}}
+    if subject:
+        filtro["Subject"] = subject
+    cursor = collection.aggregate([
+        {"$match": filtro},
+        {"$group": {"_id": {"Subject": "$Subject", "valor": f"${campo}"}, "n": {"$sum": 1}}},
+        {"$sort": {"_id.valor": 1}},
+        {"$group": {
+            "_id": "$_id.Subject",
+            "count": {"$sum": "$n"},
+            "soma": {"$sum": {"$multiply": ["$_id.valor", "$n"]}},
+            "soma_quadrados": {"$sum": {"$multiply": ["$_id.valor", "$_id.valor", "$n"]}},
+            "frequencias": {"$push": ["$_id.valor", "$n"]},
+        }},
+        {"$sort": {"_id": 1}},
+    ], allowDiskUse=True)
+
+    resultado = []
+    async for doc in cursor:
+        n = doc["count"]
+        media = doc["soma"] / n
+        variancia = (doc["soma_quadrados"] - n * media * media) / (n - 1) if n > 1 else None
+        frequencias = doc["frequencias"]
+        resultado.append({
+            "Subject": doc["_id"],
+            "count": n,
+            "mean": media,
+            "std": math.sqrt(max(variancia, 0)) if variancia is not None else None,
+            "min": frequencias[0][0],
+            "q1": _quantil(frequencias, n, 0.25),
+            "median": _quantil(frequencias, n, 0.5),
+            "q3": _quantil(frequencias, n, 0.75),
+            "max": frequencias[-1][0],
+        })
+    return resultado
+
+
+async def frequencia_presencas(collection, filtro_datas=None, subject=None):
+    """Contagens Present/Absent por disciplina e por dia da semana (1 = segunda, ISO)
+
+    O dia da semana só considera Date gravado como BSON Date: documentos de
+    ingestões antigas com a data em texto fariam o $isoDayOfWeek falhar, então
+    entram em por_disciplina mas ficam fora de por_dia.
+    """
+    filtro = dict(filtro_datas or {})
+    if subject:
+        filtro["Subject"] = subject
+    cursor = collection.aggregate([
+        {"$match": filtro},
+        {"$facet": {
+            "por_disciplina": [
+                {"$group": {"_id": {"Subject": "$Subject", "status": "$Attendance_Status"}, "count": {"$sum": 1}}},
+                {"$sort": {"_id.Subject": 1, "_id.status": 1}},
+            ],
+            "por_dia": [
+                {"$match": {"Date": {"$type": "date"}}},
+                {"$group": {"_id": {"Subject": "$Subject", "dia": {"$isoDayOfWeek": "$Date"}},
+                            "count": {"$sum": 1}}},
+                {"$sort": {"_id.Subject": 1, "_id.dia": 1}},
+            ],
+        }},
+    ])
+    faceta = (await cursor.to_list(length=1))[0]
+    return {
+        "por_disciplina": [{"Subject": d["_id"]["Subject"], "Attendance_Status": d["_id"]["status"],
+                            "count": d["count"]} for d in faceta["por_disciplina"]],
+        "por_dia": [{"Subject": d["_id"]["Subject"], "dia": d["_id"]["dia"], "count": d["count"]}
+                    for d in faceta["por_dia"]],
+    }
+
+
+def _pearson(n, sx, sy, sxy, sxx, syy):
+    denominador = math.sqrt(max(n * sxx - sx * sx, 0)) * math.sqrt(max(n * syy - sy * sy, 0))
+    return (n * sxy - sx * sy) / denominador if denominador else None
+
+
+async def correlacao_conclusao_nota(collection, subject=None, largura=10):
+    """Pearson entre Homework_Completion_% e Exam_Score + nota média por faixa de conclusão"""
+    filtro = {"Homework_Completion_%": {"$gte": 0, "$lte": 100}, "Exam_Score": {"$type": "number"}}
+    if subject:
+        filtro["Subject"] = subject
+    limites = list(range(0, 100, largura)) + [101]
+    cursor = collection.aggregate([
+        {"$match": filtro},
+        {"$facet": {
+            "somas": [{"$group": {
+                "_id": None,
+                "n": {"$sum": 1},
+                "sx": {"$sum": "$Homework_Completion_%"},
+                "sy": {"$sum": "$Exam_Score"},
+                "sxy": {"$sum": {"$multiply": ["$Homework_Completion_%", "$Exam_Score"]}},
+                "sxx": {"$sum": {"$multiply": ["$Homework_Completion_%", "$Homework_Completion_%"]}},
+                "syy": {"$sum": {"$multiply": ["$Exam_Score", "$Exam_Score"]}},
+            }}],
+            "faixas": [{"$bucket": {
+                "groupBy": "$Homework_Completion_%",
+                "boundaries": limites,
+                "output": {"count": {"$sum": 1}, "mean_exam": {"$avg": "$Exam_Score"}},
+            }}],
+        }},
+    ])
+    faceta = (await cursor.to_list(length=1))[0]
+    somas = faceta["somas"][0] if faceta["somas"] else None
+    return {
+        "subject": subject,
+        "count": somas["n"] if somas else 0,
+        "correlation": _pearson(somas["n"], somas["sx"], somas["sy"], somas["sxy"], somas["sxx"], somas["syy"])
+        if somas else None,
+        "faixas": [{"min": d["_id"], "max": min(limites[limites.index(d["_id"]) + 1], 100),
+                    "count": d["count"], "mean_exam": d["mean_exam"]} for d in faceta["faixas"]],
+    }
+
+
+async def histograma(collection, campo, bins=10, minimo=0, maximo=100, filtro=None):
+    """Histograma de um campo numérico via $bucket, com as faixas vazias incluídas"""
+    if campo not in CAMPOS_HISTOGRAMA:
+        raise ValueError(f"Campo sem histograma: {campo}. Aceitos: {sorted(CAMPOS_HISTOGRAMA)}")
+    largura = (maximo - minimo) / bins
+    limites = [minimo + largura * i for i in range(bins)] + [maximo + (1 if largura >= 1 else largura / 2)]
+    filtro = {**(filtro or {}), campo: {"$gte": limites[0], "$lt": limites[-1]}}
+    try:
+        cursor = collection.aggregate([
+            {"$match": filtro},
+            {"$bucket": {"groupBy": f"${campo}", "boundaries": limites, "output": {"count": {"$sum": 1}}}},
+        ])
+        contagens = {doc["_id"]: doc["count"] async for doc in cursor}
+    except OperationFailure as e:
+        raise ValueError(str(e))
+    return [{"min": inicio, "max": min(fim, maximo), "count": contagens.get(inicio, 0)}
+            for inicio, fim in zip(limites, limites[1:])]
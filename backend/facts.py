@@ -0,0 +1,133 @@
+"""Visão materializada por aluno/disciplina (coleção student_subject_facts).
+
+Consolida nota, conclusão de tarefas, contagem de tarefas por status,
+última comunicação e taxa de presença. É reconstruída após a ingestão e
+pode ser atualizada só para alguns alunos via $merge.
+
+Uso:
+    python facts.py   # reconstrói a coleção inteira
+"""
+import os
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+DB_NAME = "tech_trends"
+FACTS_COLLECTION = "student_subject_facts"
+
+
+def _contar_status(status):
+    return {"$sum": {"$cond": [{"$eq": ["$Status", status]}, 1, 0]}}
+
+
+def pipeline_fatos(atualizado_em, student_ids=None):
+    """Pipeline que agrega performance + coleções relacionadas e grava via $merge"""
+    filtro = {"Student_ID": {"$in": sorted(student_ids)}} if student_ids else {}
+    return [
+        {"$match": filtro},
+        {"$group": {
+            "_id": {"Student_ID": "$Student_ID", "Subject": "$Subject"},
+            "Exam_Score": {"$avg": "$Exam_Score"},
+            "Exam_Count": {"$sum": 1},
+            "Homework_Completion": {"$avg": "$Homework_Completion_%"},
+        }},
+        # Lookups usam o índice em Student_ID; o filtro de disciplina roda no subpipeline
+        {"$lookup": {
+            "from": "homework",
+            "localField": "_id.Student_ID",
+            "foreignField": "Student_ID",
+            "let": {"subject": "$_id.Subject"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$Subject", "$$subject"]}}},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "done": _contar_status("done"),
+                    "not_done": _contar_status("not_done"),
+                    "pending": _contar_status("pending"),
+                }},
+            ],
+            "as": "homework",
+        }},
+        {"$lookup": {
+            "from": "teacher_parent_communication",
+            "localField": "_id.Student_ID",
+            "foreignField": "Student_ID",
+            "pipeline": [{"$group": {"_id": None, "last": {"$max": "$Date"}}}],
+            "as": "communication",
+        }},
+        {"$lookup": {
+            "from": "attendance",
+            "localField": "_id.Student_ID",
+            "foreignField": "Student_ID",
+            "let": {"subject": "$_id.Subject"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$Subject", "$$subject"]}}},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "present": {"$sum": {"$cond": [{"$eq": ["$Attendance_Status", "Present"]}, 1, 0]}},
+                }},
+            ],
+            "as": "attendance",
+        }},
+        {"$set": {
+            "homework": {"$first": "$homework"},
+            "communication": {"$first": "$communication"},
+            "attendance": {"$first": "$attendance"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "Student_ID": "$_id.Student_ID",
+            "Subject": "$_id.Subject",
+            "Exam_Score": 1,
+            "Exam_Count": 1,
+            "Homework_Completion": 1,
+            "Homework_Total": {"$ifNull": ["$homework.total", 0]},
+            "Homework_Status": {
+                "done": {"$ifNull": ["$homework.done", 0]},
+                "not_done": {"$ifNull": ["$homework.not_done", 0]},
+                "pending": {"$ifNull": ["$homework.pending", 0]},
+            },
+            "Last_Communication": {"$ifNull": ["$communication.last", None]},
+            "Attendance_Ratio": {"$cond": [
+                {"$gt": [{"$ifNull": ["$attendance.total", 0]}, 0]},
+                {"$divide": ["$attendance.present", "$attendance.total"]},
+                None,
+            ]},
+            "Updated_At": {"$literal": atualizado_em},
+        }},
+        {"$merge": {
+            "into": FACTS_COLLECTION,
+            "on": ["Student_ID", "Subject"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+def refresh_facts(db, student_ids=None):
+    """Atualiza a visão (toda ou só dos alunos informados) e remove fatos obsoletos"""
+    # $merge exige índice único nos campos de "on" (ver indexes.INDEXES)
+    db[FACTS_COLLECTION].create_index([("Student_ID", 1), ("Subject", 1)], unique=True,
+                                      name="student_subject")
+    atualizado_em = datetime.now(timezone.utc)
+    db.performance.aggregate(pipeline_fatos(atualizado_em, student_ids))
+
+    obsoletos = {"Updated_At": {"$lt": atualizado_em}}
+    if student_ids:
+        obsoletos["Student_ID"] = {"$in": sorted(student_ids)}
+    removidos = db[FACTS_COLLECTION].delete_many(obsoletos).deleted_count
+    total = db[FACTS_COLLECTION].count_documents({"Updated_At": atualizado_em})
+    return total, removidos
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGODB_URI"))
+    try:
+        total, removidos = refresh_facts(client[DB_NAME])
+        print(f"✅ '{FACTS_COLLECTION}': {total} registros atualizados, {removidos} removidos")
+    finally:
+        client.close()
@@ -0,0 +1,223 @@
+"""Índices de cada coleção e verificação dos planos de consulta da API.
+
+Uso:
+    python indexes.py criar       # cria os índices (idempotente)
+    python indexes.py verificar   # falha se alguma consulta da API fizer COLLSCAN ou ordenar em memória
+"""
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, TEXT, IndexModel, MongoClient
+from pymongo.errors import OperationFailure
+
+DB_NAME = "tech_trends"
+# Idioma dos textos livres (stemming e stop words dos índices de texto e das buscas)
+IDIOMA_TEXTO = "english"
+
+# Índices compostos seguindo a regra igualdade -> ordenação -> intervalo (ESR). As listagens
+# paginam por _id (paginacao.py): os índices *_id_* as atendem sem ordenar em memória;
+# os demais servem /stats, exportações e buscas por aluno
+INDEXES = {
+    "performance": [
+        IndexModel([("Subject", ASCENDING), ("Exam_Score", ASCENDING)], name="subject_exam"),
+        IndexModel([("Exam_Score", ASCENDING)], name="exam"),
+        IndexModel([("Subject", ASCENDING), ("Homework_Completion_%", ASCENDING)], name="subject_completion"),
+        IndexModel([("Homework_Completion_%", ASCENDING)], name="completion"),
+        IndexModel([("Student_ID", ASCENDING), ("Subject", ASCENDING)], name="student_subject"),
+        IndexModel([("Subject", ASCENDING), ("_id", ASCENDING), ("Exam_Score", ASCENDING)],
+                   name="subject_id_exam"),
+        IndexModel([("_id", ASCENDING), ("Exam_Score", ASCENDING)], name="id_exam"),
+        IndexModel([("Subject", ASCENDING), ("_id", ASCENDING), ("Homework_Completion_%", ASCENDING)],
+                   name="subject_id_completion"),
+        IndexModel([("_id", ASCENDING), ("Homework_Completion_%", ASCENDING)], name="id_completion"),
+        # Busca textual (/search/comments); no máximo um índice de texto por coleção
+        IndexModel([("Teacher_Comments", TEXT)], name="comments_text", default_language=IDIOMA_TEXTO),
+        # Watermark do ETL incremental (etl_pandas.py --modo incremental)
+        IndexModel([("_ingest_ts", ASCENDING), ("_id", ASCENDING)], name="ingest_ts"),
+    ],
+    "attendance": [
+        IndexModel([("Attendance_Status", ASCENDING), ("Date", ASCENDING)], name="status_date"),
+        IndexModel([("Date", ASCENDING)], name="date"),
+        IndexModel([("Student_ID", ASCENDING)], name="student"),
+        IndexModel([("Attendance_Status", ASCENDING), ("_id", ASCENDING), ("Date", ASCENDING)],
+                   name="status_id_date"),
+        IndexModel([("_id", ASCENDING), ("Date", ASCENDING)], name="id_date"),
+    ],
+    "homework": [
+        # Só a listagem /homework filtra tarefas: índices já na ordem da paginação
+        IndexModel([("Subject", ASCENDING), ("Status", ASCENDING), ("_id", ASCENDING),
+                    ("Grade_Feedback", ASCENDING)], name="subject_status_id_grade"),
+        IndexModel([("Subject", ASCENDING), ("_id", ASCENDING), ("Grade_Feedback", ASCENDING)],
+                   name="subject_id_grade"),
+        IndexModel([("Status", ASCENDING), ("_id", ASCENDING), ("Grade_Feedback", ASCENDING)],
+                   name="status_id_grade"),
+        IndexModel([("_id", ASCENDING), ("Grade_Feedback", ASCENDING)], name="id_grade"),
+        IndexModel([("Student_ID", ASCENDING)], name="student"),
+    ],
+    "students": [
+        IndexModel([("Grade_Level", ASCENDING), ("_id", ASCENDING)], name="grade_level_id"),
+        IndexModel([("Student_ID", ASCENDING)], name="student"),
+    ],
+    "teacher_parent_communication": [
+        IndexModel([("Message_Type", ASCENDING), ("Date", ASCENDING)], name="type_date"),
+        IndexModel([("Date", ASCENDING)], name="date"),
+        IndexModel([("Student_ID", ASCENDING)], name="student"),
+        IndexModel([("Message_Content", TEXT)], name="content_text", default_language=IDIOMA_TEXTO),
+        IndexModel([("Message_Type", ASCENDING), ("_id", ASCENDING), ("Date", ASCENDING)],
+                   name="type_id_date"),
+        IndexModel([("_id", ASCENDING), ("Date", ASCENDING)], name="id_date"),
+    ],
+    "student_subject_facts": [
+        # Único: exigido pelo $merge de facts.py
+        IndexModel([("Student_ID", ASCENDING), ("Subject", ASCENDING)], name="student_subject", unique=True),
+        IndexModel([("Subject", ASCENDING), ("Homework_Completion", ASCENDING)], name="subject_completion"),
+        IndexModel([("Homework_Completion", ASCENDING)], name="completion"),
+        IndexModel([("Subject", ASCENDING), ("_id", ASCENDING), ("Homework_Completion", ASCENDING)],
+                   name="subject_id_completion"),
+        IndexModel([("_id", ASCENDING), ("Homework_Completion", ASCENDING)], name="id_completion"),
+    ],
+    "performance_scores": [
+        # Chave natural de performance: cada upsert do ETL acha o documento pelo índice
+        IndexModel([("Student_ID", ASCENDING), ("Subject", ASCENDING), ("Exam_Score", ASCENDING),
+                    ("Homework_Completion_%", ASCENDING), ("Teacher_Comments", ASCENDING)],
+                   name="chave_natural", unique=True),
+        IndexModel([("Subject", ASCENDING), ("Final_Score", ASCENDING)], name="subject_final"),
+        IndexModel([("Final_Score", ASCENDING)], name="final"),
+        IndexModel([("Subject", ASCENDING), ("_id", ASCENDING), ("Final_Score", ASCENDING)],
+                   name="subject_id_final"),
+        IndexModel([("_id", ASCENDING), ("Final_Score", ASCENDING)], name="id_final"),
+    ],
+    # Destinos Mongo dos pipelines de pipeline.py (upsert pela chave)
+    "homework_by_student": [
+        IndexModel([("Student_ID", ASCENDING), ("Subject", ASCENDING)], name="student_subject", unique=True),
+    ],
+    "attendance_by_student": [
+        IndexModel([("Student_ID", ASCENDING), ("Subject", ASCENDING)], name="student_subject", unique=True),
+    ],
+    "communications_by_month": [
+        IndexModel([("Mes", ASCENDING), ("Message_Type", ASCENDING)], name="mes_tipo", unique=True),
+    ],
+}
+
+# Formato de cada consulta filtrada emitida pelos endpoints (valores são apenas exemplos)
+QUERY_SHAPES = [
+    ("/performance", "performance", {"Subject": "Math", "Exam_Score": {"$gte": 70}}),
+    ("/performance", "performance", {"Exam_Score": {"$gte": 70}}),
+    ("/performance", "performance", {"Subject": "Math"}),
+    ("etl_pandas.py (incremental)", "performance", {"_ingest_ts": {"$in": [datetime(2025, 1, 1)]}}),
+    ("/performance/homework-completion", "performance",
+     {"Subject": "Math", "Homework_Completion_%": {"$gte": 80}}),
+    ("/performance/homework-completion", "performance", {"Homework_Completion_%": {"$gte": 80}}),
+    ("/attendance", "attendance",
+     {"Date": {"$gte": datetime(2024, 9, 1), "$lte": datetime(2024, 9, 30)}, "Attendance_Status": "Present"}),
+    ("/attendance", "attendance", {"Date": {"$gte": datetime(2024, 9, 1), "$lte": datetime(2024, 9, 30)}}),
+    ("/attendance", "attendance", {"Attendance_Status": "Absent"}),
+    ("/homework", "homework", {"Subject": "Math", "Status": "done", "Grade_Feedback": {"$regex": "^A"}}),
+    ("/homework", "homework", {"Status": "done"}),
+    ("/homework", "homework", {"Subject": "Math"}),
+    ("/homework", "homework", {"Grade_Feedback": {"$regex": "^B"}}),
+    ("/students", "students", {"Grade_Level": "Grade 3"}),
+    ("/communications", "teacher_parent_communication",
+     {"Message_Type": "Parent to Teacher", "Date": {"$gte": datetime(2024, 9, 1)}}),
+    ("/communications", "teacher_parent_communication", {"Date": {"$gte": datetime(2024, 9, 1)}}),
+    ("/performance/combined", "student_subject_facts",
+     {"Subject": "Math", "Homework_Completion": {"$gte": 80}}),
+    ("/performance/combined", "student_subject_facts", {"Homework_Completion": {"$gte": 80}}),
+    ("/performance/scores", "performance_scores", {"Subject": "Math", "Final_Score": {"$gte": 60, "$lte": 90}}),
+    ("/performance/scores", "performance_scores", {"Final_Score": {"$gte": 60}}),
+    ("/performance/scores", "performance_scores", {"Subject": "Math"}),
+    ("/students/{id}/profile", "students", {"Student_ID": "S00001"}),
+    ("/students/{id}/profile", "performance", {"Student_ID": "S00001"}),
+    ("/students/{id}/profile", "performance_scores", {"Student_ID": "S00001"}),
+    ("/students/{id}/profile", "student_subject_facts", {"Student_ID": "S00001"}),
+    ("/students/{id}/profile", "attendance", {"Student_ID": "S00001"}),
+    ("/students/profiles", "homework", {"Student_ID": {"$in": ["S00001", "S00002"]}}),
+    ("/search/comments", "performance", {"$text": {"$search": "attention"}, "Subject": "Math"}),
+    ("/search/communications", "teacher_parent_communication",
+     {"$text": {"$search": "conference"}, "Date": {"$gte": datetime(2024, 9, 1)}}),
+    ("facts.py ($lookup)", "homework", {"Student_ID": "S00001"}),
+    ("facts.py ($lookup)", "teacher_parent_communication", {"Student_ID": "S00001"}),
+]
+
+# Ordenação das consultas de cada endpoint; listagens paginam por cursor em _id (paginacao.py)
+ORDENACAO = {
+    endpoint: [("_id", ASCENDING)]
+    for endpoint in ("/performance", "/performance/homework-completion", "/attendance", "/homework", "/students",
+                     "/communications", "/performance/combined", "/performance/scores")
+}
+
+
+def ensure_indexes(db):
+    """Cria os índices declarados; índices já existentes com a mesma definição são ignorados"""
+    criados = {}
+    for collection_name, modelos in INDEXES.items():
+        try:
+            criados[collection_name] = db[collection_name].create_indexes(modelos)
+        except OperationFailure as e:
+            # Ex.: índice com mesmo nome e definição diferente criado manualmente
+            print(f"⚠️ Índices de '{collection_name}' não criados: {e.details.get('errmsg', e)}")
+    return criados
+
+
+async def ensure_indexes_async(db):
+    """Mesmo que ensure_indexes, para um banco do motor (usado no lifespan da API)"""
+    criados = {}
+    for collection_name, modelos in INDEXES.items():
+        try:
+            criados[collection_name] = await db[collection_name].create_indexes(modelos)
+        except OperationFailure as e:
+            print(f"⚠️ Índices de '{collection_name}' não criados: {e.details.get('errmsg', e)}")
+    return criados
+
+
+def _estagios(plano):
+    """Percorre recursivamente os estágios de um plano de execução"""
+    yield plano.get("stage")
+    for chave in ("inputStage", "queryPlan"):
+        if chave in plano:
+            yield from _estagios(plano[chave])
+    for filho in plano.get("inputStages", []):
+        yield from _estagios(filho)
+
+
+def check_query_plans(db):
+    """Executa explain() de cada formato de consulta, com a ordenação do endpoint
+
+    Retorna os que fazem COLLSCAN ou ordenam em memória (estágio SORT).
+    """
+    falhas = []
+    for endpoint, collection_name, filtro in QUERY_SHAPES:
+        cursor = db[collection_name].find(filtro)
+        if endpoint in ORDENACAO:
+            cursor = cursor.sort(ORDENACAO[endpoint])
+        plano = cursor.explain()["queryPlanner"]["winningPlan"]
+        estagios = [e for e in _estagios(plano) if e]
+        problemas = [e for e in ("COLLSCAN", "SORT") if e in estagios]
+        if problemas:
+            falhas.append((endpoint, collection_name, filtro))
+        status = f"❌ {'+'.join(problemas)}" if problemas else "✅"
+        print(f"{status} {endpoint} [{collection_name}] {' > '.join(estagios)}")
+    return falhas
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    comando = sys.argv[1] if len(sys.argv) > 1 else "criar"
+    if comando not in ("criar", "verificar"):
+        sys.exit("Uso: python indexes.py [criar|verificar]")
+
+    client = MongoClient(os.getenv("MONGODB_URI"))
+    try:
+        db = client[DB_NAME]
+        if comando == "criar":
+            for nome, indices in ensure_indexes(db).items():
+                print(f"✅ {nome}: {', '.join(indices)}")
+        else:
+            falhas = check_query_plans(db)
+            if falhas:
+                sys.exit(f"\n⛔ {len(falhas)} consulta(s) sem índice de suporte")
+            print("\n🎉 Todas as consultas usam índice")
+    finally:
+        client.close()
@@ -1,11 +1,24 @@
 import os
 import sys
 import io
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.server_api import ServerApi
 from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
 
+from cache_csv import ler_blocos, ler_csv
+from cargas import registrar_carga
+from facts import FACTS_COLLECTION, refresh_facts
+from invalidacao import publicar_alteracao
+from schema import NATURAL_KEYS, avisar_anulados, limpar_chunk, normalizar
+
 # Configuração para evitar erros de encoding
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
@@ -16,6 +29,13 @@ DB_NAME = "tech_trends"
 # Caminho relativo (a partir da raiz do projeto)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")  # Pasta 'data' na mesma pasta do script
 
+# Parâmetros do modo streaming (podem ser sobrescritos via linha de comando)
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+MAX_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+
+# Modo incremental: checkpoint por arquivo; chaves naturais para upsert em schema.NATURAL_KEYS
+MANIFEST_PATH = os.path.join(DATA_DIR, ".ingest_manifest.json")
+
 def test_connection():
     try:
         client = MongoClient(uri, server_api=ServerApi('1'))
@@ -39,35 +59,360 @@ def ingest_csv_to_mongodb(client):
         print(f"📝 Arquivos encontrados: {os.listdir(DATA_DIR)}")
         
         db = client[DB_NAME]
+        gravadas = []
+        # Marca de tempo da carga: watermark usado pelo ETL incremental
+        carga = datetime.now(timezone.utc)
         
-        for filename in sorted(os.listdir(DATA_DIR)):  # Ordena os arquivos
-            if filename.endswith(".csv"):
-                csv_path = os.path.join(DATA_DIR, filename)
-                collection_name = os.path.splitext(filename)[0]
+        with registrar_carga(db, carga) as registro:
+            for filename in sorted(os.listdir(DATA_DIR)):  # Ordena os arquivos
+                if filename.endswith(".csv"):
+                    csv_path = os.path.join(DATA_DIR, filename)
+                    collection_name = os.path.splitext(filename)[0]
                 
-                try:
-                    print(f"\n🔍 Processando: {filename}")
-                    df = pd.read_csv(csv_path)
-                    print(f"📊 Registros no arquivo: {len(df)}")
+                    try:
+                        print(f"\n🔍 Processando: {filename}")
+                        df = ler_csv(csv_path)
+                        print(f"📊 Registros no arquivo: {len(df)}")
                     
-                    # Pré-processamento
-                    df = df.dropna().reset_index(drop=True)
-                    df = df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
+                        # Pré-processamento
+                        df = df.dropna().reset_index(drop=True)
+                        df = df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
+                        df, anulados = normalizar(collection_name, df)
+                        avisar_anulados(collection_name, anulados)
                     
-                    # Conversão e inserção
-                    data = df.to_dict("records")
-                    result = db[collection_name].insert_many(data)
-                    print(f"✅ Inseridos em '{collection_name}': {len(result.inserted_ids)} registros")
+                        # Conversão e inserção
+                        df["_ingest_ts"] = carga
+                        data = df.to_dict("records")
+                        result = db[collection_name].insert_many(data)
+                        print(f"✅ Inseridos em '{collection_name}': {len(result.inserted_ids)} registros")
+                        gravadas.append(collection_name)
+                        registro["colecoes"].add(collection_name)
                     
-                except pd.errors.EmptyDataError:
-                    print(f"⚠️ Arquivo vazio: {filename}")
-                except Exception as e:
-                    print(f"⚠️ Erro no arquivo {filename}: {str(e)}")
+                    except pd.errors.EmptyDataError:
+                        print(f"⚠️ Arquivo vazio: {filename}")
+                    except Exception as e:
+                        print(f"⚠️ Erro no arquivo {filename}: {str(e)}")
+
+            atualizar_fatos(db, gravadas)
                     
     except Exception as e:
         print(f"🔥 Erro crítico: {str(e)}")
 
+def atualizar_fatos(db, colecoes, student_ids=None):
+    """Etapa pós-ingestão: atualiza a visão (ver facts.py) e sinaliza as coleções gravadas à API"""
+    if not colecoes:
+        return
+    escopo = f"{len(student_ids)} alunos" if student_ids else "completa"
+    print(f"\n🧮 Atualizando visão por aluno/disciplina ({escopo})...")
+    total, removidos = refresh_facts(db, student_ids)
+    print(f"✅ Visão atualizada: {total} registros, {removidos} obsoletos removidos")
+    publicar_alteracao(db, *colecoes, FACTS_COLLECTION)
+
+def _inserir_lote(collection, registros):
+    """Insere um lote sem ordem garantida; retorna quantos documentos entraram"""
+    try:
+        result = collection.insert_many(registros, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Com ordered=False o servidor continua após erros individuais
+        print(f"⚠️ Lote parcial em '{collection.name}': {len(e.details['writeErrors'])} erros")
+        return e.details["nInserted"]
+
+class EscritorEmLote:
+    """Pool limitado de escritores concorrentes, compartilhado entre todos os arquivos"""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pendentes=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        # Limita quantos lotes ficam em memória aguardando escrita
+        self._vagas = threading.BoundedSemaphore(max_pendentes or max_workers * 2)
+        self._lock = threading.Lock()
+        self._futuros = []
+        self.totais = {}
+        self.erros = {}
+
+    def enviar(self, collection, funcao, *args):
+        """Agenda a escrita de um lote; bloqueia se o pool estiver saturado"""
+        self._vagas.acquire()
+        futuro = self._executor.submit(funcao, collection, *args)
+        futuro.add_done_callback(lambda f: self._concluir(collection.name, f))
+        self._futuros.append(futuro)
+
+    def _concluir(self, nome, futuro):
+        self._vagas.release()
+        with self._lock:
+            if futuro.exception() is not None:
+                self.erros.setdefault(nome, []).append(str(futuro.exception()))
+            else:
+                self.totais[nome] = self.totais.get(nome, 0) + futuro.result()
+
+    def fechar(self):
+        """Aguarda todos os lotes pendentes e encerra o pool"""
+        self._executor.shutdown(wait=True)
+        return self.totais
+
+def ingest_csv_streaming(client, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """Lê os CSVs em blocos e grava lotes não ordenados em paralelo"""
+    if not os.path.exists(DATA_DIR):
+        raise FileNotFoundError(f"Pasta 'data' não encontrada em: {os.path.abspath(DATA_DIR)}")
+
+    print(f"📂 Pasta de dados: {os.path.abspath(DATA_DIR)}")
+    print(f"⚙️ Lote: {batch_size} registros | Escritores: {max_workers}")
+
+    db = client[DB_NAME]
+    escritor = EscritorEmLote(max_workers=max_workers)
+    carga = datetime.now(timezone.utc)
+    lidos = 0
+    inicio = time.perf_counter()
+
+    with registrar_carga(db, carga) as registro:
+        try:
+            for filename in sorted(os.listdir(DATA_DIR)):
+                if not filename.endswith(".csv"):
+                    continue
+                csv_path = os.path.join(DATA_DIR, filename)
+                collection = db[os.path.splitext(filename)[0]]
+                print(f"\n🔍 Processando: {filename}")
+
+                try:
+                    for chunk in ler_blocos(csv_path, batch_size):
+                        chunk = limpar_chunk(chunk, collection.name)
+                        if chunk.empty:
+                            continue
+                        lidos += len(chunk)
+                        chunk["_ingest_ts"] = carga
+                        escritor.enviar(collection, _inserir_lote, chunk.to_dict("records"))
+                except pd.errors.EmptyDataError:
+                    print(f"⚠️ Arquivo vazio: {filename}")
+        finally:
+            totais = escritor.fechar()
+        registro["colecoes"].update(totais)
+
+        duracao = time.perf_counter() - inicio
+        inseridos = sum(totais.values())
+        for nome, total in sorted(totais.items()):
+            print(f"✅ Inseridos em '{nome}': {total} registros")
+        for nome, erros in escritor.erros.items():
+            for erro in erros:
+                print(f"⚠️ Erro no lote de '{nome}': {erro}")
+        print(f"\n⏱️ {inseridos} de {lidos} registros em {duracao:.2f}s "
+              f"({inseridos / duracao if duracao else 0:,.0f} registros/s)")
+        atualizar_fatos(db, list(totais))
+    return totais
+
+def carregar_manifesto():
+    """Lê o checkpoint da última ingestão incremental (vazio se não existir)"""
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def salvar_manifesto(manifesto):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def _fim_ultima_linha(csv_path, tamanho):
+    """Offset logo após a última quebra de linha (ignora linha final incompleta)"""
+    with open(csv_path, "rb") as f:
+        posicao = tamanho
+        while posicao > 0:
+            inicio = max(0, posicao - 65536)
+            f.seek(inicio)
+            bloco = f.read(posicao - inicio)
+            idx = bloco.rfind(b"\n")
+            if idx != -1:
+                return inicio + idx + 1
+            posicao = inicio
+    return 0
+
+def _hash_prefixo(csv_path, offset):
+    """SHA-256 dos primeiros `offset` bytes do arquivo"""
+    sha = hashlib.sha256()
+    restante = offset
+    with open(csv_path, "rb") as f:
+        while restante > 0:
+            bloco = f.read(min(1 << 20, restante))
+            if not bloco:
+                break
+            sha.update(bloco)
+            restante -= len(bloco)
+    return sha.hexdigest()
+
+def assinatura_arquivo(csv_path):
+    """Tamanho, mtime, offset da última linha completa e hash até esse offset"""
+    stat = os.stat(csv_path)
+    offset = _fim_ultima_linha(csv_path, stat.st_size)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "offset": offset,
+        "sha256": _hash_prefixo(csv_path, offset),
+    }
+
+def classificar_arquivo(csv_path, anterior):
+    """Decide como ingerir: 'novo', 'inalterado', 'anexado' ou 'alterado'"""
+    if not anterior:
+        return "novo"
+    stat = os.stat(csv_path)
+    if stat.st_size == anterior["size"] and stat.st_mtime == anterior["mtime"]:
+        return "inalterado"
+    if stat.st_size >= anterior["offset"] and _hash_prefixo(csv_path, anterior["offset"]) == anterior["sha256"]:
+        # Prefixo idêntico: só há linhas novas depois do último checkpoint
+        return "inalterado" if stat.st_size == anterior["offset"] else "anexado"
+    return "alterado"
+
+def _linha_incompleta(csv_path, offset):
+    """1 se há uma linha sem quebra depois de `offset` (o fim do arquivo), 0 caso contrário"""
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        return 1 if f.read().strip() else 0
+
+def _garantir_indice_chave(collection, chave):
+    """Índice na chave natural; "chave_natural" é recriado se NATURAL_KEYS mudou desde a criação"""
+    especificacao = [(campo, 1) for campo in chave]
+    # Direções numéricas podem vir como float (1.0); índices de texto trazem "text"
+    indices = {nome: [(campo, ordem if isinstance(ordem, str) else int(ordem)) for campo, ordem in info["key"]]
+               for nome, info in collection.index_information().items()}
+    if especificacao in indices.values():
+        # Já atendida (pelo próprio chave_natural ou por um índice de indexes.py)
+        return
+    if "chave_natural" in indices:
+        print(f"♻️ Chave natural de '{collection.name}' mudou: recriando o índice chave_natural")
+        collection.drop_index("chave_natural")
+    collection.create_index(especificacao, name="chave_natural")
+
+def _upsert_lote(collection, registros, chave, carga):
+    """Upsert não ordenado por chave natural; erros propagam para o escritor"""
+    operacoes = [
+        UpdateOne({campo: registro[campo] for campo in chave},
+                  {"$set": {**registro, "_ingest_ts": carga}},
+                  upsert=True)
+        for registro in registros
+    ]
+    result = collection.bulk_write(operacoes, ordered=False)
+    return result.matched_count + result.upserted_count
+
+def _ler_blocos(csv_path, estado, anterior, batch_size):
+    """Itera blocos do arquivo inteiro ou apenas dos bytes após o checkpoint"""
+    if estado != "anexado":
+        yield from ler_blocos(csv_path, batch_size)
+        return
+    with open(csv_path, "rb") as f:
+        f.seek(anterior["offset"])
+        yield from pd.read_csv(f, header=None, names=anterior["colunas"], chunksize=batch_size)
+
+def ingest_csv_incremental(client, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """Ingere apenas arquivos novos/alterados e linhas anexadas, com upsert por chave natural"""
+    if not os.path.exists(DATA_DIR):
+        raise FileNotFoundError(f"Pasta 'data' não encontrada em: {os.path.abspath(DATA_DIR)}")
+
+    db = client[DB_NAME]
+    manifesto = carregar_manifesto()
+    carga = datetime.now(timezone.utc)
+    escritor = EscritorEmLote(max_workers=max_workers)
+    pendentes = {}
+    alunos = set()
+    lidos = 0
+    inicio = time.perf_counter()
+
+    with registrar_carga(db, carga) as registro:
+        try:
+            for filename in sorted(os.listdir(DATA_DIR)):
+                if not filename.endswith(".csv"):
+                    continue
+                csv_path = os.path.join(DATA_DIR, filename)
+                nome = os.path.splitext(filename)[0]
+                anterior = manifesto.get(filename)
+                estado = classificar_arquivo(csv_path, anterior)
+                print(f"\n🔍 {filename}: {estado}")
+
+                if estado == "inalterado":
+                    # Atualiza mtime/tamanho para evitar recalcular o hash na próxima execução
+                    if anterior["size"] != os.path.getsize(csv_path) or anterior["mtime"] != os.path.getmtime(csv_path):
+                        pendentes[filename] = (nome, estado, {**anterior, **assinatura_arquivo(csv_path)})
+                    continue
+
+                assinatura = assinatura_arquivo(csv_path)
+                collection = db[nome]
+                colunas = None
+                linhas = anterior["rows"] if estado == "anexado" else 0
+                lidas = 0
+
+                try:
+                    for chunk in _ler_blocos(csv_path, estado, anterior, batch_size):
+                        if colunas is None:
+                            colunas = list(chunk.columns)
+                            chave = NATURAL_KEYS.get(nome, colunas)
+                            # Sem índice na chave cada upsert seria uma varredura completa
+                            _garantir_indice_chave(collection, chave)
+                        lidas += len(chunk)
+                        chunk = limpar_chunk(chunk, nome)
+                        if chunk.empty:
+                            continue
+                        lidos += len(chunk)
+                        if "Student_ID" in chunk.columns:
+                            alunos.update(chunk["Student_ID"].unique())
+                        escritor.enviar(collection, _upsert_lote, chunk.to_dict("records"), chave, carga)
+                except pd.errors.EmptyDataError:
+                    print(f"⚠️ Arquivo vazio: {filename}")
+                    continue
+
+                if lidas:
+                    # A linha final sem quebra foi lida, mas fica depois do checkpoint e volta na próxima execução
+                    lidas -= _linha_incompleta(csv_path, assinatura["offset"])
+                assinatura.update({"rows": linhas + lidas, "colunas": colunas or (anterior or {}).get("colunas", [])})
+                pendentes[filename] = (nome, estado, assinatura)
+        finally:
+            totais = escritor.fechar()
+
+        completos = False
+        gravadas = sorted(set(totais) | {nome for nome, estado, _ in pendentes.values() if estado != "inalterado"})
+        registro["colecoes"].update(gravadas)
+        for filename, (nome, estado, assinatura) in pendentes.items():
+            if estado in ("novo", "alterado"):
+                completos = True
+            if nome in escritor.erros:
+                for erro in escritor.erros[nome]:
+                    print(f"⚠️ Erro no lote de '{nome}': {erro}")
+                print(f"⛔ Checkpoint de {filename} mantido; arquivo será reprocessado")
+                continue
+            if estado in ("novo", "alterado"):
+                # Carga completa: remove documentos que não vieram desta execução
+                registro["substituidas"].add(nome)
+                removidos = db[nome].delete_many({"_ingest_ts": {"$ne": carga}}).deleted_count
+                if removidos:
+                    print(f"🧹 Removidos de '{nome}': {removidos} documentos obsoletos")
+            manifesto[filename] = assinatura
+        salvar_manifesto(manifesto)
+
+        duracao = time.perf_counter() - inicio
+        for nome, total in sorted(totais.items()):
+            print(f"✅ Upserts em '{nome}': {total} registros")
+        print(f"\n⏱️ {lidos} registros em {duracao:.2f}s "
+              f"({lidos / duracao if duracao else 0:,.0f} registros/s)")
+        # Recargas completas podem remover alunos: nesse caso a visão é reconstruída inteira
+        if completos:
+            atualizar_fatos(db, gravadas)
+        elif alunos:
+            atualizar_fatos(db, gravadas, alunos)
+    return totais
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingestão dos CSVs de DATA_DIR no MongoDB")
+    parser.add_argument("--modo", choices=["completo", "stream", "incremental"], default="completo",
+                        help="completo: um insert_many por arquivo | stream: blocos em paralelo | "
+                             "incremental: só arquivos/linhas novos, com upsert")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Registros por bloco lido e por lote gravado (modos stream/incremental)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Escritores concorrentes compartilhados entre os arquivos (modos stream/incremental)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+
     print("\n" + "="*50)
     print(" INGESTÃO DE DADOS - MONGODB ".center(50, "~"))
     print("="*50 + "\n")
@@ -76,7 +421,12 @@ if __name__ == "__main__":
     
     if mongo_client:
         try:
-            ingest_csv_to_mongodb(mongo_client)
+            if args.modo == "stream":
+                ingest_csv_streaming(mongo_client, args.batch_size, args.workers)
+            elif args.modo == "incremental":
+                ingest_csv_incremental(mongo_client, args.batch_size, args.workers)
+            else:
+                ingest_csv_to_mongodb(mongo_client)
         except KeyboardInterrupt:
             print("\n⛔ Processo interrompido pelo usuário")
         finally:
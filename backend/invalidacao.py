@@ -0,0 +1,84 @@
+"""Sinal de alteração de coleções entre processos (ingestão/ETL -> API).
+
+Quem grava numa coleção incrementa a versão dela em `collection_versions`.
+A API consulta essas versões periodicamente (uma leitura pequena) e avisa
+os interessados — dimensões, snapshots — sobre as coleções que mudaram. As
+versões novas só passam a valer (e a compor as chaves do cache de respostas)
+depois que todos terminam: enquanto um snapshot é recarregado, respostas
+montadas com os dados antigos continuam sob as chaves antigas.
+"""
+import asyncio
+import os
+
+VERSIONS_COLLECTION = "collection_versions"
+POLL_SECONDS = float(os.getenv("CACHE_POLL_SECONDS", "5"))
+
+
+def publicar_alteracao(db, *collection_names):
+    """Marca coleções como alteradas (cliente pymongo síncrono)"""
+    for nome in collection_names:
+        db[VERSIONS_COLLECTION].update_one(
+            {"_id": nome},
+            {"$inc": {"versao": 1}, "$currentDate": {"atualizado_em": True}},
+            upsert=True
+        )
+
+
+class MonitorVersoes:
+    """Acompanha as versões das coleções e notifica quem se inscreveu"""
+
+    def __init__(self, intervalo=POLL_SECONDS):
+        self.intervalo = intervalo
+        self.versoes = {}
+        self._inicializado = False
+        self._ouvintes = []
+        self._tarefa = None
+
+    def inscrever(self, callback):
+        """callback(colecoes_alteradas: set) — pode ser função comum ou corrotina"""
+        self._ouvintes.append(callback)
+
+    def versao(self, collection_name):
+        return self.versoes.get(collection_name, 0)
+
+    async def atualizar(self, db):
+        """Lê as versões atuais; retorna o conjunto de coleções alteradas"""
+        atuais = {}
+        async for doc in db[VERSIONS_COLLECTION].find({}, {"versao": 1}):
+            atuais[doc["_id"]] = doc["versao"]
+        # Na primeira leitura só registra o estado, sem notificar
+        if not self._inicializado:
+            self.versoes = atuais
+            self._inicializado = True
+            return set()
+        alteradas = {nome for nome in atuais.keys() | self.versoes.keys()
+                     if self.versoes.get(nome) != atuais.get(nome)}
+        for callback in self._ouvintes if alteradas else []:
+            try:
+                resultado = callback(alteradas)
+                if asyncio.iscoroutine(resultado):
+                    await resultado
+            except Exception as e:
+                # Um ouvinte com erro não impede os demais nem a troca de versão
+                print(f"⚠️ Falha ao notificar alteração de {sorted(alteradas)}: {e!r}")
+        self.versoes = atuais
+        return alteradas
+
+    async def _loop(self, db):
+        while True:
+            try:
+                await self.atualizar(db)
+            except Exception as e:
+                print(f"⚠️ Falha ao ler versões das coleções: {e!r}")
+            await asyncio.sleep(self.intervalo)
+
+    def iniciar(self, db):
+        self._tarefa = asyncio.create_task(self._loop(db))
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,89 @@
+"""Execução de várias consultas GET numa só requisição (POST /batch).
+
+Cada subconsulta é despachada para a própria aplicação ASGI, sem passar
+pela rede, então atravessa os mesmos middlewares (cache com ETag, CORS)
+e validações de parâmetros dos endpoints originais. As subconsultas rodam
+em paralelo e os corpos JSON são concatenados como vieram, sem desserializar.
+"""
+import asyncio
+import os
+from urllib.parse import urlencode
+
+from respostas import dumps
+
+MAX_CONSULTAS = int(os.getenv("BATCH_MAX_CONSULTAS", "20"))
+TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", "30"))
+
+# Respostas binárias ou em streaming não cabem num JSON combinado
+_BLOQUEADOS = ("/batch", "/export", "/docs", "/redoc", "/openapi.json")
+
+
+def validar(path, params):
+    """Mensagem de erro se a subconsulta não puder ser executada em lote, senão None"""
+    if not path.startswith("/") or any(path == p or path.startswith(p + "/") for p in _BLOQUEADOS):
+        return f"Caminho não permitido em lote: {path}"
+    if params.get("formato") == "ndjson":
+        return "formato=ndjson não é suportado em lote"
+    return None
+
+
+async def _chamar(app, path, params):
+    """GET interno via ASGI; retorna (status, corpo em bytes)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params, doseq=True).encode(),
+        "headers": [(b"host", b"batch")],
+        "client": ("127.0.0.1", 0),
+        "server": ("batch", 80),
+    }
+    inicio = {}
+    partes = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensagem):
+        if mensagem["type"] == "http.response.start":
+            inicio["status"] = mensagem["status"]
+            inicio["json"] = any(nome.lower() == b"content-type" and valor.startswith(b"application/json")
+                                 for nome, valor in mensagem.get("headers", []))
+        elif mensagem["type"] == "http.response.body":
+            partes.append(mensagem.get("body", b""))
+
+    await app(scope, receive, send)
+    corpo = b"".join(partes)
+    if not inicio.get("json"):
+        # Ex.: erro em texto puro; vira string JSON para não quebrar a resposta combinada
+        corpo = dumps(corpo.decode("utf-8", errors="replace"))
+    return inicio.get("status", 500), corpo
+
+
+async def _executar(app, path, params):
+    erro = validar(path, params)
+    if erro:
+        return 400, dumps({"detail": erro})
+    try:
+        return await asyncio.wait_for(_chamar(app, path, params), TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return 504, dumps({"detail": f"Tempo esgotado após {TIMEOUT_SECONDS:.0f}s"})
+    except Exception as e:
+        # Uma subconsulta com erro não derruba as demais
+        return 500, dumps({"detail": f"Erro interno: {e}"})
+
+
+async def executar_lote(app, consultas):
+    """consultas: {nome: (path, params)} -> bytes {"nome": {"status": ..., "data": ...}, ...}"""
+    nomes = list(consultas)
+    resultados = await asyncio.gather(*(_executar(app, *consultas[nome]) for nome in nomes))
+    corpo = b",".join(
+        dumps(nome) + b':{"status":' + str(status).encode() + b',"data":' + (dados or b"null") + b"}"
+        for nome, (status, dados) in zip(nomes, resultados)
+    )
+    return b"{" + corpo + b"}"
@@ -1,21 +1,108 @@
-from http.client import HTTPException
-from fastapi import FastAPI, Query
-from pymongo import MongoClient
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from pymongo.errors import PyMongoError
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from typing import Optional
+from fastapi.responses import Response, StreamingResponse
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Union
 
+from busca import buscar
+from cache import CacheMiddleware, Politica, criar_backend
+from colunar import EXPORTAVEIS, exportar, montar_consulta
+from database import DB_NAME, criar_cliente_async, get_db
+from dimensoes import CacheDimensoes
+from estatisticas import correlacao_conclusao_nota, estatisticas_notas, frequencia_presencas, histograma
+from facts import FACTS_COLLECTION
+from indexes import ensure_indexes_async
+from invalidacao import MonitorVersoes
+from lote import MAX_CONSULTAS, executar_lote
+from paginacao import Pagina, listar, pagina_por_cursor, parametros_pagina, stream_ndjson
+from perfil import MAX_IDS, perfis_alunos
+from respostas import CompressaoMiddleware, RespostaJSON
+from resumo import COLECOES as COLECOES_RESUMO, SnapshotResumo
+from schema import codificar
+from scores import SCORES_COLLECTION
+from snapshot import MOTOR_API, BancoSnapshot, MotorSnapshot
 
-load_dotenv()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Abre o cliente motor (pool compartilhado) e garante os índices"""
+    app.state.client = criar_cliente_async()
+    app.state.db = app.state.client[DB_NAME]
+    try:
+        await ensure_indexes_async(app.state.db)
+    except PyMongoError as e:
+        print(f"⚠️ Não foi possível criar os índices: {e}")
+    try:
+        await monitor_versoes.atualizar(app.state.db)
+    except PyMongoError as e:
+        print(f"⚠️ Não foi possível ler as versões das coleções: {e}")
+    monitor_versoes.iniciar(app.state.db)
+    try:
+        await resumo_dashboard.atualizar(app.state.db)
+    except PyMongoError as e:
+        print(f"⚠️ Não foi possível calcular o resumo do dashboard: {e}")
+    resumo_dashboard.iniciar(app.state.db)
+    if motor_snapshot is not None:
+        # Endpoints passam a ler das colunas em memória; tarefas de fundo seguem no MongoDB
+        try:
+            await motor_snapshot.carregar(app.state.db)
+        except Exception as e:
+            print(f"⚠️ Não foi possível carregar o snapshot (consultas vão ao MongoDB): {e!r}")
+        motor_snapshot.iniciar(app.state.db)
+        app.state.db = BancoSnapshot(app.state.db, motor_snapshot)
+    yield
+    if motor_snapshot is not None:
+        await motor_snapshot.parar()
+    await resumo_dashboard.parar()
+    await monitor_versoes.parar()
+    app.state.client.close()
 
 app = FastAPI(
     title="API de Análise Educacional",
     description="API para acesso aos dados do MongoDB (Performance, Frequência, Tarefas, etc.)",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
+# Cache de respostas: TTL (s) e coleções das quais cada endpoint depende
+CACHE_POLITICAS = {
+    "/performance": Politica(300, ("performance",)),
+    "/performance/homework-completion": Politica(300, ("performance",)),
+    "/performance/combined": Politica(300, (FACTS_COLLECTION,)),
+    "/performance/combined-analysis": Politica(300, (FACTS_COLLECTION,)),
+    "/performance/scores": Politica(300, (SCORES_COLLECTION,)),
+    "/attendance": Politica(300, ("attendance",)),
+    "/homework": Politica(300, ("homework",)),
+    "/students": Politica(600, ("students",)),
+    "/students/profiles": Politica(120, ("students", "performance", SCORES_COLLECTION, FACTS_COLLECTION,
+                                         "homework", "attendance", "teacher_parent_communication")),
+    "/communications": Politica(120, ("teacher_parent_communication",)),
+    "/search/comments": Politica(300, ("performance",)),
+    "/search/communications": Politica(120, ("teacher_parent_communication",)),
+    "/dashboard/summary": Politica(60, COLECOES_RESUMO),
+    "/stats/exam": Politica(300, ("performance",)),
+    "/stats/attendance": Politica(300, ("attendance",)),
+    "/stats/correlation": Politica(300, ("performance",)),
+    "/stats/histogram": Politica(300, ("performance", SCORES_COLLECTION)),
+}
+
+monitor_versoes = MonitorVersoes()
+# Resumo do dashboard: recalculado por agendamento e quando uma coleção usada muda
+resumo_dashboard = SnapshotResumo()
+monitor_versoes.inscrever(resumo_dashboard.ao_alterar)
+# API_MOTOR=snapshot: listagens respondidas por colunas em memória (ver snapshot.py).
+# Inscrito antes das dimensões: elas são recalculadas já sobre o snapshot novo
+motor_snapshot = MotorSnapshot() if MOTOR_API == "snapshot" else None
+if motor_snapshot is not None:
+    monitor_versoes.inscrever(motor_snapshot.ao_alterar)
+# Valores distintos para filtros: em memória até a coleção de origem mudar
+dimensoes = CacheDimensoes()
+monitor_versoes.inscrever(dimensoes.ao_alterar)
+app.add_middleware(CacheMiddleware, politicas=CACHE_POLITICAS, backend=criar_backend(), monitor=monitor_versoes)
+
 # Configura CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,16 +111,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Conexão com o MongoDB
-client = MongoClient(os.getenv("MONGODB_URI"))
-db = client["tech_trends"]
+# Mais externo: comprime inclusive as respostas vindas do cache
+app.add_middleware(CompressaoMiddleware)
 
 # --- Endpoints Originais (Mantidos) ---
 @app.get("/performance")
-def get_performance(
+async def get_performance(
     min_exam: Optional[int] = None, 
     subject: Optional[str] = None,
-    limit: int = 100
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
     """Retorna dados de desempenho com filtros (original)"""
     query = {}
@@ -43,50 +130,60 @@ def get_performance(
         query["Subject"] = subject
     
     projection = {"_id": 0, "Student_ID": 1, "Subject": 1, "Exam_Score": 1}
-    return list(db.performance.find(query, projection).limit(limit))
+    return await listar(db.performance, query, projection, pagina)
 
 # --- Novos Endpoints para as Coleções Adicionais ---
 
 # 1. Endpoint para Frequência (attendance)
 @app.get("/attendance")
-def get_attendance(
-    date_start: Optional[str] = None,
-    date_end: Optional[str] = None,
-    status: Optional[str] = Query(None, regex="^(Present|Absent)$")
+async def get_attendance(
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+    status: Optional[str] = Query(None, regex="^(Present|Absent)$"),
+    pagina: Pagina = Depends(parametros_pagina(500)),
+    db=Depends(get_db)
 ):
     """Retorna dados de frequência com filtros por data/status"""
     query = {}
     if date_start and date_end:
-        query["Date"] = {"$gte": date_start, "$lte": date_end}
+        # Datas armazenadas como BSON Date: intervalo fechado em dias inteiros
+        query["Date"] = {
+            "$gte": datetime.combine(date_start, time.min),
+            "$lte": datetime.combine(date_end, time.max)
+        }
     if status:
         query["Attendance_Status"] = status
     
-    return list(db.attendance.find(query, {"_id": 0}).limit(500))
+    return await listar(db.attendance, query, {"_ingest_ts": 0}, pagina)
 
 # 2. Endpoint para Tarefas (homework)
 @app.get("/homework")
-def get_homework(
+async def get_homework(
     subject: Optional[str] = None,
     status: Optional[str] = None,
-    grade: Optional[str] = None
+    grade: Optional[str] = None,
+    pagina: Pagina = Depends(parametros_pagina(200)),
+    db=Depends(get_db)
 ):
     """Filtra tarefas por disciplina/status/nota"""
     query = {}
     if subject:
         query["Subject"] = subject
     if status:
-        query["Status"] = status
+        query["Status"] = codificar("homework", "Status", status)
     if grade:
         query["Grade_Feedback"] = {"$regex": f"^{grade}"}
     
     projection = {"_id": 0, "Due_Date": 1, "Subject": 1, "Status": 1}
-    return list(db.homework.find(query, projection).limit(200))
+    return await listar(db.homework, query, projection, pagina)
 
 # 3. Endpoint para Dados de Alunos (students)
 @app.get("/students")
-def get_students(
+async def get_students(
     grade_level: Optional[str] = None,
-    emergency_contact: bool = False
+    emergency_contact: bool = False,
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
     """Lista alunos com filtro por nível escolar"""
     query = {}
@@ -97,13 +194,43 @@ def get_students(
     if emergency_contact:
         projection["Emergency_Contact"] = 1
     
-    return list(db.students.find(query, projection))
+    return await listar(db.students, query, projection, pagina)
+
+# Perfil completo de um ou vários alunos (todas as coleções, consultadas em paralelo)
+@app.get("/students/profiles")
+async def get_student_profiles(
+    student_id: List[str] = Query(..., description="IDs repetidos ou separados por vírgula"),
+    db=Depends(get_db)
+):
+    """Perfis de vários alunos numa requisição: {Student_ID: perfil}; IDs sem dados ficam de fora"""
+    ids = [i.strip() for valor in student_id for i in valor.split(",") if i.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="Informe ao menos um student_id")
+    if len(set(ids)) > MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_IDS} alunos por requisição")
+    try:
+        return RespostaJSON(await perfis_alunos(db, ids))
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@app.get("/students/{student_id}/profile")
+async def get_student_profile(student_id: str, db=Depends(get_db)):
+    """Cadastro, notas, Final_Score, tarefas, frequência e comunicações de um aluno"""
+    try:
+        perfis = await perfis_alunos(db, [student_id])
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+    if student_id not in perfis:
+        raise HTTPException(status_code=404, detail=f"Aluno não encontrado: {student_id}")
+    return RespostaJSON(perfis[student_id])
 
 # 4. Endpoint para Comunicação (teacher_parent_communication)
 @app.get("/communications")
-def get_communications(
+async def get_communications(
     message_type: Optional[str] = None,
-    last_days: Optional[int] = 30
+    last_days: Optional[int] = 30,
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
     """Filtra comunicações por tipo e recência"""
     query = {}
@@ -111,18 +238,60 @@ def get_communications(
         query["Message_Type"] = message_type
     
     if last_days:
-        cutoff_date = datetime.now() - timedelta(days=last_days)
-        query["Date"] = {"$gte": cutoff_date.isoformat()}
+        cutoff_date = datetime.combine(date.today() - timedelta(days=last_days), time.min)
+        query["Date"] = {"$gte": cutoff_date}
     
-    return list(db.teacher_parent_communication.find(query, {"_id": 0}).limit(100))
+    return await listar(db.teacher_parent_communication, query, {"_ingest_ts": 0}, pagina)
+
+# Busca textual (índices de texto em Teacher_Comments e Message_Content), por relevância
+@app.get("/search/comments")
+async def search_comments(
+    q: str = Query(..., min_length=1, description='Termos; "frase exata" e -exclusão'),
+    subject: Optional[str] = None,
+    page_size: int = Query(20, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+    db=Depends(get_db)
+):
+    """Comentários de professores (performance) que mencionam os termos"""
+    filtros = {"Subject": subject} if subject else {}
+    try:
+        return RespostaJSON(await buscar(db, "comments", q, filtros, page_size, after))
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@app.get("/search/communications")
+async def search_communications(
+    q: str = Query(..., min_length=1, description='Termos; "frase exata" e -exclusão'),
+    message_type: Optional[str] = None,
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+    page_size: int = Query(20, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+    db=Depends(get_db)
+):
+    """Mensagens entre professores e responsáveis que mencionam os termos"""
+    filtros = {}
+    if message_type:
+        filtros["Message_Type"] = message_type
+    if date_start or date_end:
+        filtros["Date"] = {}
+        if date_start:
+            filtros["Date"]["$gte"] = datetime.combine(date_start, time.min)
+        if date_end:
+            filtros["Date"]["$lte"] = datetime.combine(date_end, time.max)
+    try:
+        return RespostaJSON(await buscar(db, "communications", q, filtros, page_size, after))
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
 
 @app.get("/performance/homework-completion")
-def get_homework_completion(
+async def get_homework_completion(
     min_percentage: Optional[int] = Query(None, ge=0, le=100, description="Filtro por % mínimo de conclusão (0-100)"),
     subject: Optional[str] = None,
-    limit: int = 100
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
     """
     Retorna a porcentagem de conclusão de tarefas (armazenada na coleção performance)
@@ -132,10 +301,9 @@ def get_homework_completion(
     """
     query = {}
     
+    # Homework_Completion_% é inteiro desde a ingestão (ver schema.py)
     if min_percentage is not None:
-        query["Homework_Completion_%"] = {
-            "$regex": f"^{min_percentage}|^[1-9][0-9]%|^100%"
-        }
+        query["Homework_Completion_%"] = {"$gte": min_percentage}
     
     if subject:
         query["Subject"] = subject
@@ -145,122 +313,250 @@ def get_homework_completion(
         "Student_ID": 1,
         "Subject": 1,
         "Homework_Completion_%": 1,
+        "Homework_Completion": "$Homework_Completion_%",
         "Teacher_Comments": 1
     }
     
     try:
-        results = list(db.performance.find(query, projection).limit(limit))
-        
-        # Converte "%" para número (opcional)
-        for item in results:
-            item["Homework_Completion"] = int(item["Homework_Completion_%"].replace('%', ''))
-        
-        return results
-    except Exception as e:
+        return await listar(db.performance, query, projection, pagina)
+    except PyMongoError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _consulta_fatos(subject, min_completion):
+    """Filtro na visão materializada student_subject_facts (ver facts.py)"""
+    query = {}
+    if subject:
+        query["Subject"] = subject
+    if min_completion:
+        query["Homework_Completion"] = {"$gte": min_completion}
+    return query
+
+
 @app.get("/performance/combined-analysis")
 async def get_combined_analysis(
     subject: Optional[str] = None,
-    min_completion: Optional[int] = 0
+    min_completion: Optional[int] = 0,
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
     """Endpoint que combina dados de performance e homework completion"""
     try:
-        # Pipeline de agregação
-        pipeline = [
-            # Estágio 1: Filtro por disciplina (se fornecido)
-            {"$match": {"Subject": subject}} if subject else {"$match": {}},
-            
-            # Estágio 2: Join com a coleção de homework completion
-            {"$lookup": {
-                "from": "homework_completion",
-                "localField": "Student_ID",
-                "foreignField": "Student_ID",
-                "as": "homework_data"
-            }},
-            
-            # Estágio 3: Desnormaliza o array resultante do lookup
-            {"$unwind": "$homework_data"},
-            
-            # Estágio 4: Filtro por porcentagem mínima
-            {"$match": {"homework_data.Completion_Percentage": {"$gte": min_completion}}},
-            
-            # Estágio 5: Projeção final
-            {"$project": {
-                "_id": 0,
-                "Student_ID": 1,
-                "Subject": 1,
-                "Exam_Score": 1,
-                "Homework_Completion": "$homework_data.Completion_Percentage",
-                "Last_Update": "$homework_data.Date"
-            }}
-        ]
-        
-        # Executa a agregação
-        results = list(db.performance.aggregate(pipeline))
-        
-        if not results:
-            raise HTTPException(status_code=404, detail="Nenhum dado encontrado com os filtros fornecidos")
-            
-        return results
-        
-    except Exception as e:
+        # Leitura direta da visão pré-computada, servida pelo índice (Subject, Homework_Completion)
+        projection = {
+            "_id": 0,
+            "Student_ID": 1,
+            "Subject": 1,
+            "Exam_Score": 1,
+            "Homework_Completion": 1,
+            "Last_Update": "$Updated_At"
+        }
+        filtro = _consulta_fatos(subject, min_completion)
+        if pagina.formato == "ndjson":
+            return stream_ndjson(db[FACTS_COLLECTION], filtro, projection)
+        results = await pagina_por_cursor(db[FACTS_COLLECTION], filtro, projection, pagina.page_size, pagina.after)
+    except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+    if not results["items"] and not pagina.after:
+        raise HTTPException(status_code=404, detail="Nenhum dado encontrado com os filtros fornecidos")
+
+    return RespostaJSON(results)
+
 
 # Novo endpoint no FastAPI
 @app.get("/performance/combined")
-def get_combined_data(
+async def get_combined_data(
     subject: Optional[str] = None,
-    min_completion: int = 0
+    min_completion: int = 0,
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
 ):
-    # Pipeline de agregação
-    pipeline = [
-        {"$match": {"Subject": subject}} if subject else {"$match": {}},
-        {"$lookup": {
-            "from": "homework_completion",
-            "localField": "Student_ID",
-            "foreignField": "Student_ID",
-            "as": "hw_data"
-        }},
-        {"$unwind": "$hw_data"},
-        {"$project": {
-            "Student_ID": 1,
-            "Subject": 1,
-            "Exam_Score": 1,
-            "Homework_Completion": "$hw_data.Completion_Percentage"
-        }},
-        {"$match": {"Homework_Completion": {"$gte": min_completion}}}
-    ]
-    
-    results = list(db.performance.aggregate(pipeline))
-    return results
+    projection = {"_id": 0, "Student_ID": 1, "Subject": 1, "Exam_Score": 1, "Homework_Completion": 1}
+    return await listar(db[FACTS_COLLECTION], _consulta_fatos(subject, min_completion), projection, pagina)
+
+@app.get("/performance/scores")
+async def get_performance_scores(
+    subject: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=100, description="Final_Score mínimo"),
+    max_score: Optional[float] = Query(None, ge=0, le=100, description="Final_Score máximo"),
+    pagina: Pagina = Depends(parametros_pagina(100)),
+    db=Depends(get_db)
+):
+    """Final_Score pré-calculado pelo ETL (etl_pandas.py --mongo), filtrado por disciplina e intervalo"""
+    if min_score is not None and max_score is not None and min_score > max_score:
+        raise HTTPException(status_code=400, detail="min_score maior que max_score")
+    query = {}
+    if subject:
+        query["Subject"] = subject
+    # Igualdade em Subject + intervalo em Final_Score: índice subject_final (ou final)
+    intervalo = {}
+    if min_score is not None:
+        intervalo["$gte"] = min_score
+    if max_score is not None:
+        intervalo["$lte"] = max_score
+    if intervalo:
+        query["Final_Score"] = intervalo
+
+    projection = {"_id": 0, "Student_ID": 1, "Subject": 1, "Exam_Score": 1, "Homework_Score": 1, "Final_Score": 1}
+    return await listar(db[SCORES_COLLECTION], query, projection, pagina)
 
 # --- Endpoint Combinado para Dashboard ---
 @app.get("/dashboard/summary")
-def get_dashboard_summary():
-    """Agrega dados para o dashboard principal"""
-    pipeline = [
-        {"$facet": {
-            "attendance_stats": [
-                {"$group": {
-                    "_id": "$Attendance_Status",
-                    "count": {"$sum": 1}
-                }}
-            ],
-            "homework_status": [
-                {"$group": {
-                    "_id": "$Status",
-                    "count": {"$sum": 1}
-                }}
-            ],
-            "recent_comms": [
-                {"$sort": {"Date": -1}},
-                {"$limit": 5},
-                {"$project": {"_id": 0, "Student_ID": 1, "Date": 1}}
-            ]
-        }}
-    ]
-    
-    return db.attendance.aggregate(pipeline).next()
\ No newline at end of file
+async def get_dashboard_summary(db=Depends(get_db)):
+    """Todos os indicadores do dashboard numa resposta, servidos do snapshot pré-computado (ver resumo.py)"""
+    try:
+        corpo = await resumo_dashboard.obter(db)
+    except PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"Resumo indisponível: {e}")
+    return Response(corpo, media_type="application/json")
+
+
+# --- Dimensões (listas de opções dos filtros) ---
+async def _dimensao(db, nome):
+    try:
+        corpo = await dimensoes.obter(db, nome)
+    except PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"Dimensão indisponível: {e}")
+    return Response(corpo, media_type="application/json")
+
+
+@app.get("/dimensions/subjects")
+async def get_subjects(db=Depends(get_db)):
+    """Disciplinas presentes em performance"""
+    return await _dimensao(db, "subjects")
+
+
+@app.get("/dimensions/grade-levels")
+async def get_grade_levels(db=Depends(get_db)):
+    """Níveis escolares dos alunos"""
+    return await _dimensao(db, "grade-levels")
+
+
+@app.get("/dimensions/message-types")
+async def get_message_types(db=Depends(get_db)):
+    """Tipos de mensagem das comunicações"""
+    return await _dimensao(db, "message-types")
+
+
+@app.get("/dimensions/homework-statuses")
+async def get_homework_statuses(db=Depends(get_db)):
+    """Códigos de status das tarefas (done, not_done, pending)"""
+    return await _dimensao(db, "homework-statuses")
+
+
+# --- Estatísticas (calculadas no servidor sobre a coleção inteira) ---
+def _intervalo_datas(date_start, date_end):
+    intervalo = {}
+    if date_start:
+        intervalo["$gte"] = datetime.combine(date_start, time.min)
+    if date_end:
+        intervalo["$lte"] = datetime.combine(date_end, time.max)
+    return {"Date": intervalo} if intervalo else {}
+
+
+@app.get("/stats/exam")
+async def get_exam_stats(subject: Optional[str] = None, db=Depends(get_db)):
+    """Exam_Score por disciplina: count, mean, std, min, q1, median, q3, max"""
+    return RespostaJSON(await estatisticas_notas(db.performance, subject))
+
+
+@app.get("/stats/attendance")
+async def get_attendance_stats(
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+    subject: Optional[str] = None,
+    db=Depends(get_db)
+):
+    """Presenças/faltas por disciplina e por dia da semana"""
+    return RespostaJSON(await frequencia_presencas(db.attendance, _intervalo_datas(date_start, date_end), subject))
+
+
+@app.get("/stats/correlation")
+async def get_correlation(
+    subject: Optional[str] = None,
+    largura: int = Query(10, ge=1, le=50, description="Largura das faixas de conclusão (%)"),
+    db=Depends(get_db)
+):
+    """Correlação (Pearson) entre conclusão de tarefas e nota, com a nota média por faixa de conclusão"""
+    return RespostaJSON(await correlacao_conclusao_nota(db.performance, subject, largura))
+
+
+@app.get("/stats/histogram")
+async def get_histogram(
+    campo: str = Query("Exam_Score", description="Exam_Score, Homework_Completion_% ou Final_Score"),
+    bins: int = Query(10, ge=1, le=100),
+    minimo: float = Query(0, ge=0, le=100),
+    maximo: float = Query(100, ge=0, le=100),
+    subject: Optional[str] = None,
+    db=Depends(get_db)
+):
+    """Histograma via $bucket; Final_Score vem da coleção performance_scores (ETL)"""
+    if minimo >= maximo:
+        raise HTTPException(status_code=400, detail="minimo deve ser menor que maximo")
+    collection = db[SCORES_COLLECTION] if campo == "Final_Score" else db.performance
+    try:
+        faixas = await histograma(collection, campo, bins, minimo, maximo, {"Subject": subject} if subject else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RespostaJSON(faixas)
+
+
+# --- Consultas em lote ---
+class SubConsulta(BaseModel):
+    path: str = Field(..., description="Endpoint GET da API, ex.: /stats/exam")
+    params: Dict[str, Union[str, int, float, bool, List[str]]] = Field(default_factory=dict)
+
+
+class Lote(BaseModel):
+    consultas: Dict[str, SubConsulta]
+
+
+@app.post("/batch")
+async def post_batch(lote: Lote, request: Request):
+    """Executa subconsultas nomeadas em paralelo e devolve {nome: {"status", "data"}}"""
+    if not lote.consultas:
+        raise HTTPException(status_code=400, detail="Nenhuma consulta informada")
+    if len(lote.consultas) > MAX_CONSULTAS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_CONSULTAS} consultas por lote")
+    consultas = {
+        nome: (consulta.path, {k: v for k, v in consulta.params.items() if v is not None})
+        for nome, consulta in lote.consultas.items()
+    }
+    return Response(await executar_lote(request.app, consultas), media_type="application/json")
+
+
+# --- Exportação Colunar ---
+@app.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    formato: str = Query("arrow", regex="^(arrow|parquet)$", description="arrow (IPC stream) ou parquet"),
+    campos: Optional[str] = Query(None, description="Colunas separadas por vírgula (padrão: todas)"),
+    filtro: List[str] = Query([], description="Filtro de igualdade Campo:valor (repetível)"),
+    db=Depends(get_db)
+):
+    """Exporta uma coleção em formato colunar, em streaming, lote a lote"""
+    if collection not in EXPORTAVEIS:
+        raise HTTPException(status_code=404, detail=f"Coleção não exportável: {collection}")
+    try:
+        filtros = {}
+        for item in filtro:
+            campo, separador, valor = item.partition(":")
+            if not separador:
+                raise ValueError(f"Filtro inválido (use Campo:valor): {item}")
+            filtros[campo] = valor
+        query, lista_campos = montar_consulta(
+            collection,
+            [c.strip() for c in campos.split(",") if c.strip()] if campos else None,
+            filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type = "application/vnd.apache.parquet" if formato == "parquet" else "application/vnd.apache.arrow.stream"
+    extensao = "parquet" if formato == "parquet" else "arrows"
+    return StreamingResponse(
+        exportar(db[collection], query, lista_campos, formato),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{collection}.{extensao}"'}
+    )
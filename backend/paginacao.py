@@ -0,0 +1,86 @@
+"""Paginação por cursor (keyset em _id) e exportação NDJSON em streaming.
+
+Cada página devolve {"items": [...], "next_cursor": "<token>" | null}. O token
+é o último _id da página codificado em base64 url-safe; a página seguinte
+filtra _id > token, então o custo não cresce com o número da página.
+"""
+import base64
+import binascii
+import os
+from collections import namedtuple
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from respostas import RespostaJSON, dumps
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+Pagina = namedtuple("Pagina", ["page_size", "after", "formato"])
+
+
+def parametros_pagina(padrao=100):
+    """Dependência com os parâmetros de paginação (tamanho padrão por endpoint)"""
+    def dependencia(
+        page_size: int = Query(padrao, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+        after: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+        formato: str = Query("json", regex="^(json|ndjson)$",
+                             description="ndjson: exporta todos os documentos em streaming")
+    ):
+        return Pagina(page_size, after, formato)
+    return dependencia
+
+
+def codificar_cursor(ultimo_id):
+    return base64.urlsafe_b64encode(ultimo_id.binary).decode().rstrip("=")
+
+
+def decodificar_cursor(token):
+    try:
+        return ObjectId(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _com_id(projecao):
+    # _id é necessário para montar o cursor e pode coexistir com inclusões ou exclusões
+    return {**(projecao or {}), "_id": 1}
+
+
+async def pagina_por_cursor(collection, filtro, projecao, page_size, after=None):
+    """Uma página ordenada por _id a partir do cursor informado"""
+    if after:
+        filtro = {"$and": [filtro, {"_id": {"$gt": decodificar_cursor(after)}}]}
+    cursor = collection.find(filtro, _com_id(projecao)).sort("_id", 1).limit(page_size + 1)
+    docs = await cursor.to_list(length=page_size + 1)
+
+    next_cursor = codificar_cursor(docs[page_size - 1]["_id"]) if len(docs) > page_size else None
+    items = docs[:page_size]
+    for doc in items:
+        del doc["_id"]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def _linhas_ndjson(collection, filtro, projecao, batch_size):
+    # O motor busca do servidor no máximo batch_size documentos por vez
+    cursor = collection.find(filtro, projecao).batch_size(batch_size)
+    async for doc in cursor:
+        doc.pop("_id", None)
+        yield dumps(doc) + b"\n"
+
+
+def stream_ndjson(collection, filtro, projecao, batch_size=STREAM_BATCH_SIZE):
+    """Exporta todos os documentos como NDJSON, em memória constante"""
+    return StreamingResponse(_linhas_ndjson(collection, filtro, projecao, batch_size),
+                             media_type="application/x-ndjson")
+
+
+async def listar(collection, filtro, projecao, pagina):
+    """Resposta de um endpoint de listagem conforme o formato pedido"""
+    if pagina.formato == "ndjson":
+        return stream_ndjson(collection, filtro, projecao)
+    return RespostaJSON(await pagina_por_cursor(collection, filtro, projecao, pagina.page_size, pagina.after))
@@ -0,0 +1,161 @@
+"""Transformação do ETL em vários núcleos com handoff de colunas por memória compartilhada.
+
+O DataFrame é dividido em partições (hash de Student_ID ou Subject); cada
+partição é serializada uma única vez em Arrow IPC direto num bloco de
+`multiprocessing.shared_memory`, e o worker lê esse bloco em vez de receber o
+DataFrame em pickle pelo pipe do pool. A leitura não é sem cópia: to_pandas()
+copia as colunas para a memória do processo, o que também permite fechar o
+bloco logo em seguida. O resultado volta pelo mesmo caminho. Uma coluna com a
+posição original de cada linha garante que a junção final seja idêntica à
+execução sequencial, independente da ordem em que os workers terminam.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import pandas as pd
+import pyarrow as pa
+
+WORKERS = int(os.getenv("ETL_WORKERS", "1"))
+_ORDEM = "__ordem"
+
+
+def _gravar_ipc(destino, tabela):
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def _tamanho_ipc(tabela):
+    medidor = pa.MockOutputStream()
+    _gravar_ipc(medidor, tabela)
+    return medidor.size()
+
+
+def _preencher(shm, tabela):
+    # Escrita direta no bloco; as referências ao buffer morrem ao sair da função
+    _gravar_ipc(pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf)), tabela)
+
+
+def para_compartilhada(df):
+    """Serializa o DataFrame num bloco de memória compartilhada; retorna (nome, tamanho)"""
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    tamanho = _tamanho_ipc(tabela)
+    shm = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+    try:
+        _preencher(shm, tabela)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return shm.name, tamanho
+
+
+def _anexar(nome, remover):
+    """Abre um bloco existente; só fica no resource_tracker se este processo for removê-lo
+
+    Até o Python 3.12 SharedMemory(name=...) registra o bloco também em quem só
+    o lê, e o tracker o apagaria ao fim desse processo (com aviso de vazamento).
+    Quem remove precisa do registro: o unlink() o desfaz.
+    """
+    if remover:
+        return shared_memory.SharedMemory(name=nome)
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, track=False)
+    shm = shared_memory.SharedMemory(name=nome)
+    if os.name == "posix":  # no Windows o bloco não é registrado
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _ler(shm, tamanho):
+    # to_pandas() copia: o DataFrame não referencia o bloco, que pode ser fechado
+    return pa.ipc.open_stream(pa.py_buffer(shm.buf)[:tamanho]).read_all().to_pandas()
+
+
+def de_compartilhada(nome, tamanho, liberar=False):
+    """Lê o DataFrame de um bloco compartilhado; liberar=True remove o bloco em seguida"""
+    shm = _anexar(nome, remover=liberar)
+    try:
+        return _ler(shm, tamanho)
+    finally:
+        shm.close()
+        if liberar:
+            shm.unlink()
+
+
+def _executar_particao(funcao, nome, tamanho):
+    """Roda no worker: bloco de entrada -> funcao(df) -> novo bloco de saída"""
+    df = de_compartilhada(nome, tamanho)
+    return para_compartilhada(funcao(df))
+
+
+def particionar(df, n, por="student"):
+    """Divide o DataFrame em até n partições determinísticas (hash de Student_ID ou Subject)"""
+    coluna = "Subject" if por == "subject" else "Student_ID"
+    if por == "subject":
+        # Disciplinas inteiras, distribuídas em round-robin por ordem alfabética
+        codigos = {valor: i % n for i, valor in enumerate(sorted(df[coluna].dropna().unique()))}
+        grupos = df[coluna].map(codigos).fillna(0).astype(int).to_numpy()
+    else:
+        grupos = pd.util.hash_pandas_object(df[coluna], index=False).to_numpy() % n
+    return [df[grupos == i] for i in range(n) if (grupos == i).any()]
+
+
+class TransformadorParalelo:
+    """Aplica funcao(df) -> df em partições num pool de processos
+
+    funcao precisa ser importável pelo worker (definida no nível do módulo) e
+    preservar as linhas de entrada (transformação linha a linha ou colunas derivadas).
+    Com workers <= 1 a função é chamada direto, sem pool nem serialização.
+    """
+
+    def __init__(self, funcao, workers=WORKERS, por="student"):
+        self.funcao = funcao
+        self.workers = max(1, workers)
+        self.por = por
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def aplicar(self, df):
+        if self._pool is None or len(df) < self.workers:
+            return self.funcao(df)
+
+        entrada, futuros, resultados = [], [], []
+        try:
+            for parte in particionar(df.assign(**{_ORDEM: range(len(df))}), self.workers, self.por):
+                entrada.append(para_compartilhada(parte))
+            futuros = [self._pool.submit(_executar_particao, self.funcao, nome, tamanho)
+                       for nome, tamanho in entrada]
+            # Coleta na ordem de envio: o resultado não depende de qual worker termina antes
+            for futuro in futuros:
+                resultados.append(de_compartilhada(*futuro.result(), liberar=True))
+        finally:
+            for nome, _ in entrada:
+                _remover(nome)
+            # Em caso de erro, libera os blocos de saída que não chegaram a ser lidos
+            for futuro in futuros[len(resultados):]:
+                if not futuro.cancel() and futuro.exception() is None:
+                    _remover(futuro.result()[0])
+
+        unido = pd.concat(resultados, ignore_index=True).sort_values(_ORDEM, kind="stable")
+        return unido.drop(columns=_ORDEM).reset_index(drop=True)
+
+
+def _remover(nome):
+    try:
+        shm = _anexar(nome, remover=True)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
@@ -0,0 +1,71 @@
+"""Perfil completo de alunos (/students/{student_id}/profile e /students/profiles).
+
+Uma consulta por coleção, todas em paralelo no pool do motor, cada uma
+servida pelo índice que começa em Student_ID (ver indexes.py). No modo em
+lote as mesmas consultas usam $in com todos os IDs e os documentos são
+agrupados por aluno em memória, então o custo é fixo em número de idas ao
+banco, não proporcional à quantidade de alunos.
+"""
+import asyncio
+import os
+from datetime import datetime
+
+MAX_IDS = int(os.getenv("PROFILE_MAX_IDS", "100"))
+# Itens por lista em cada perfil (os mais recentes primeiro)
+MAX_ITENS = int(os.getenv("PROFILE_MAX_ITEMS", "200"))
+
+# seção -> (coleção, campo de ordenação decrescente ou None)
+SECOES = {
+    "performance": ("performance", None),
+    "scores": ("performance_scores", None),
+    "subjects": ("student_subject_facts", None),
+    "homework": ("homework", "Due_Date"),
+    "attendance": ("attendance", "Date"),
+    "communications": ("teacher_parent_communication", "Date"),
+}
+_PROJECAO = {"_id": 0, "_ingest_ts": 0, "_etl_ts": 0}
+
+
+def _filtro(student_ids):
+    # Um aluno: igualdade (também é o caminho indexado do modo snapshot)
+    if len(student_ids) == 1:
+        return {"Student_ID": student_ids[0]}
+    return {"Student_ID": {"$in": list(student_ids)}}
+
+
+async def _por_aluno(collection, student_ids):
+    """{Student_ID: [documentos]} de uma coleção"""
+    grupos = {}
+    async for doc in collection.find(_filtro(student_ids), _PROJECAO):
+        grupos.setdefault(doc.pop("Student_ID"), []).append(doc)
+    return grupos
+
+
+def _recentes(docs, campo):
+    if campo:
+        docs.sort(key=lambda doc: doc.get(campo) or datetime.min, reverse=True)
+    return docs[:MAX_ITENS]
+
+
+async def perfis_alunos(db, student_ids):
+    """{Student_ID: perfil} dos alunos encontrados em alguma coleção"""
+    student_ids = list(dict.fromkeys(student_ids))
+    nomes = list(SECOES)
+    alunos, *secoes = await asyncio.gather(
+        _por_aluno(db.students, student_ids),
+        *(_por_aluno(db[SECOES[nome][0]], student_ids) for nome in nomes),
+    )
+    perfis = {}
+    for student_id in student_ids:
+        completos = {nome: grupos.get(student_id, []) for nome, grupos in zip(nomes, secoes)}
+        cadastro = alunos.get(student_id)
+        if cadastro is None and not any(completos.values()):
+            continue
+        perfis[student_id] = {
+            "Student_ID": student_id,
+            "student": cadastro[0] if cadastro else None,
+            **{nome: _recentes(docs, SECOES[nome][1]) for nome, docs in completos.items()},
+            # Totais antes do corte em MAX_ITENS
+            "counts": {nome: len(docs) for nome, docs in completos.items()},
+        }
+    return perfis
@@ -0,0 +1,532 @@
+"""Motor de pipelines ETL declarativos: fonte -> etapas -> destinos, lote a lote.
+
+Fontes produzem DataFrames em lotes (coleção Mongo ou CSV). Etapas comuns
+(Coercao, Derivada, Juncao, Filtro, Transformacao) processam cada lote assim
+que ele chega; etapas acumuladoras (Agregacao) consomem todos os lotes e
+emitem o resultado no fim, repassado às etapas seguintes. Destinos recebem
+os lotes finais: DestinoCSV, dataset_parquet.EscritorParticionado e
+DestinoMongo (upsert em lotes). Cada etapa registra lotes, linhas de
+entrada/saída e tempo gasto.
+
+Uso (a partir de backend/):
+    python pipeline.py final_score --destino csv --destino parquet --destino mongo
+    python pipeline.py --listar
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+from cache_csv import ler_blocos
+from colunar import iterar_lotes
+from database import DB_NAME, criar_cliente
+from dataset_parquet import COMPRESSAO, SCHEMA_SCORES, EscritorParticionado
+from schema import NATURAL_KEYS, normalizar
+from scores import SCORES_COLLECTION, UPSERT_BATCH_SIZE, finalizar_carga, upsert_dataframe
+
+BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "10000"))
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ETL_OUTPUT")
+
+
+# --- Fontes ---
+
+class FonteMongo:
+    """Coleção Mongo lida em lotes de colunas Arrow (ver colunar.iterar_lotes)"""
+
+    def __init__(self, collection_name, campos=None, filtros=None, batch_size=BATCH_SIZE):
+        self.nome = f"mongo:{collection_name}"
+        self.collection_name = collection_name
+        self.campos = campos
+        self.filtros = filtros
+        self.batch_size = batch_size
+
+    def lotes(self, db):
+        for lote in iterar_lotes(db[self.collection_name], self.campos, self.filtros, self.batch_size):
+            yield lote.to_pandas()
+
+
+class FonteCSV:
+    """CSV lido em blocos (pelo cache binário, ver cache_csv.py); com collection_name aplica os tipos de schema.py"""
+
+    def __init__(self, caminho, collection_name=None, batch_size=BATCH_SIZE):
+        self.nome = f"csv:{os.path.basename(caminho)}"
+        self.caminho = caminho
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+
+    def lotes(self, db=None):
+        for bloco in ler_blocos(self.caminho, self.batch_size):
+            if self.collection_name:
+                bloco, _ = normalizar(self.collection_name, bloco)
+            yield bloco
+
+
+# --- Etapas ---
+
+class Etapa:
+    """Etapa por lote: aplicar(df) -> df"""
+    nome = "etapa"
+
+    def preparar(self, db):
+        """Chamado uma vez antes do primeiro lote (ex.: carregar tabelas de junção)"""
+
+    def aplicar(self, df):
+        raise NotImplementedError
+
+
+class EtapaAcumuladora(Etapa):
+    """Etapa que consome todos os lotes (acumular) e emite um único resultado (finalizar)"""
+
+    def acumular(self, df):
+        raise NotImplementedError
+
+    def finalizar(self):
+        raise NotImplementedError
+
+
+def _percentual(serie):
+    # Aceita inteiros da ingestão tipada ou textos de cargas antigas ("100%")
+    if serie.dtype == object:
+        serie = serie.astype(str).str.rstrip("%")
+    return pd.to_numeric(serie, errors="coerce")
+
+
+_COERCOES = {
+    "numero": lambda s: pd.to_numeric(s, errors="coerce"),
+    "int": lambda s: pd.to_numeric(s, errors="coerce").astype("Int64"),
+    "float": lambda s: pd.to_numeric(s, errors="coerce").astype(float),
+    "percent": _percentual,
+    "date": lambda s: pd.to_datetime(s, errors="coerce"),
+    "str": lambda s: s.astype("string"),
+}
+
+
+class Coercao(Etapa):
+    """Converte colunas para os tipos declarados; valores inválidos viram nulos
+
+    tipos: {coluna: "numero" | "int" | "float" | "percent" | "date" | "str"}
+    obrigatorios: colunas que precisam existir (ValueError caso contrário)
+    """
+
+    def __init__(self, tipos, obrigatorios=()):
+        self.nome = "coercao"
+        self.tipos = tipos
+        self.obrigatorios = list(obrigatorios)
+
+    def aplicar(self, df):
+        faltantes = [campo for campo in self.obrigatorios if campo not in df.columns]
+        if faltantes:
+            raise ValueError(f"Campos obrigatórios faltando: {faltantes}")
+        for coluna, tipo in self.tipos.items():
+            if coluna in df.columns:
+                df[coluna] = _COERCOES[tipo](df[coluna])
+        return df
+
+
+class Derivada(Etapa):
+    """Nova coluna calculada: funcao(df) -> Series; padrao se alguma coluna de entrada faltar"""
+
+    def __init__(self, coluna, funcao, entradas=(), padrao=None):
+        self.nome = f"derivada:{coluna}"
+        self.coluna = coluna
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.padrao = padrao
+
+    def aplicar(self, df):
+        if any(c not in df.columns for c in self.entradas):
+            df[self.coluna] = self.padrao
+        else:
+            df[self.coluna] = self.funcao(df)
+        return df
+
+
+def ponderada(**pesos):
+    """Soma ponderada de colunas, ex.: ponderada(Exam_Score=0.7, Homework_Score=0.3)"""
+    def calcular(df):
+        return sum(peso * df[coluna] for coluna, peso in pesos.items())
+    return calcular
+
+
+class Filtro(Etapa):
+    """Mantém as linhas em que condicao(df) é verdadeira"""
+
+    def __init__(self, condicao, nome="filtro"):
+        self.nome = nome
+        self.condicao = condicao
+
+    def aplicar(self, df):
+        return df[self.condicao(df)]
+
+
+class Transformacao(Etapa):
+    """Função arbitrária df -> df (ex.: etl_pandas.transformar ou TransformadorParalelo.aplicar)"""
+
+    def __init__(self, funcao, nome="transformacao"):
+        self.nome = nome
+        self.funcao = funcao
+
+    def aplicar(self, df):
+        return self.funcao(df)
+
+
+class Juncao(Etapa):
+    """Junta cada lote a uma tabela auxiliar carregada uma vez da fonte informada"""
+
+    def __init__(self, fonte, on, colunas=None, how="left"):
+        self.nome = f"juncao:{fonte.nome}"
+        self.fonte = fonte
+        self.on = [on] if isinstance(on, str) else list(on)
+        self.colunas = colunas
+        self.how = how
+        self._tabela = None
+
+    def preparar(self, db):
+        lotes = list(self.fonte.lotes(db))
+        tabela = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame(columns=self.on + (self.colunas or []))
+        if self.colunas:
+            tabela = tabela[self.on + [c for c in self.colunas if c not in self.on]]
+        # Uma linha por chave: a junção não multiplica as linhas do lote
+        self._tabela = tabela.drop_duplicates(subset=self.on, keep="last")
+
+    def aplicar(self, df):
+        return df.merge(self._tabela, on=self.on, how=self.how)
+
+
+class Agregacao(EtapaAcumuladora):
+    """group by com métricas combináveis entre lotes (memória proporcional ao número de grupos)
+
+    metricas: {coluna_saida: (coluna, "sum" | "count" | "mean" | "min" | "max")}
+    """
+    _PARCIAIS = {"sum": ("sum",), "count": ("count",), "mean": ("sum", "count"), "min": ("min",), "max": ("max",)}
+    _COMBINAR = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+    def __init__(self, por, metricas):
+        self.por = [por] if isinstance(por, str) else list(por)
+        self.nome = f"agregacao:{','.join(self.por)}"
+        self.metricas = metricas
+        self._parcial = None
+
+    def _especificacao(self):
+        return {f"{coluna}__{parcial}": (coluna, parcial)
+                for coluna, funcao in self.metricas.values() for parcial in self._PARCIAIS[funcao]}
+
+    def acumular(self, df):
+        especificacao = self._especificacao()
+        parcial = df.groupby(self.por, dropna=False).agg(**especificacao)
+        if self._parcial is not None:
+            combinar = {nome: self._COMBINAR[parcial_] for nome, (_, parcial_) in especificacao.items()}
+            parcial = (pd.concat([self._parcial, parcial])
+                       .groupby(level=list(range(len(self.por))), dropna=False).agg(combinar))
+        self._parcial = parcial
+
+    def finalizar(self):
+        if self._parcial is None:
+            return pd.DataFrame(columns=self.por + list(self.metricas))
+        saida = pd.DataFrame(index=self._parcial.index)
+        for nome, (coluna, funcao) in self.metricas.items():
+            if funcao == "mean":
+                saida[nome] = self._parcial[f"{coluna}__sum"] / self._parcial[f"{coluna}__count"]
+            else:
+                saida[nome] = self._parcial[f"{coluna}__{funcao}"]
+        self._parcial = None
+        return saida.reset_index()
+
+
+def aplicar_etapas(etapas, df):
+    """Aplica etapas por lote em sequência a um único DataFrame (sem métricas)"""
+    for etapa in etapas:
+        df = etapa.aplicar(df)
+    return df
+
+
+# --- Destinos ---
+
+class DestinoCSV:
+    """Append de lotes num único CSV (cabeçalho só no primeiro)"""
+
+    def __init__(self, caminho):
+        self.nome = f"csv:{os.path.basename(caminho)}"
+        self.caminho = caminho
+        self._arquivo = None
+
+    def escrever(self, df):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "w", encoding="utf-8-sig", newline="")
+            df.to_csv(self._arquivo, index=False)
+        else:
+            df.to_csv(self._arquivo, index=False, header=False)
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def abortar(self):
+        # Execução com erro: não deixa um CSV parcial passar por resultado completo
+        escrito = self._arquivo is not None
+        self.fechar()
+        if escrito:
+            os.remove(self.caminho)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class DestinoMongo:
+    """Upsert em lotes pela chave; ao fechar remove documentos de cargas anteriores e avisa a API
+
+    Se a execução falhar (abortar), nada é removido nem publicado: os
+    documentos ainda não regravados pertencem à carga anterior, que continua
+    válida, e a próxima carga completa substitui tudo.
+    """
+
+    def __init__(self, db, collection_name, chave, batch_size=UPSERT_BATCH_SIZE, remover_obsoletos=True):
+        self.nome = f"mongo:{collection_name}"
+        self.db = db
+        self.collection_name = collection_name
+        self.chave = chave
+        self.batch_size = batch_size
+        self.remover_obsoletos = remover_obsoletos
+        self.carga = datetime.utcnow()
+
+    def escrever(self, df):
+        upsert_dataframe(self.db[self.collection_name], df, self.chave, self.carga, batch_size=self.batch_size)
+
+    def fechar(self):
+        finalizar_carga(self.db, self.carga if self.remover_obsoletos else None, self.collection_name)
+
+    def abortar(self):
+        pass
+
+
+# --- Execução ---
+
+@dataclass
+class Metrica:
+    nome: str
+    lotes: int = 0
+    entrada: int = 0
+    saida: int = 0
+    segundos: float = 0.0
+
+    def registrar(self, entrada, saida, segundos):
+        self.lotes += 1
+        self.entrada += entrada
+        self.saida += saida
+        self.segundos += segundos
+
+
+class Pipeline:
+    """fonte -> etapas -> destinos, processando um lote por vez
+
+    colecao/chave: destino padrão para DestinoMongo; particao/schema: para a saída Parquet.
+    """
+
+    def __init__(self, nome, fonte, etapas, colecao=None, chave=None, particao=None, schema=None):
+        self.nome = nome
+        self.fonte = fonte
+        self.etapas = list(etapas)
+        self.colecao = colecao
+        self.chave = chave
+        self.particao = particao
+        self.schema = schema
+        self.metricas = []
+
+    def _empurrar(self, df, inicio, destinos):
+        for i in range(inicio, len(self.etapas)):
+            etapa, metrica = self.etapas[i], self.metricas[i + 1]
+            comeco = time.perf_counter()
+            if isinstance(etapa, EtapaAcumuladora):
+                etapa.acumular(df)
+                metrica.registrar(len(df), 0, time.perf_counter() - comeco)
+                return
+            linhas = len(df)
+            df = etapa.aplicar(df)
+            metrica.registrar(linhas, len(df), time.perf_counter() - comeco)
+        for destino, metrica in zip(destinos, self.metricas[len(self.etapas) + 1:]):
+            comeco = time.perf_counter()
+            destino.escrever(df)
+            metrica.registrar(len(df), len(df), time.perf_counter() - comeco)
+
+    def executar(self, destinos, db=None):
+        """Roda o pipeline até o fim da fonte; retorna as métricas por etapa"""
+        self.metricas = ([Metrica(f"fonte {self.fonte.nome}")]
+                         + [Metrica(etapa.nome) for etapa in self.etapas]
+                         + [Metrica(f"destino {destino.nome}") for destino in destinos])
+        for etapa in self.etapas:
+            etapa.preparar(db)
+
+        fonte = self.metricas[0]
+        lotes = iter(self.fonte.lotes(db))
+        try:
+            while True:
+                comeco = time.perf_counter()
+                df = next(lotes, None)
+                if df is None:
+                    break
+                fonte.registrar(0, len(df), time.perf_counter() - comeco)
+                self._empurrar(df, 0, destinos)
+
+            # Acumuladoras liberam o resultado na ordem do pipeline
+            for i, etapa in enumerate(self.etapas):
+                if isinstance(etapa, EtapaAcumuladora):
+                    comeco = time.perf_counter()
+                    df = etapa.finalizar()
+                    self.metricas[i + 1].saida += len(df)
+                    self.metricas[i + 1].segundos += time.perf_counter() - comeco
+                    self._empurrar(df, i + 1, destinos)
+        except BaseException:
+            # Sem finalização: nenhum destino remove obsoletos nem publica um resultado parcial
+            for destino in destinos:
+                destino.abortar()
+            raise
+
+        for destino, metrica in zip(destinos, self.metricas[len(self.etapas) + 1:]):
+            comeco = time.perf_counter()
+            destino.fechar()
+            metrica.segundos += time.perf_counter() - comeco
+        return self.metricas
+
+    def relatorio(self):
+        linhas = [f"📊 Pipeline {self.nome}",
+                  f"   {'etapa':<38} {'lotes':>6} {'entrada':>10} {'saída':>10} {'tempo (s)':>10}"]
+        for m in self.metricas:
+            linhas.append(f"   {m.nome:<38} {m.lotes:>6} {m.entrada:>10,} {m.saida:>10,} {m.segundos:>10.3f}")
+        return "\n".join(linhas)
+
+
+# --- Pipelines ---
+
+def _homework_score(df):
+    return _percentual(df["Homework_Completion_%"]).fillna(0).astype(float)
+
+
+# Final_Score: mesma transformação do etl_pandas.transformar
+ETAPAS_FINAL_SCORE = [
+    Coercao({"Exam_Score": "numero"}, obrigatorios=["Student_ID", "Exam_Score"]),
+    Derivada("Homework_Score", _homework_score, entradas=["Homework_Completion_%"], padrao=100.0),
+    Derivada("Final_Score", ponderada(Exam_Score=0.7, Homework_Score=0.3)),
+]
+
+
+def pipeline_final_score(batch_size=BATCH_SIZE):
+    return Pipeline("final_score", FonteMongo("performance", batch_size=batch_size), ETAPAS_FINAL_SCORE,
+                    colecao=SCORES_COLLECTION, chave=NATURAL_KEYS["performance"],
+                    particao="Subject", schema=SCHEMA_SCORES)
+
+
+def pipeline_homework_por_aluno(batch_size=BATCH_SIZE):
+    """Tarefas por aluno/disciplina: total, concluídas e taxa de conclusão"""
+    return Pipeline(
+        "homework_por_aluno",
+        FonteMongo("homework", campos=["Student_ID", "Subject", "Status"], batch_size=batch_size),
+        [
+            Derivada("Concluida", lambda df: (df["Status"] == "done").astype(int)),
+            Agregacao(["Student_ID", "Subject"], {
+                "Tarefas": ("Status", "count"),
+                "Concluidas": ("Concluida", "sum"),
+                "Taxa_Conclusao": ("Concluida", "mean"),
+            }),
+        ],
+        colecao="homework_by_student", chave=["Student_ID", "Subject"], particao="Subject",
+    )
+
+
+def pipeline_frequencia_por_aluno(batch_size=BATCH_SIZE):
+    """Presença por aluno/disciplina, com a série do aluno vinda de students"""
+    return Pipeline(
+        "frequencia_por_aluno",
+        FonteMongo("attendance", campos=["Student_ID", "Subject", "Attendance_Status"], batch_size=batch_size),
+        [
+            Derivada("Presente", lambda df: (df["Attendance_Status"] == "Present").astype(int)),
+            Agregacao(["Student_ID", "Subject"], {
+                "Aulas": ("Presente", "count"),
+                "Taxa_Presenca": ("Presente", "mean"),
+            }),
+            Juncao(FonteMongo("students", campos=["Student_ID", "Grade_Level"]), on="Student_ID"),
+        ],
+        colecao="attendance_by_student", chave=["Student_ID", "Subject"], particao="Subject",
+    )
+
+
+def pipeline_comunicacoes_por_mes(batch_size=BATCH_SIZE):
+    """Mensagens por mês e tipo"""
+    return Pipeline(
+        "comunicacoes_por_mes",
+        FonteMongo("teacher_parent_communication", campos=["Student_ID", "Date", "Message_Type"],
+                   batch_size=batch_size),
+        [
+            Coercao({"Date": "date"}),
+            Derivada("Mes", lambda df: df["Date"].dt.strftime("%Y-%m")),
+            Agregacao(["Mes", "Message_Type"], {"Mensagens": ("Student_ID", "count")}),
+        ],
+        colecao="communications_by_month", chave=["Mes", "Message_Type"],
+    )
+
+
+PIPELINES = {
+    "final_score": pipeline_final_score,
+    "homework_por_aluno": pipeline_homework_por_aluno,
+    "frequencia_por_aluno": pipeline_frequencia_por_aluno,
+    "comunicacoes_por_mes": pipeline_comunicacoes_por_mes,
+}
+
+
+def criar_destinos(pipeline, tipos, db, output_dir=OUTPUT_DIR, compressao=COMPRESSAO,
+                   upsert_batch_size=UPSERT_BATCH_SIZE):
+    base = os.path.join(output_dir, f"{pipeline.nome}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    destinos = []
+    for tipo in tipos:
+        if tipo == "csv":
+            destinos.append(DestinoCSV(base + ".csv"))
+        elif tipo == "parquet":
+            destinos.append(EscritorParticionado(base, compressao, particao=pipeline.particao, schema=pipeline.schema))
+        elif tipo == "mongo":
+            if pipeline.colecao is None:
+                raise ValueError(f"Pipeline '{pipeline.nome}' não declara coleção de destino")
+            destinos.append(DestinoMongo(db, pipeline.colecao, pipeline.chave, upsert_batch_size))
+    return destinos
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Executa um pipeline ETL declarado em pipeline.py")
+    parser.add_argument("nome", nargs="?", choices=sorted(PIPELINES), help="Pipeline a executar")
+    parser.add_argument("--destino", action="append", choices=["csv", "parquet", "mongo"],
+                        help="Destino dos resultados (repetível; padrão: csv)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Documentos por lote da fonte")
+    parser.add_argument("--upsert-batch-size", type=int, default=UPSERT_BATCH_SIZE,
+                        help="Operações por bulk_write (destino mongo)")
+    parser.add_argument("--compressao", choices=["snappy", "zstd"], default=COMPRESSAO)
+    parser.add_argument("--listar", action="store_true", help="Lista os pipelines disponíveis")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.listar or not args.nome:
+        for nome, fabrica in sorted(PIPELINES.items()):
+            pipeline = fabrica()
+            etapas = " -> ".join(etapa.nome for etapa in pipeline.etapas)
+            print(f"• {nome}: {pipeline.fonte.nome} -> {etapas}")
+        sys.exit(0)
+
+    client = criar_cliente()
+    try:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        pipeline = PIPELINES[args.nome](args.batch_size)
+        destinos = criar_destinos(pipeline, args.destino or ["csv"], client[DB_NAME], OUTPUT_DIR,
+                                  args.compressao, args.upsert_batch_size)
+        inicio = time.perf_counter()
+        pipeline.executar(destinos, client[DB_NAME])
+        print(pipeline.relatorio())
+        print(f"\n🎉 Concluído em {time.perf_counter() - inicio:.2f}s")
+    finally:
+        client.close()
@@ -0,0 +1,99 @@
+"""Serialização rápida de respostas e compressão negociada.
+
+RespostaJSON serializa com orjson (quando instalado) direto dos documentos
+do Mongo, sem passar pelo jsonable_encoder do FastAPI. CompressaoMiddleware
+comprime com brotli ou gzip conforme o Accept-Encoding, acima de um tamanho
+mínimo (COMPRESSAO_MIN_BYTES); respostas em streaming são comprimidas por partes.
+"""
+import json
+import os
+import zlib
+
+from bson import ObjectId
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # fallback: json da biblioteca padrão
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSAO_MIN_BYTES = int(os.getenv("COMPRESSAO_MIN_BYTES", "1024"))
+
+
+def _padrao(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(conteudo):
+    """Serializa para bytes JSON (datetime em ISO 8601, ObjectId como string)"""
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao)
+    return json.dumps(conteudo, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class RespostaJSON(Response):
+    """Resposta JSON já serializada; retornar uma Response evita o jsonable_encoder"""
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def _codificacao(accept_encoding):
+    aceitas = {parte.split(";")[0].strip() for parte in accept_encoding.lower().split(",")}
+    if brotli is not None and "br" in aceitas:
+        return "br"
+    if "gzip" in aceitas:
+        return "gzip"
+    return None
+
+
+def _novo_compressor(codificacao):
+    if codificacao == "br":
+        # Qualidade baixa: conteúdo dinâmico, prioriza CPU sobre taxa de compressão
+        compressor = brotli.Compressor(quality=4)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # formato gzip
+    return compressor.compress, compressor.flush
+
+
+async def _comprimir(body_iterator, codificacao):
+    comprimir, finalizar = _novo_compressor(codificacao)
+    async for parte in body_iterator:
+        bloco = comprimir(parte if isinstance(parte, bytes) else parte.encode())
+        if bloco:
+            yield bloco
+    yield finalizar()
+
+
+class CompressaoMiddleware(BaseHTTPMiddleware):
+    """Negocia br/gzip e comprime respostas acima do tamanho mínimo"""
+
+    def __init__(self, app, minimo=COMPRESSAO_MIN_BYTES):
+        super().__init__(app)
+        self.minimo = minimo
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        codificacao = _codificacao(request.headers.get("accept-encoding", ""))
+        tamanho = response.headers.get("content-length")
+        if (codificacao is None or "content-encoding" in response.headers
+                or response.status_code in (204, 304)
+                or (tamanho is not None and int(tamanho) < self.minimo)):
+            return response
+
+        response.body_iterator = _comprimir(response.body_iterator, codificacao)
+        if tamanho is not None:
+            del response.headers["content-length"]
+        response.headers["Content-Encoding"] = codificacao
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
@@ -0,0 +1,120 @@
+"""Snapshot pré-computado do /dashboard/summary.
+
+Todos os indicadores do dashboard são calculados em paralelo, cada um na
+coleção certa (asyncio.gather sobre o pool do motor), e guardados já
+serializados. O snapshot é refeito a cada DASHBOARD_REFRESH_SECONDS e
+quando o MonitorVersoes avisa que uma coleção usada mudou; o endpoint só
+devolve os bytes prontos.
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from estatisticas import estatisticas_notas, histograma
+from respostas import dumps
+
+REFRESH_SECONDS = float(os.getenv("DASHBOARD_REFRESH_SECONDS", "60"))
+RECENT_COMMS = 5
+
+COLECOES = ("attendance", "homework", "performance", "teacher_parent_communication", "students")
+
+
+async def _contagem_por(collection, campo):
+    cursor = collection.aggregate([
+        {"$group": {"_id": f"${campo}", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ])
+    return await cursor.to_list(length=None)
+
+
+async def _comunicacoes_recentes(collection):
+    projecao = {"_id": 0, "Student_ID": 1, "Date": 1, "Message_Type": 1, "Message_Content": 1}
+    # Servida pelo índice em Date (ordem decrescente percorre o índice ao contrário)
+    return await collection.find({}, projecao).sort("Date", -1).limit(RECENT_COMMS).to_list(length=RECENT_COMMS)
+
+
+async def calcular_resumo(db):
+    """Todos os indicadores do dashboard, consultados em paralelo"""
+    (attendance, homework, recentes, notas, histograma,
+     alunos, registros, tarefas, comunicacoes) = await asyncio.gather(
+        _contagem_por(db.attendance, "Attendance_Status"),
+        _contagem_por(db.homework, "Status"),
+        _comunicacoes_recentes(db.teacher_parent_communication),
+        estatisticas_notas(db.performance),
+        histograma(db.performance, "Homework_Completion_%"),
+        db.students.estimated_document_count(),
+        db.performance.estimated_document_count(),
+        db.homework.estimated_document_count(),
+        db.teacher_parent_communication.estimated_document_count(),
+    )
+    return {
+        "attendance_stats": attendance,
+        "homework_status": homework,
+        "recent_comms": recentes,
+        "exam_stats": notas,
+        "completion_histogram": histograma,
+        "totals": {
+            "students": alunos,
+            "performance": registros,
+            "homework": tarefas,
+            "communications": comunicacoes,
+        },
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+
+class SnapshotResumo:
+    """Mantém o resumo serializado em memória e o recalcula periodicamente"""
+
+    def __init__(self, intervalo=REFRESH_SECONDS):
+        self.intervalo = intervalo
+        self.corpo = None
+        self._db = None
+        self._tarefa = None
+        # Criado no primeiro uso, dentro do loop: até o Python 3.9 o Lock se prende ao loop
+        # corrente na criação, e a instância é criada na importação de main.py
+        self._lock = None
+
+    async def atualizar(self, db):
+        # Lock: avisos de alteração e o agendamento não recalculam ao mesmo tempo
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self.corpo = dumps(await calcular_resumo(db))
+        return self.corpo
+
+    async def obter(self, db):
+        """Bytes JSON do snapshot; calcula na hora se ainda não houver nenhum"""
+        if self.corpo is None:
+            return await self.atualizar(db)
+        return self.corpo
+
+    async def ao_alterar(self, colecoes):
+        """Callback do MonitorVersoes: termina antes de a versão nova valer no cache de respostas"""
+        if self._db is not None and colecoes & set(COLECOES):
+            try:
+                await self.atualizar(self._db)
+            except Exception as e:
+                # Descarta o resumo antigo: o próximo /dashboard/summary calcula na hora
+                self.corpo = None
+                print(f"⚠️ Falha ao atualizar o resumo do dashboard: {e!r}")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.atualizar(self._db)
+            except Exception as e:
+                print(f"⚠️ Falha ao atualizar o resumo do dashboard: {e!r}")
+
+    def iniciar(self, db):
+        self._db = db
+        self._tarefa = asyncio.create_task(self._loop())
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,143 @@
+"""Esquema declarativo das coleções: tipos aplicados na ingestão.
+
+Cada coleção mapeia campo -> especificação. Tipos suportados:
+- "int":  número inteiro (aceita sufixo "%", ex.: "100%" -> 100); "minimo" e
+          "maximo" opcionais delimitam a faixa válida
+- "date": data convertida para datetime (BSON Date), tentando os formatos de
+          FORMATOS_DATA em ordem (ou os de "formatos")
+- "enum": valor bruto traduzido para um código compacto via "valores"
+
+Valores que não convertem ou ficam fora da faixa viram null; a linha é mantida
+e normalizar() devolve quantos valores foram anulados por campo.
+"""
+import pandas as pd
+
+# Status das tarefas chega com emojis e textos variados no CSV
+STATUS_TAREFA = {
+    "done": "done",
+    "✅": "done",
+    "✔": "done",
+    "✔️": "done",
+    "not done": "not_done",
+    "❌": "not_done",
+    "pending": "pending",
+}
+
+# Os CSVs misturam ISO (2024-09-10) com datas americanas (09/10/2024, 09-10-2024)
+FORMATOS_DATA = ["ISO8601", "%m/%d/%Y", "%m-%d-%Y"]
+
+SCHEMAS = {
+    "performance": {
+        "Exam_Score": {"tipo": "int"},
+        # O CSV usa -5 como marcador de "sem informação"
+        "Homework_Completion_%": {"tipo": "int", "minimo": 0, "maximo": 100},
+    },
+    "homework": {
+        "Due_Date": {"tipo": "date"},
+        "Status": {"tipo": "enum", "valores": STATUS_TAREFA},
+        "Guardian_Signature": {"tipo": "enum", "valores": {"yes": True, "no": False}},
+    },
+    "students": {
+        "Date_of_Birth": {"tipo": "date"},
+    },
+    "teacher_parent_communication": {
+        "Date": {"tipo": "date"},
+    },
+    "attendance": {
+        "Date": {"tipo": "date"},
+        "Attendance_Status": {"tipo": "enum", "valores": {"present": "Present", "absent": "Absent"}},
+    },
+}
+
+# Chaves naturais usadas nos upserts da ingestão incremental e no merge do ETL
+NATURAL_KEYS = {
+    # Student_ID + Subject se repete na amostra, por isso a chave inclui as demais colunas
+    "performance": ["Student_ID", "Subject", "Exam_Score", "Homework_Completion_%", "Teacher_Comments"],
+    "homework": ["Student_ID", "Assignment_Name", "Due_Date"],
+    "students": ["Student_ID"],
+    "teacher_parent_communication": ["Student_ID", "Date", "Message_Type", "Message_Content"],
+}
+
+
+def _datas(serie, formatos):
+    """Cada valor é convertido pelo primeiro formato que o aceitar"""
+    convertido = pd.to_datetime(serie, errors="coerce", format=formatos[0])
+    for formato in formatos[1:]:
+        faltando = convertido.isna() & serie.notna()
+        if not faltando.any():
+            break
+        convertido[faltando] = pd.to_datetime(serie[faltando], errors="coerce", format=formato)
+    return convertido
+
+
+def _converter(serie, spec):
+    """Converte uma coluna inteira (vetorizado); valores inválidos viram NaN/NaT"""
+    tipo = spec["tipo"]
+    if tipo == "int":
+        texto = serie.astype(str).str.strip().str.rstrip("%")
+        numeros = pd.to_numeric(texto, errors="coerce").astype("Int64")
+        if "minimo" in spec:
+            numeros = numeros.mask(numeros < spec["minimo"])
+        if "maximo" in spec:
+            numeros = numeros.mask(numeros > spec["maximo"])
+        return numeros
+    if tipo == "date":
+        return _datas(serie, spec.get("formatos", FORMATOS_DATA))
+    if tipo == "enum":
+        valores = {str(k).lower(): v for k, v in spec["valores"].items()}
+        return serie.astype(str).str.strip().str.lower().map(valores)
+    return serie
+
+
+def normalizar(collection_name, df):
+    """Aplica o esquema da coleção ao DataFrame; retorna (df, {campo: valores anulados})"""
+    schema = SCHEMAS.get(collection_name, {})
+    anulados = {}
+
+    for campo, spec in schema.items():
+        if campo not in df.columns:
+            continue
+        convertido = _converter(df[campo], spec)
+        nulos = convertido.isna()
+        # Células em branco viram null sem contar como inválidas
+        preenchidos = df[campo].notna() & df[campo].astype(str).str.strip().ne("")
+        invalidos = int((nulos & preenchidos).sum())
+        if invalidos:
+            anulados[campo] = invalidos
+        if not nulos.any():
+            df[campo] = convertido.astype("int64") if spec["tipo"] == "int" else convertido
+        else:
+            # NaN/NaT/NA não são gravados pelo pymongo: nulos viram None
+            df[campo] = convertido.astype(object).where(~nulos, None)
+    return df, anulados
+
+
+def avisar_anulados(collection_name, anulados):
+    if anulados:
+        detalhes = ", ".join(f"{campo}: {n}" for campo, n in anulados.items())
+        print(f"⚠️ Valores inválidos gravados como null em '{collection_name}' ({detalhes})")
+
+
+def limpar_chunk(df, collection_name):
+    """Remove linhas incompletas, espaços das colunas de texto e aplica o esquema tipado"""
+    df = df.dropna().copy()
+    for coluna in df.select_dtypes(include="object").columns:
+        df[coluna] = df[coluna].str.strip()
+    df, anulados = normalizar(collection_name, df)
+    avisar_anulados(collection_name, anulados)
+    return df
+
+
+def codificar(collection_name, campo, valor):
+    """Traduz um valor de filtro vindo da API para o tipo/código armazenado"""
+    spec = SCHEMAS.get(collection_name, {}).get(campo)
+    if spec is None or valor is None:
+        return valor
+    if spec["tipo"] == "enum":
+        valores = {str(k).lower(): v for k, v in spec["valores"].items()}
+        chave = str(valor).strip().lower()
+        # Aceita tanto o valor bruto ("✅") quanto o próprio código ("done")
+        return valores.get(chave, valor)
+    if spec["tipo"] == "int":
+        return int(str(valor).strip().rstrip("%"))
+    return valor
@@ -0,0 +1,51 @@
+"""Coleção performance_scores: Final_Score calculado pelo ETL e servido pela API.
+
+O ETL (etl_pandas.py --mongo) grava os resultados com upserts em lotes não
+ordenados pela chave natural de performance; o endpoint /performance/scores
+lê a coleção pelos índices (Subject, Final_Score) e (Final_Score).
+"""
+import os
+
+from pymongo import UpdateOne
+
+from invalidacao import publicar_alteracao
+from schema import NATURAL_KEYS
+
+SCORES_COLLECTION = "performance_scores"
+UPSERT_BATCH_SIZE = int(os.getenv("ETL_UPSERT_BATCH_SIZE", "1000"))
+
+# Colunas gravadas: chave natural + notas derivadas
+SCORES_CAMPOS = NATURAL_KEYS["performance"] + ["Homework_Score", "Final_Score"]
+
+
+def upsert_dataframe(collection, df, chave, carga, campos=None, batch_size=UPSERT_BATCH_SIZE):
+    """Upsert não ordenado de um DataFrame pela chave, em lotes de batch_size; retorna documentos gravados"""
+    colunas = [c for c in campos or df.columns if c in df.columns]
+    # NaN -> None: notas ausentes ficam null no Mongo e fora dos filtros de intervalo
+    registros = df[colunas].astype(object).where(df[colunas].notna(), None).to_dict("records")
+
+    gravados = 0
+    for inicio in range(0, len(registros), batch_size):
+        operacoes = [
+            UpdateOne({campo: registro.get(campo) for campo in chave},
+                      {"$set": {**registro, "_etl_ts": carga}},
+                      upsert=True)
+            for registro in registros[inicio:inicio + batch_size]
+        ]
+        resultado = collection.bulk_write(operacoes, ordered=False)
+        gravados += resultado.matched_count + resultado.upserted_count
+    return gravados
+
+
+def gravar_scores(db, df, carga, batch_size=UPSERT_BATCH_SIZE):
+    """Upsert do DataFrame transformado em performance_scores"""
+    return upsert_dataframe(db[SCORES_COLLECTION], df, NATURAL_KEYS["performance"], carga, SCORES_CAMPOS, batch_size)
+
+
+def finalizar_carga(db, carga=None, collection_name=SCORES_COLLECTION):
+    """Remove documentos não regravados numa carga completa e avisa a API; retorna removidos"""
+    removidos = 0
+    if carga is not None:
+        removidos = db[collection_name].delete_many({"_etl_ts": {"$ne": carga}}).deleted_count
+    publicar_alteracao(db, collection_name)
+    return removidos
@@ -0,0 +1,619 @@
+"""Modo snapshot: a API responde as consultas de listagem a partir de colunas em memória.
+
+Com API_MOTOR=snapshot cada coleção de SNAPSHOT_COLECOES é carregada do
+MongoDB para arrays NumPy tipados:
+
+- números: int64/float64 + máscara de nulos
+- datas: datetime64[ms] (NaT = nulo)
+- textos: codificação por dicionário (códigos int32 sobre o dicionário
+  ordenado; -1 = nulo), então igualdade, intervalo e prefixo ($regex "^...")
+  viram intervalos de códigos
+- demais valores (documentos aninhados, tipos mistos): array de objetos, sem filtro
+
+As linhas ficam em ordem de _id (a paginação por cursor vira busca binária)
+e Subject, Date e Student_ID têm índices ordenados (argsort estável): a
+condição mais seletiva sobre eles é resolvida com searchsorted e as demais
+com máscaras vetorizadas só sobre as linhas candidatas.
+
+BancoSnapshot imita a interface do banco do motor usada pelos endpoints
+(find/sort/limit/to_list/async for, distinct, contagens), então main.py não
+muda; filtros que o snapshot não sabe avaliar e aggregate() seguem para o
+MongoDB. O snapshot é recarregado a cada SNAPSHOT_REFRESH_SECONDS e quando
+a ingestão/ETL publica alteração numa coleção carregada; a troca é atômica
+(consultas em andamento terminam sobre a versão anterior).
+"""
+import asyncio
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+import numpy as np
+
+MOTOR_API = os.getenv("API_MOTOR", "mongo")
+REFRESH_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "300"))
+LOAD_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "5000"))
+COLECOES = tuple(os.getenv(
+    "SNAPSHOT_COLECOES",
+    "performance,attendance,homework,students,teacher_parent_communication,"
+    "student_subject_facts,performance_scores",
+).split(","))
+INDICES = ("Subject", "Date", "Student_ID")
+# Campos só de controle da ingestão/ETL: não são servidos pela API
+IGNORADOS = {"_ingest_ts", "_etl_ts"}
+MATERIALIZAR_LOTE = 1000
+
+COMPARACOES = ("$eq", "$gte", "$gt", "$lte", "$lt")
+_PREFIXO = re.compile(r"^\^([^.^$*+?()\[\]{}|\\]*)$")
+
+
+class NaoSuportado(Exception):
+    """Filtro, projeção ou ordenação que o snapshot não avalia (a consulta vai ao MongoDB)"""
+
+
+# --- Colunas ---
+
+class Coluna:
+    """Interface comum: chaves comparáveis, nulos e conversão de valores de filtro"""
+
+    indexavel = True
+
+    def __len__(self):
+        return len(self.chaves)
+
+    @property
+    def nbytes(self):
+        return self.chaves.nbytes
+
+    def nulos(self, posicoes):
+        raise NotImplementedError
+
+    def chave(self, valor):
+        """Valor do filtro -> chave comparável com self.chaves; None se o tipo não casa"""
+        raise NotImplementedError
+
+    def intervalo(self, operadores):
+        """Operadores Mongo -> (inicio, inclui_inicio, fim, inclui_fim) em chaves; None = vazio"""
+        inicio, inclui_inicio, fim, inclui_fim = None, True, None, True
+        for operador, valor in operadores.items():
+            if operador not in COMPARACOES:
+                raise NaoSuportado(f"Operador não suportado nesta coluna: {operador}")
+            chave = self.chave(valor)
+            if chave is None:
+                # Tipos diferentes nunca casam no Mongo (type bracketing)
+                return None
+            if operador in ("$eq", "$gte", "$gt"):
+                inclui = operador != "$gt"
+                if inicio is None or chave > inicio or (chave == inicio and not inclui):
+                    inicio, inclui_inicio = chave, inclui
+            if operador in ("$eq", "$lte", "$lt"):
+                inclui = operador != "$lt"
+                if fim is None or chave < fim or (chave == fim and not inclui):
+                    fim, inclui_fim = chave, inclui
+        return inicio, inclui_inicio, fim, inclui_fim
+
+    def valores(self, posicoes):
+        """Valores Python (None para nulos) das posições pedidas"""
+        raise NotImplementedError
+
+
+class ColunaNumerica(Coluna):
+    def __init__(self, valores):
+        inteiros = all(isinstance(v, int) for v in valores if v is not None)
+        self._nulos = np.fromiter((v is None for v in valores), dtype=bool, count=len(valores))
+        tipo = np.int64 if inteiros else np.float64
+        self.chaves = np.fromiter((0 if v is None else v for v in valores), dtype=tipo, count=len(valores))
+
+    @property
+    def nbytes(self):
+        return self.chaves.nbytes + self._nulos.nbytes
+
+    def nulos(self, posicoes):
+        return self._nulos[posicoes]
+
+    def chave(self, valor):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            return None
+        return valor
+
+    def valores(self, posicoes):
+        lista = self.chaves[posicoes].tolist()
+        for i in np.flatnonzero(self._nulos[posicoes]):
+            lista[i] = None
+        return lista
+
+
+class ColunaData(Coluna):
+    def __init__(self, valores):
+        self.chaves = np.array([np.datetime64("NaT") if v is None else v for v in valores], dtype="datetime64[ms]")
+
+    def nulos(self, posicoes):
+        return np.isnat(self.chaves[posicoes])
+
+    def chave(self, valor):
+        return np.datetime64(valor, "ms") if isinstance(valor, datetime) else None
+
+    def valores(self, posicoes):
+        # datetime64[ms] -> datetime.datetime; NaT -> None
+        return self.chaves[posicoes].astype(object).tolist()
+
+
+class ColunaCategorica(Coluna):
+    """Códigos int32 sobre o dicionário ordenado de valores distintos"""
+
+    def __init__(self, valores, dicionario):
+        self.dicionario = dicionario
+        posicao = {valor: codigo for codigo, valor in enumerate(dicionario)}
+        self.chaves = np.fromiter((posicao.get(v, -1) if v is not None else -1 for v in valores),
+                                  dtype=np.int32, count=len(valores))
+        # Última posição = None: o código -1 decodifica direto para nulo
+        self._decodificar = np.array(list(dicionario) + [None], dtype=object)
+
+    @property
+    def nbytes(self):
+        return self.chaves.nbytes + self._decodificar.nbytes
+
+    def nulos(self, posicoes):
+        return self.chaves[posicoes] < 0
+
+    def _compativel(self, valor):
+        return bool(self.dicionario) and type(valor) is type(self.dicionario[0])
+
+    def intervalo(self, operadores):
+        # Intervalo [inicio, fim) de códigos; o dicionário ordenado preserva a ordem dos valores
+        inicio, fim = 0, len(self.dicionario)
+        for operador, valor in operadores.items():
+            if operador == "$regex":
+                casamento = _PREFIXO.match(valor) if isinstance(valor, str) else None
+                if not casamento:
+                    raise NaoSuportado(f"$regex não é um prefixo simples: {valor!r}")
+                prefixo = casamento.group(1)
+                if not self._compativel(prefixo):
+                    return None
+                inicio = max(inicio, bisect_left(self.dicionario, prefixo))
+                fim = min(fim, bisect_left(self.dicionario, prefixo + "\U0010ffff"))
+                continue
+            if operador not in COMPARACOES:
+                raise NaoSuportado(f"Operador não suportado: {operador}")
+            if not self._compativel(valor):
+                return None
+            if operador in ("$eq", "$gte"):
+                inicio = max(inicio, bisect_left(self.dicionario, valor))
+            if operador == "$gt":
+                inicio = max(inicio, bisect_right(self.dicionario, valor))
+            if operador in ("$eq", "$lte"):
+                fim = min(fim, bisect_right(self.dicionario, valor))
+            if operador == "$lt":
+                fim = min(fim, bisect_left(self.dicionario, valor))
+        return (inicio, True, fim, False) if inicio < fim else None
+
+    def chave(self, valor):
+        """Código do valor no dicionário; None se ausente ou de outro tipo"""
+        if not self._compativel(valor):
+            return None
+        i = bisect_left(self.dicionario, valor)
+        return i if i < len(self.dicionario) and self.dicionario[i] == valor else None
+
+    def distintos(self, posicoes=None):
+        if posicoes is None:
+            # O dicionário só contém valores presentes na coleção
+            return list(self.dicionario)
+        return [self.dicionario[c] for c in np.unique(self.chaves[posicoes]) if c >= 0]
+
+    def valores(self, posicoes):
+        return self._decodificar[self.chaves[posicoes]].tolist()
+
+
+class ColunaObjeto(Coluna):
+    """Valores sem tipo único (documentos aninhados, listas, tipos mistos): só materializados"""
+
+    indexavel = False
+
+    def __init__(self, valores):
+        self.chaves = np.empty(len(valores), dtype=object)
+        self.chaves[:] = valores
+
+    def nulos(self, posicoes):
+        return np.array([v is None for v in self.chaves[posicoes]], dtype=bool)
+
+    def intervalo(self, operadores):
+        raise NaoSuportado("Filtro em coluna sem tipo único")
+
+    def valores(self, posicoes):
+        return self.chaves[posicoes].tolist()
+
+
+def construir_coluna(valores):
+    """Escolhe a representação pelo tipo dos valores não nulos"""
+    presentes = [v for v in valores if v is not None]
+    if presentes and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in presentes):
+        return ColunaNumerica(valores)
+    if presentes and all(isinstance(v, datetime) for v in presentes):
+        return ColunaData(valores)
+    if all(isinstance(v, str) for v in presentes):
+        return ColunaCategorica(valores, sorted(set(presentes)))
+    if all(isinstance(v, bool) for v in presentes):
+        return ColunaCategorica(valores, sorted(set(presentes)))
+    return ColunaObjeto(valores)
+
+
+# --- Tabela ---
+
+class Indice:
+    """Posições das linhas não nulas ordenadas pela chave (empate mantém a ordem de _id)"""
+
+    def __init__(self, coluna):
+        todas = np.arange(len(coluna))
+        validas = todas[~coluna.nulos(todas)]
+        self.ordem = validas[np.argsort(coluna.chaves[validas], kind="stable")]
+        self.chaves = coluna.chaves[self.ordem]
+
+    @property
+    def nbytes(self):
+        return self.ordem.nbytes + self.chaves.nbytes
+
+    def posicoes(self, intervalo):
+        inicio, inclui_inicio, fim, inclui_fim = intervalo
+        a = 0 if inicio is None else np.searchsorted(self.chaves, inicio, "left" if inclui_inicio else "right")
+        b = len(self.chaves) if fim is None else np.searchsorted(self.chaves, fim, "right" if inclui_fim else "left")
+        return self.ordem[a:b] if a < b else self.ordem[:0]
+
+
+class Tabela:
+    """Colunas de uma coleção, linhas em ordem crescente de _id"""
+
+    def __init__(self, nome, ids, colunas, indices=INDICES):
+        self.nome = nome
+        self.ids = ids
+        self.colunas = colunas
+        self.indices = {campo: Indice(colunas[campo]) for campo in indices
+                        if campo in colunas and colunas[campo].indexavel}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return (self.ids.nbytes + sum(c.nbytes for c in self.colunas.values())
+                + sum(i.nbytes for i in self.indices.values()))
+
+
+def construir_tabela(nome, documentos, indices=INDICES):
+    """Lista de documentos -> Tabela (CPU pura; roda fora do event loop)"""
+    documentos.sort(key=lambda doc: doc["_id"])
+    campos = []
+    for doc in documentos:
+        for campo in doc:
+            if campo not in campos and campo != "_id" and campo not in IGNORADOS:
+                campos.append(campo)
+    ids = np.empty(len(documentos), dtype=object)
+    ids[:] = [doc["_id"] for doc in documentos]
+    colunas = {campo: construir_coluna([doc.get(campo) for doc in documentos]) for campo in campos}
+    return Tabela(nome, ids, colunas, indices)
+
+
+# --- Avaliação de filtros ---
+
+def _condicoes(filtro):
+    """Filtro Mongo -> [(campo, {operador: valor})]; só conjunções ($and implícito ou explícito)"""
+    condicoes = []
+    for campo, valor in (filtro or {}).items():
+        if campo == "$and":
+            for parte in valor:
+                condicoes.extend(_condicoes(parte))
+        elif campo.startswith("$"):
+            raise NaoSuportado(f"Operador não suportado: {campo}")
+        elif isinstance(valor, dict) and valor and all(k.startswith("$") for k in valor):
+            condicoes.append((campo, dict(valor)))
+        else:
+            condicoes.append((campo, {"$eq": valor}))
+    return condicoes
+
+
+def _mascara(coluna, operadores, posicoes):
+    """Máscara booleana (vetorizada) de uma condição sobre as posições candidatas"""
+    if operadores == {"$eq": None}:
+        return coluna.nulos(posicoes)
+    if "$in" in operadores or "$ne" in operadores:
+        if len(operadores) > 1 or not isinstance(coluna, (ColunaCategorica, ColunaNumerica)):
+            raise NaoSuportado("$in/$ne só isolados e em colunas de texto ou números")
+        mascara = _mascara_in(coluna, operadores.get("$in", [operadores.get("$ne")]), posicoes)
+        return ~mascara if "$ne" in operadores else mascara
+    intervalo = coluna.intervalo(operadores)
+    if intervalo is None:
+        return np.zeros(len(posicoes), dtype=bool)
+    inicio, inclui_inicio, fim, inclui_fim = intervalo
+    chaves = coluna.chaves[posicoes]
+    mascara = ~coluna.nulos(posicoes)
+    if inicio is not None:
+        mascara &= (chaves >= inicio) if inclui_inicio else (chaves > inicio)
+    if fim is not None:
+        mascara &= (chaves <= fim) if inclui_fim else (chaves < fim)
+    return mascara
+
+
+def _mascara_in(coluna, valores, posicoes):
+    chaves = [c for c in (coluna.chave(v) for v in valores if v is not None) if c is not None]
+    mascara = np.isin(coluna.chaves[posicoes], chaves) & ~coluna.nulos(posicoes)
+    if None in valores:
+        mascara |= coluna.nulos(posicoes)
+    return mascara
+
+
+def _intervalo_ids(ids, operadores):
+    """Condição em _id -> fatia [a, b) de linhas (ids em ordem crescente)"""
+    a, b = 0, len(ids)
+    for operador, valor in operadores.items():
+        if operador == "$gt":
+            a = max(a, np.searchsorted(ids, valor, "right"))
+        elif operador == "$gte":
+            a = max(a, np.searchsorted(ids, valor, "left"))
+        elif operador == "$lt":
+            b = min(b, np.searchsorted(ids, valor, "left"))
+        elif operador == "$lte":
+            b = min(b, np.searchsorted(ids, valor, "right"))
+        elif operador == "$eq":
+            a, b = max(a, np.searchsorted(ids, valor, "left")), min(b, np.searchsorted(ids, valor, "right"))
+        else:
+            raise NaoSuportado(f"Operador não suportado em _id: {operador}")
+    return a, b
+
+
+def selecionar(tabela, filtro):
+    """Posições (em ordem de _id) das linhas que satisfazem o filtro"""
+    condicoes = _condicoes(filtro)
+    a, b = 0, len(tabela)
+    restantes = []
+    melhor = None
+    for campo, operadores in condicoes:
+        if campo == "_id":
+            inicio, fim = _intervalo_ids(tabela.ids, operadores)
+            a, b = max(a, inicio), min(b, fim)
+            continue
+        coluna = tabela.colunas.get(campo)
+        if coluna is None:
+            # Campo inexistente na coleção: só {campo: None} casa
+            if operadores != {"$eq": None}:
+                return np.arange(0)
+            continue
+        indice = tabela.indices.get(campo)
+        if indice is not None and set(operadores) <= {"$eq", "$gte", "$gt", "$lte", "$lt", "$regex"} \
+                and None not in operadores.values():
+            intervalo = coluna.intervalo(operadores)
+            if intervalo is None:
+                return np.arange(0)
+            candidatas = indice.posicoes(intervalo)
+            if melhor is None or len(candidatas) < len(melhor[1]):
+                if melhor is not None:
+                    restantes.append(melhor[0])
+                melhor = ((campo, operadores), candidatas)
+                continue
+        restantes.append((campo, operadores))
+
+    if melhor is not None:
+        # Índice mais seletivo: posições de volta para a ordem de _id, recortadas pela fatia de _id
+        posicoes = np.sort(melhor[1])
+        posicoes = posicoes[(posicoes >= a) & (posicoes < b)]
+    else:
+        posicoes = np.arange(a, max(a, b))
+    for campo, operadores in restantes:
+        if not len(posicoes):
+            break
+        posicoes = posicoes[_mascara(tabela.colunas[campo], operadores, posicoes)]
+    return posicoes
+
+
+def _projetar(tabela, projecao):
+    """Projeção Mongo -> [(nome na saída, coluna ou None para _id)]"""
+    projecao = dict(projecao or {})
+    incluir_id = bool(projecao.pop("_id", 1))
+    inclusoes = {k: v for k, v in projecao.items() if v not in (0, False)}
+    if inclusoes and len(inclusoes) != len(projecao):
+        raise NaoSuportado("Projeção mistura inclusão e exclusão")
+    saida = [("_id", None)] if incluir_id else []
+    if inclusoes:
+        for nome, valor in inclusoes.items():
+            if isinstance(valor, str) and valor.startswith("$"):
+                origem = valor[1:]
+            elif valor in (1, True):
+                origem = nome
+            else:
+                raise NaoSuportado(f"Expressão de projeção não suportada: {nome}")
+            if origem in tabela.colunas:
+                saida.append((nome, tabela.colunas[origem]))
+    else:
+        saida.extend((nome, coluna) for nome, coluna in tabela.colunas.items() if nome not in projecao)
+    return saida
+
+
+def materializar(tabela, campos, posicoes):
+    """Posições -> lista de dicts, coluna a coluna"""
+    if not len(posicoes):
+        return []
+    listas = [tabela.ids[posicoes].tolist() if coluna is None else coluna.valores(posicoes)
+              for _, coluna in campos]
+    nomes = [nome for nome, _ in campos]
+    return [dict(zip(nomes, linha)) for linha in zip(*listas)]
+
+
+# --- Interface compatível com o motor ---
+
+class CursorSnapshot:
+    """Subconjunto do AsyncIOMotorCursor: sort, limit, batch_size, to_list e async for"""
+
+    def __init__(self, tabela, posicoes, campos):
+        self._tabela = tabela
+        self._posicoes = posicoes
+        self._campos = campos
+        self._limite = 0
+
+    def sort(self, chave, direcao=1):
+        ordenacao = chave if isinstance(chave, list) else [(chave, direcao)]
+        if len(ordenacao) != 1:
+            raise NaoSuportado("Ordenação por mais de um campo")
+        campo, direcao = ordenacao[0]
+        if campo == "_id":
+            if direcao == -1:
+                self._posicoes = self._posicoes[::-1]
+            return self
+        coluna = self._tabela.colunas.get(campo)
+        if coluna is None or not coluna.indexavel:
+            raise NaoSuportado(f"Ordenação por {campo}")
+        ordem = np.argsort(coluna.chaves[self._posicoes], kind="stable")
+        self._posicoes = self._posicoes[ordem[::-1] if direcao == -1 else ordem]
+        return self
+
+    def limit(self, limite):
+        self._limite = limite
+        return self
+
+    def batch_size(self, tamanho):
+        return self
+
+    def _selecionadas(self, length=None):
+        limites = [n for n in (self._limite, length) if n]
+        return self._posicoes[:min(limites)] if limites else self._posicoes
+
+    async def to_list(self, length=None):
+        return materializar(self._tabela, self._campos, self._selecionadas(length))
+
+    async def __aiter__(self):
+        posicoes = self._selecionadas()
+        for inicio in range(0, len(posicoes), MATERIALIZAR_LOTE):
+            for doc in materializar(self._tabela, self._campos, posicoes[inicio:inicio + MATERIALIZAR_LOTE]):
+                yield doc
+            # Cede o event loop entre lotes em exportações longas
+            await asyncio.sleep(0)
+
+
+class ColecaoSnapshot:
+    """Coleção respondida pelo snapshot; o que ele não avalia vai para a coleção do motor"""
+
+    def __init__(self, motor, collection):
+        self._motor = motor
+        self._collection = collection
+        self.name = collection.name
+
+    def __getattr__(self, nome):
+        # aggregate, find_one, etc.: direto no MongoDB
+        return getattr(self._collection, nome)
+
+    def _tabela(self):
+        return self._motor.tabelas.get(self.name)
+
+    def find(self, filtro=None, projecao=None, *args, **kwargs):
+        tabela = self._tabela()
+        if tabela is None or args or kwargs:
+            return self._collection.find(filtro, projecao, *args, **kwargs)
+        try:
+            return CursorSnapshot(tabela, selecionar(tabela, filtro), _projetar(tabela, projecao))
+        except NaoSuportado:
+            return self._collection.find(filtro, projecao)
+
+    async def distinct(self, campo, filtro=None):
+        tabela = self._tabela()
+        coluna = tabela.colunas.get(campo) if tabela is not None else None
+        if isinstance(coluna, ColunaCategorica):
+            try:
+                return coluna.distintos(selecionar(tabela, filtro) if filtro else None)
+            except NaoSuportado:
+                pass
+        return await self._collection.distinct(campo, filtro)
+
+    async def count_documents(self, filtro, **kwargs):
+        tabela = self._tabela()
+        if tabela is not None and not kwargs:
+            try:
+                return len(selecionar(tabela, filtro))
+            except NaoSuportado:
+                pass
+        return await self._collection.count_documents(filtro, **kwargs)
+
+    async def estimated_document_count(self, **kwargs):
+        tabela = self._tabela()
+        return len(tabela) if tabela is not None else await self._collection.estimated_document_count(**kwargs)
+
+
+class BancoSnapshot:
+    """Banco com a mesma interface do AsyncIOMotorDatabase usada pelos endpoints"""
+
+    def __init__(self, db, motor):
+        self._db = db
+        self._motor = motor
+
+    def __getitem__(self, nome):
+        if nome in self._motor.colecoes:
+            return ColecaoSnapshot(self._motor, self._db[nome])
+        return self._db[nome]
+
+    def __getattr__(self, nome):
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+        return self[nome]
+
+
+class MotorSnapshot:
+    """Carrega as coleções em colunas e as recarrega por agendamento ou aviso de alteração"""
+
+    def __init__(self, colecoes=COLECOES, intervalo=REFRESH_SECONDS):
+        self.colecoes = colecoes
+        self.intervalo = intervalo
+        self.tabelas = {}
+        self._db = None
+        self._tarefa = None
+        # Criado no primeiro uso, dentro do loop: até o Python 3.9 o Lock se prende ao loop
+        # corrente na criação, e a instância é criada na importação de main.py
+        self._lock = None
+
+    async def _carregar_colecao(self, db, nome):
+        inicio = time.perf_counter()
+        projecao = dict.fromkeys(IGNORADOS, 0)
+        documentos = await db[nome].find({}, projecao).batch_size(LOAD_BATCH_SIZE).to_list(length=None)
+        tabela = await asyncio.to_thread(construir_tabela, nome, documentos)
+        print(f"📦 Snapshot {nome}: {len(tabela)} linhas, {tabela.nbytes / 1024 / 1024:.1f} MB "
+              f"em {time.perf_counter() - inicio:.1f}s")
+        return tabela
+
+    async def carregar(self, db, colecoes=None):
+        """Recarrega as coleções pedidas (padrão: todas) e troca as tabelas de uma vez"""
+        nomes = [nome for nome in (colecoes or self.colecoes) if nome in self.colecoes]
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            tabelas = await asyncio.gather(*(self._carregar_colecao(db, nome) for nome in nomes))
+            # Troca atômica: um novo dict substitui o anterior numa única atribuição
+            self.tabelas = {**self.tabelas, **dict(zip(nomes, tabelas))}
+        return self.tabelas
+
+    async def ao_alterar(self, colecoes):
+        """Callback do MonitorVersoes: termina antes de a versão nova valer no cache de respostas"""
+        alteradas = set(colecoes) & set(self.colecoes)
+        if self._db is not None and alteradas:
+            try:
+                await self.carregar(self._db, alteradas)
+            except Exception as e:
+                # Sem recarga, as tabelas antigas não podem responder sob a versão nova:
+                # essas coleções voltam a ser lidas do MongoDB até o próximo agendamento
+                self.tabelas = {nome: tabela for nome, tabela in self.tabelas.items() if nome not in alteradas}
+                print(f"⚠️ Falha ao recarregar o snapshot ({', '.join(sorted(alteradas))} vão ao MongoDB): {e!r}")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.carregar(self._db)
+            except Exception as e:
+                print(f"⚠️ Falha ao recarregar o snapshot: {e!r}")
+
+    def iniciar(self, db):
+        self._db = db
+        self._tarefa = asyncio.create_task(self._loop())
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,5 @@
+"""Os módulos do backend são importados como irmãos (python main.py a partir de backend/)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
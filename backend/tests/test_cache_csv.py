@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import cache_csv
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture
+def pasta_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_csv, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cache_csv, "ATIVO", True)
+    return tmp_path
+
+
+def _comparavel(df):
+    # read_csv usa NaN e o Arrow, None, para textos ausentes
+    return df.astype(object).where(df.notna(), None)
+
+
+def _leitura_em_blocos(csv_path, linhas):
+    return pd.concat(pd.read_csv(csv_path, chunksize=linhas), ignore_index=True)
+
+
+@pytest.mark.parametrize("nome, dicionario", [("homework.csv", "Subject"), ("students.csv", "Grade_Level")])
+def test_cache_igual_a_leitura_em_blocos(pasta_cache, monkeypatch, nome, dicionario):
+    monkeypatch.setattr(cache_csv, "LINHAS_POR_LOTE", 5000)
+    csv_path = os.path.join(DATA_DIR, nome)
+    esperado = _leitura_em_blocos(csv_path, 5000)
+    obtido = cache_csv.ler_csv(csv_path)
+    assert list(obtido.dtypes) == list(esperado.dtypes)
+    pd.testing.assert_frame_equal(_comparavel(obtido), _comparavel(esperado))
+
+    tabela = cache_csv.abrir(csv_path)
+    assert tabela.num_rows == len(esperado)
+    assert pa.types.is_dictionary(tabela.schema.field(dicionario).type)
+
+
+def test_tipos_unificados_entre_blocos(pasta_cache):
+    # Inteiros no primeiro bloco e NaN no segundo; texto só no segundo bloco
+    csv_path = pasta_cache / "misto.csv"
+    csv_path.write_text("a,b,c\n1,x,1\n2,y,2\n,z,3\n4,w,texto\n")
+    cache_csv.converter(str(csv_path), cache_csv.caminho_cache(str(csv_path), "0" * 64), linhas_por_lote=2)
+    obtido = cache_csv.para_pandas(pa.ipc.open_file(cache_csv.caminho_cache(str(csv_path), "0" * 64)).read_all())
+    esperado = pd.read_csv(csv_path)
+    assert list(obtido.dtypes) == list(esperado.dtypes)
+    pd.testing.assert_frame_equal(_comparavel(obtido), _comparavel(esperado))
+
+
+def test_blocos_do_cache(pasta_cache):
+    csv_path = os.path.join(DATA_DIR, "teacher_parent_communication.csv")
+    blocos = list(cache_csv.ler_blocos(csv_path, 10000))
+    esperado = list(pd.read_csv(csv_path, chunksize=10000))
+    assert [len(b) for b in blocos] == [len(b) for b in esperado]
+    assert blocos[-1].index[0] == esperado[-1].index[0]
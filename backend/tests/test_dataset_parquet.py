@@ -0,0 +1,21 @@
+import pandas as pd
+
+from dataset_parquet import EscritorParticionado
+
+
+def test_abortar_remove_particoes_gravadas(tmp_path):
+    raiz = tmp_path / "dataset"
+    escritor = EscritorParticionado(str(raiz), schema=None)
+    escritor.escrever(pd.DataFrame({"Subject": ["Math", "Art"], "Final_Score": [80.0, 70.0]}))
+    assert sorted(p.name for p in raiz.iterdir()) == ["Subject=Art", "Subject=Math"]
+
+    escritor.abortar()
+    assert not raiz.exists()
+
+
+def test_abortar_preserva_arquivos_de_outros(tmp_path):
+    (tmp_path / "anterior.parquet").write_bytes(b"")
+    escritor = EscritorParticionado(str(tmp_path), schema=None, particao=None)
+    escritor.escrever(pd.DataFrame({"Final_Score": [80.0]}))
+    escritor.abortar()
+    assert [p.name for p in tmp_path.iterdir()] == ["anterior.parquet"]
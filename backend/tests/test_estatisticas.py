@@ -0,0 +1,40 @@
+import asyncio
+from datetime import datetime
+
+import mongomock
+
+from estatisticas import frequencia_presencas
+
+
+class _Cursor:
+    async def to_list(self, length=None):
+        return [{"por_disciplina": [], "por_dia": []}]
+
+
+class _Colecao:
+    """Guarda o pipeline recebido (o mongomock não implementa $isoDayOfWeek)"""
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipeline = pipeline
+        return _Cursor()
+
+
+def test_dia_da_semana_so_recebe_datas_bson():
+    colecao = _Colecao()
+    asyncio.run(frequencia_presencas(colecao))
+    por_dia = colecao.pipeline[-1]["$facet"]["por_dia"]
+    indice_grupo = next(i for i, etapa in enumerate(por_dia) if "$group" in etapa)
+    assert indice_grupo > 0
+
+    documentos = mongomock.MongoClient().escola.attendance
+    documentos.insert_many([
+        {"Subject": "Math", "Date": datetime(2024, 1, 1)},
+        # Ingestões antigas gravavam a data como veio do CSV
+        {"Subject": "Math", "Date": "2024-01-02"},
+        {"Subject": "Math", "Date": "01/03/2024"},
+        {"Subject": "Math", "Date": None},
+        {"Subject": "Math"},
+    ])
+    filtros = [etapa["$match"] for etapa in por_dia[:indice_grupo]]
+    restantes = list(documentos.find({"$and": filtros}, {"_id": 0}))
+    assert restantes == [{"Subject": "Math", "Date": datetime(2024, 1, 1)}]
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pandas as pd
+
+from schema import limpar_chunk, normalizar
+
+
+def test_datas_nos_formatos_dos_csvs_de_exemplo():
+    # homework.csv usa MM/DD/YYYY, students.csv MM-DD-YYYY, os demais ISO
+    df = pd.DataFrame({
+        "Student_ID": ["S1", "S2", "S3"],
+        "Assignment_Name": ["a", "b", "c"],
+        "Due_Date": ["2024-09-10", "02/07/2025", "12/13/2024"],
+        "Status": ["✅", "❌", "pending"],
+    })
+    df, anulados = normalizar("homework", df)
+    assert df["Due_Date"].tolist() == [datetime(2024, 9, 10), datetime(2025, 2, 7), datetime(2024, 12, 13)]
+    assert anulados == {}
+
+    alunos = pd.DataFrame({"Student_ID": ["S1", "S2"], "Date_of_Birth": ["2007-02-10", "11-10-2014"]})
+    alunos, _ = normalizar("students", alunos)
+    assert alunos["Date_of_Birth"].tolist() == [datetime(2007, 2, 10), datetime(2014, 11, 10)]
+
+
+def test_data_invalida_mantem_a_linha_com_null():
+    df = pd.DataFrame({"Student_ID": ["S1", "S2"], "Date_of_Birth": ["2007-02-10", "31/31/2014"]})
+    df, anulados = normalizar("students", df)
+    assert len(df) == 2
+    assert df["Date_of_Birth"].tolist() == [datetime(2007, 2, 10), None]
+    assert anulados == {"Date_of_Birth": 1}
+
+
+def test_percentual_fora_da_faixa_vira_null():
+    df = pd.DataFrame({
+        "Student_ID": ["S1", "S2", "S3", "S4"],
+        "Subject": ["Math"] * 4,
+        "Exam_Score": ["76", "91", "80", "65"],
+        "Homework_Completion_%": ["90", "100%", "-5", "0"],
+        "Teacher_Comments": ["x"] * 4,
+    })
+    df = limpar_chunk(df, "performance")
+    assert len(df) == 4
+    assert df["Homework_Completion_%"].tolist() == [90, 100, None, 0]
+    assert df["Exam_Score"].dtype == "int64"
+
+
+def test_enum_em_branco_nao_conta_como_invalido():
+    df = pd.DataFrame({"Student_ID": ["S1", "S2", "S3"], "Guardian_Signature": ["Yes", " ", "talvez"]})
+    df, anulados = normalizar("homework", df)
+    assert df["Guardian_Signature"].tolist() == [True, None, None]
+    assert anulados == {"Guardian_Signature": 1}
@@ -0,0 +1,142 @@
+"""Acesso do dashboard à API: sessão HTTP com pool, consultas em paralelo e latências.
+
+Uma única requests.Session (conexões keep-alive reaproveitadas) é compartilhada
+pelas threads que disparam as consultas independentes ao mesmo tempo, então o
+tempo da página passa a ser o da consulta mais lenta e não a soma de todas.
+Cada chamada pode ser registrada (status, tempo e tamanho) na lista passada em
+`registro`: o cliente é compartilhado entre sessões, o registro é de quem chama.
+
+Configuração por variáveis de ambiente:
+    DASHBOARD_API_URL          URL base da API (padrão http://localhost:8000)
+    DASHBOARD_CONNECT_TIMEOUT  segundos para abrir a conexão (padrão 3)
+    DASHBOARD_READ_TIMEOUT     segundos esperando a resposta (padrão 30)
+    DASHBOARD_POOL_SIZE        conexões mantidas abertas e threads (padrão 8)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cliente_colunar import carregar_dataframe
+
+API_URL = os.getenv("DASHBOARD_API_URL", "http://localhost:8000").rstrip("/")
+CONNECT_TIMEOUT = float(os.getenv("DASHBOARD_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("DASHBOARD_READ_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("DASHBOARD_POOL_SIZE", "8"))
+
+
+@dataclass
+class Chamada:
+    metodo: str
+    endpoint: str
+    status: int
+    ms: float
+    bytes: int
+    cache: str
+    quando: float
+
+
+def _conteudo(data):
+    # Endpoints de listagem devolvem páginas {"items": [...], "next_cursor": ...}
+    if isinstance(data, dict) and "items" in data:
+        return data["items"]
+    return data
+
+
+def _sem_nulos(params):
+    return {k: v for k, v in (params or {}).items() if v is not None}
+
+
+class ClienteAPI:
+    """Cliente HTTP da API; seguro para uso simultâneo por várias threads"""
+
+    def __init__(self, base_url=API_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, pool_size=POOL_SIZE):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        # Só GET é repetido: falhas de conexão e 502/503/504 passageiros
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET"}), raise_on_status=False)
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api")
+        self._lock = threading.Lock()
+
+    def _registrar(self, registro, metodo, endpoint, inicio, status=0, tamanho=0, cache=""):
+        if registro is None:
+            return
+        chamada = Chamada(metodo, endpoint, status, (time.perf_counter() - inicio) * 1000,
+                          tamanho, cache, time.time())
+        # Consultas de varios() registram das threads do pool
+        with self._lock:
+            registro.append(chamada)
+
+    def _requisitar(self, metodo, endpoint, registro=None, **kwargs):
+        inicio = time.perf_counter()
+        response = None
+        try:
+            response = self.session.request(metodo, f"{self.base_url}{endpoint}", timeout=self.timeout, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        finally:
+            if response is None:
+                # Falha de conexão/timeout: registrada com status 0
+                self._registrar(registro, metodo, endpoint, inicio)
+            else:
+                self._registrar(registro, metodo, endpoint, inicio, response.status_code,
+                                len(response.content), response.headers.get("X-Cache", ""))
+
+    def get(self, endpoint, params=None, registro=None):
+        """GET endpoint -> JSON (páginas {"items": ...} já desembrulhadas)"""
+        return _conteudo(self._requisitar("GET", endpoint, registro, params=_sem_nulos(params)))
+
+    def varios(self, consultas, registro=None):
+        """{nome: (endpoint, params)} -> {nome: (dados, erro)}, com os GETs disparados em paralelo
+
+        Um erro fica só na própria consulta: dados None e a exceção em erro.
+        """
+        futuros = {nome: self._executor.submit(self.get, endpoint, params, registro)
+                   for nome, (endpoint, params) in consultas.items()}
+        resultados = {}
+        for nome, futuro in futuros.items():
+            try:
+                resultados[nome] = (futuro.result(), None)
+            except Exception as e:
+                resultados[nome] = (None, e)
+        return resultados
+
+    def lote(self, consultas, registro=None):
+        """{nome: (endpoint, params)} numa só requisição POST /batch -> {nome: {"status", "data"}}"""
+        corpo = {"consultas": {
+            nome: {"path": endpoint, "params": _sem_nulos(params)}
+            for nome, (endpoint, params) in consultas.items()
+        }}
+        resultados = self._requisitar("POST", "/batch", registro, json=corpo)
+        for resultado in resultados.values():
+            if resultado["status"] == 200:
+                resultado["data"] = _conteudo(resultado["data"])
+        return resultados
+
+    def dataframe(self, collection, campos=None, filtros=None, registro=None):
+        """DataFrame via /export em Arrow (sem passar por JSON), pela mesma sessão"""
+        inicio = time.perf_counter()
+        status = 0
+        try:
+            df = carregar_dataframe(self.base_url, collection, campos, filtros,
+                                    timeout=self.timeout, session=self.session)
+            status = 200
+            return df
+        finally:
+            self._registrar(registro, "GET", f"/export/{collection}", inicio, status)
+
+    def fechar(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
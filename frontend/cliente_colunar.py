@@ -0,0 +1,27 @@
+"""Cliente do endpoint /export da API: DataFrames a partir de colunas Arrow.
+
+Evita o caminho JSON -> lista de dicts -> DataFrame: o corpo Arrow IPC é
+lido em streaming e convertido direto para pandas.
+"""
+import pyarrow as pa
+import requests
+
+
+def carregar_dataframe(base_url, collection, campos=None, filtros=None, timeout=30, session=None):
+    """Busca /export/{collection} em Arrow IPC e devolve um pandas.DataFrame
+
+    filtros: dicionário Campo -> valor (igualdade), ex.: {"Subject": "Math"}
+    """
+    params = {"formato": "arrow"}
+    if campos:
+        params["campos"] = ",".join(campos)
+    if filtros:
+        params["filtro"] = [f"{campo}:{valor}" for campo, valor in filtros.items() if valor is not None]
+
+    cliente = session or requests
+    response = cliente.get(f"{base_url}/export/{collection}", params=params, stream=True, timeout=timeout)
+    response.raise_for_status()
+    # A API pode comprimir a resposta (gzip/br): o urllib3 descomprime ao ler
+    response.raw.decode_content = True
+    with pa.ipc.open_stream(response.raw) as leitor:
+        return leitor.read_pandas()
@@ -1,9 +1,15 @@
+import os
+
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+from cliente_api import ClienteAPI
+
+
+DIAS_SEMANA = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
 # Funções auxiliares para formatação de datas
 def formatar_data_brasil(data):
@@ -27,6 +33,81 @@ st.set_page_config(
 # Título principal
 st.title("📚 Dashboard Educacional Completo")
 
+# Cliente da API (sessão com pool de conexões), compartilhado entre execuções do script
+@st.cache_resource
+def obter_cliente():
+    return ClienteAPI()
+
+cliente = obter_cliente()
+# Chamadas feitas nesta execução do script, só desta sessão (o cliente é compartilhado)
+chamadas_execucao = []
+
+# Consultas independentes disparadas ao mesmo tempo pela sessão compartilhada
+# (_registro fica fora da chave do st.cache_data por começar com "_")
+@st.cache_data(ttl=300, show_spinner="Carregando dados...")
+def fetch_paralelo(consultas, _registro=None):
+    """consultas: {nome: (endpoint, params)} -> {nome: dados ou None}"""
+    dados = {}
+    for nome, (resultado, erro) in cliente.varios(consultas, _registro).items():
+        if erro is not None:
+            st.error(f"Erro na requisição para {consultas[nome][0]}: {str(erro)}")
+        dados[nome] = resultado
+    return dados
+
+# Várias consultas numa única requisição (POST /batch), executadas em paralelo no servidor
+@st.cache_data(ttl=300, show_spinner="Carregando dados...")
+def fetch_batch(consultas, _registro=None):
+    """consultas: {nome: (endpoint, params)} -> {nome: dados ou None}"""
+    try:
+        resultados = cliente.lote(consultas, _registro)
+    except Exception as e:
+        st.error(f"Erro na requisição em lote: {str(e)}")
+        return {nome: None for nome in consultas}
+
+    dados = {}
+    for nome, resultado in resultados.items():
+        if resultado["status"] != 200:
+            st.error(f"Erro na requisição para {consultas[nome][0]}: {resultado['data']}")
+            dados[nome] = None
+        else:
+            dados[nome] = resultado["data"]
+    return dados
+
+# Linhas de uma coleção em colunas Arrow (/export), sem montar listas de dicts
+@st.cache_data(ttl=300, show_spinner="Carregando dados...")
+def fetch_dataframe(collection, campos=None, filtros=None, _registro=None):
+    try:
+        return cliente.dataframe(collection, campos, filtros, _registro)
+    except Exception as e:
+        st.error(f"Erro na exportação de {collection}: {str(e)}")
+        return None
+
+def mostrar_latencias():
+    """Painel de debug: chamadas à API feitas nesta execução (respostas em cache não aparecem)"""
+    if not mostrar_debug:
+        return
+    with st.sidebar.expander("🐞 Latência das chamadas", expanded=True):
+        if not chamadas_execucao:
+            st.caption("Nenhuma chamada nesta execução (dados do cache do Streamlit)")
+            return
+        df_chamadas = pd.DataFrame([{
+            "Endpoint": f"{c.metodo} {c.endpoint}",
+            "Status": c.status,
+            "ms": c.ms,
+            "KB": c.bytes / 1024,
+            "Cache": c.cache,
+        } for c in chamadas_execucao])
+        st.dataframe(
+            df_chamadas,
+            column_config={
+                "ms": st.column_config.NumberColumn("ms", format="%.0f"),
+                "KB": st.column_config.NumberColumn("KB", format="%.1f")
+            },
+            hide_index=True
+        )
+        st.caption(f"{len(chamadas_execucao)} chamadas · soma {df_chamadas['ms'].sum():.0f} ms · "
+                   f"mais lenta {df_chamadas['ms'].max():.0f} ms · API {cliente.base_url}")
+
 # Sidebar com filtros globais
 with st.sidebar:
     st.header("⚙️ Filtros Globais")
@@ -64,60 +145,77 @@ with st.sidebar:
         st.error("Data inicial maior que final!")
         datas_validas = False
     
+    # Seções que não dependem da disciplina: buscadas ao mesmo tempo
+    consultas_independentes = {
+        "summary": ("/dashboard/summary", None),
+        "subjects": ("/dimensions/subjects", None),
+        "exam": ("/stats/exam", None),
+        "comms": ("/communications", {"last_days": 30}),
+    }
+    if datas_validas:
+        consultas_independentes["attendance"] = ("/stats/attendance", {
+            "date_start": data_inicio.strftime("%Y-%m-%d"),
+            "date_end": data_fim.strftime("%Y-%m-%d")
+        })
+    dados_secoes = fetch_paralelo(consultas_independentes, chamadas_execucao)
+    # Resumo pré-computado: KPIs, disciplinas, status de tarefas e histogramas
+    summary_data = dados_secoes.get("summary") or {}
+    
     st.markdown("---")
     
-    # Filtro de disciplinas
-    try:
-        subjects = requests.get("http://localhost:8000/performance", timeout=5).json()
-        unique_subjects = list(set([item.get("Subject") for item in subjects if isinstance(item, dict) and "Subject" in item]))
-        selected_subjects = st.multiselect(
-            "Disciplinas",
-            options=unique_subjects,
-            default=unique_subjects[:2] if unique_subjects else []
-        )
-    except Exception as e:
-        st.error(f"Erro ao carregar disciplinas: {str(e)}")
-        selected_subjects = []
+    # Filtro de disciplinas (valores distintos da coleção, em cache na API)
+    unique_subjects = dados_secoes.get("subjects") or []
+    if not unique_subjects:
+        st.error("Erro ao carregar disciplinas")
+    selected_subjects = st.multiselect(
+        "Disciplinas",
+        options=unique_subjects,
+        default=unique_subjects[:2] if unique_subjects else []
+    )
     
     st.markdown("---")
+    mostrar_debug = st.checkbox("Mostrar latências da API", value=os.getenv("DASHBOARD_DEBUG") == "1")
     st.markdown(f"🔄 Atualizado em: {formatar_data_brasil(datetime.now())} {datetime.now().strftime('%H:%M')}")
 
-# Função para buscar dados da API
-@st.cache_data(ttl=300, show_spinner="Carregando dados...")
-def fetch_api_data(endpoint, params=None):
-    try:
-        response = requests.get(
-            f"http://localhost:8000{endpoint}", 
-            params=params,
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"Erro na requisição para {endpoint}: {str(e)}")
-        return None
+# Seções que dependem da disciplina selecionada: uma requisição em lote
+if selected_subjects:
+    consultas_secoes = {"correlation": ("/stats/correlation", {"subject": selected_subjects[0]})}
+    dados_secoes = {**dados_secoes, **fetch_batch(consultas_secoes, chamadas_execucao)}
 
 # -------------------------
 # Seção 1: Visão Geral
 # -------------------------
 st.header("📊 Visão Geral")
 
-# Dados resumidos
-summary_data = fetch_api_data("/dashboard/summary")
-
 if summary_data:
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         present = next((x.get("count", 0) for x in summary_data.get("attendance_stats", []) if x.get("_id") == "Present"), 0)
         st.metric("Presenças", f"{present:,}")
     
     with col2:
-        completed = next((x.get("count", 0) for x in summary_data.get("homework_status", []) if x.get("_id") == "✅"), 0)
+        completed = next((x.get("count", 0) for x in summary_data.get("homework_status", []) if x.get("_id") == "done"), 0)
         st.metric("Tarefas Concluídas", f"{completed:,}")
     
     with col3:
-        st.metric("Comunicações Recentes", len(summary_data.get("recent_comms", [])))
+        st.metric("Alunos", f"{summary_data.get('totals', {}).get('students', 0):,}")
+
+    with col4:
+        st.metric("Comunicações", f"{summary_data.get('totals', {}).get('communications', 0):,}")
+
+    # Distribuição de conclusão de tarefas sobre a coleção inteira ($bucket no servidor)
+    histograma = pd.DataFrame(summary_data.get("completion_histogram", []))
+    if not histograma.empty:
+        histograma["Faixa"] = histograma["min"].astype(str) + "–" + histograma["max"].astype(str) + "%"
+        fig_hist = px.bar(
+            histograma,
+            x="Faixa",
+            y="count",
+            title="Distribuição de Conclusão de Tarefas (todos os registros)",
+            labels={"count": "Registros", "Faixa": "% de Conclusão"}
+        )
+        st.plotly_chart(fig_hist, use_container_width=True)
 
 # -------------------------
 # Seção 2: Frequência
@@ -125,41 +223,38 @@ if summary_data:
 st.header("📅 Análise de Frequência")
 
 if datas_validas:
-    attendance_params = {
-        "date_start": data_inicio.strftime("%Y-%m-%d"),
-        "date_end": data_fim.strftime("%Y-%m-%d")
-    }
-    attendance_data = fetch_api_data("/attendance", attendance_params)
+    # Contagens agregadas no servidor sobre todos os registros do período
+    attendance_stats = dados_secoes.get("attendance")
     
-    if attendance_data:
-        df_attendance = pd.DataFrame(attendance_data)
+    if attendance_stats and attendance_stats.get("por_disciplina"):
+        df_status = pd.DataFrame(attendance_stats["por_disciplina"])
         
-        if not df_attendance.empty:
-            # Gráfico de frequência por disciplina
-            fig_attendance = px.bar(
-                df_attendance.groupby(["Subject", "Attendance_Status"]).size().unstack(fill_value=0),
-                barmode="group",
-                title="Frequência por Disciplina",
-                labels={"value": "Quantidade"}
-            )
-            st.plotly_chart(fig_attendance, use_container_width=True)
-            
-            # Heatmap de frequência
-            df_attendance["Date"] = pd.to_datetime(df_attendance["Date"])
-            df_attendance["Day"] = df_attendance["Date"].dt.day_name()
-            
-            fig_heatmap = px.density_heatmap(
-                df_attendance,
-                x="Day",
-                y="Subject",
-                z="Attendance_Status",
-                histfunc="count",
-                title="Distribuição de Frequência por Dia",
-                color_continuous_scale="Viridis"
-            )
-            st.plotly_chart(fig_heatmap, use_container_width=True)
-        else:
-            st.warning(f"Nenhum registro de frequência encontrado entre {data_inicio_str} e {data_fim_str}")
+        # Gráfico de frequência por disciplina
+        fig_attendance = px.bar(
+            df_status.pivot(index="Subject", columns="Attendance_Status", values="count").fillna(0),
+            barmode="group",
+            title="Frequência por Disciplina",
+            labels={"value": "Quantidade"}
+        )
+        st.plotly_chart(fig_attendance, use_container_width=True)
+        
+        # Heatmap de frequência (dia ISO: 1 = segunda)
+        df_dias = pd.DataFrame(attendance_stats["por_dia"])
+        df_dias["Day"] = df_dias["dia"].map(dict(enumerate(DIAS_SEMANA, start=1)))
+        
+        fig_heatmap = px.density_heatmap(
+            df_dias,
+            x="Day",
+            y="Subject",
+            z="count",
+            histfunc="sum",
+            category_orders={"Day": DIAS_SEMANA},
+            title="Distribuição de Frequência por Dia",
+            color_continuous_scale="Viridis"
+        )
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+    elif attendance_stats is not None:
+        st.warning(f"Nenhum registro de frequência encontrado entre {data_inicio_str} e {data_fim_str}")
 else:
     st.warning("Selecione um intervalo de datas válido para visualizar a frequência")
 
@@ -173,25 +268,33 @@ tab1, tab2 = st.tabs(["📝 Notas por Disciplina", "📈 Relação Notas-Tarefas
 
 with tab1:
     st.subheader("Distribuição de Notas")
-    performance_data = fetch_api_data("/performance", {"subject": selected_subjects[0] if selected_subjects else None})
+    # Quartis, média e desvio calculados no servidor sobre todas as notas
+    exam_stats = dados_secoes.get("exam")
     
-    if performance_data:
-        df_performance = pd.DataFrame(performance_data)
+    if exam_stats:
+        df_stats = pd.DataFrame(exam_stats)
+        if selected_subjects:
+            df_stats = df_stats[df_stats["Subject"].isin(selected_subjects)]
         
-        if "Exam_Score" in df_performance.columns:
-            fig = px.box(
-                df_performance,
-                x="Subject",
-                y="Exam_Score",
-                title="Distribuição de Notas por Disciplina",
-                color="Subject",
-                labels={"Exam_Score": "Nota do Exame"}
-            )
+        if not df_stats.empty:
+            fig = go.Figure()
+            for _, linha in df_stats.iterrows():
+                fig.add_trace(go.Box(
+                    name=linha["Subject"],
+                    q1=[linha["q1"]],
+                    median=[linha["median"]],
+                    q3=[linha["q3"]],
+                    lowerfence=[linha["min"]],
+                    upperfence=[linha["max"]],
+                    mean=[linha["mean"]],
+                    sd=[linha["std"]]
+                ))
+            fig.update_layout(title="Distribuição de Notas por Disciplina", yaxis_title="Nota do Exame")
             st.plotly_chart(fig, use_container_width=True)
             
             # Estatísticas resumidas
             st.subheader("Estatísticas por Disciplina")
-            stats_df = df_performance.groupby("Subject")["Exam_Score"].agg(['mean', 'median', 'std', 'count'])
+            stats_df = df_stats.set_index("Subject")[["mean", "median", "std", "count"]]
             stats_df.columns = ['Média', 'Mediana', 'Desvio Padrão', 'Alunos']
             st.dataframe(stats_df.style.format("{:.1f}"), use_container_width=True)
         else:
@@ -203,79 +306,51 @@ with tab2:
     # Verificação se há disciplinas selecionadas
     if not selected_subjects:
         st.warning("Selecione pelo menos uma disciplina nos filtros globais")
+        mostrar_latencias()
         st.stop()
     
-    # Busca dados de homework completion
-    hw_data = fetch_api_data("/performance/homework-completion", {
-        "subject": selected_subjects[0],
-        "min_percentage": 0
-    })
-    
-    # Busca dados de performance
-    perf_data = fetch_api_data("/performance", {
-        "subject": selected_subjects[0]
-    })
+    # Correlação e nota média por faixa de conclusão, calculadas no servidor
+    correlacao = dados_secoes.get("correlation")
     
-    if hw_data and perf_data:
-        df_hw = pd.DataFrame(hw_data)
-        df_perf = pd.DataFrame(perf_data)
+    if correlacao and correlacao.get("count"):
+        df_faixas = pd.DataFrame(correlacao["faixas"])
+        df_faixas["Faixa"] = df_faixas["min"].astype(str) + "–" + df_faixas["max"].astype(str) + "%"
         
-        # Combina os dados manualmente
-        df_combined = pd.merge(
-            df_perf[['Student_ID', 'Subject', 'Exam_Score']],
-            df_hw[['Student_ID', 'Subject', 'Homework_Completion']],
-            on=['Student_ID', 'Subject'],
-            how='inner'
+        fig = px.line(
+            df_faixas,
+            x="Faixa",
+            y="mean_exam",
+            markers=True,
+            title=f"Relação Notas x Tarefas - {selected_subjects[0]}",
+            labels={
+                "Faixa": "% Conclusão de Tarefas",
+                "mean_exam": "Nota Média do Exame"
+            }
         )
+        st.plotly_chart(fig, use_container_width=True)
         
-        if not df_combined.empty:
-            # Gráfico de dispersão
-            fig = px.scatter(
-                df_combined,
-                x="Homework_Completion",
-                y="Exam_Score",
-                color="Student_ID",
-                trendline="ols",
-                title=f"Relação Notas x Tarefas - {selected_subjects[0]}",
-                labels={
-                    "Homework_Completion": "% Conclusão de Tarefas",
-                    "Exam_Score": "Nota do Exame"
-                }
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Cálculo da correlação
-            correlation = df_combined["Exam_Score"].corr(df_combined["Homework_Completion"])
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Correlação", f"{correlation:.2f}", 
-                         delta="Forte" if abs(correlation) > 0.5 else "Moderada" if abs(correlation) > 0.3 else "Fraca")
-            
-            with col2:
-                st.metric("Alunos na análise", len(df_combined))
-            
-            # Tabela com dados combinados
-            st.subheader("Dados Completos")
-            st.dataframe(
-                df_combined,
-                column_config={
-                    "Homework_Completion": st.column_config.ProgressColumn(
-                        "% Concluído",
-                        format="%d%%",
-                        min_value=0,
-                        max_value=100
-                    )
-                },
-                hide_index=True
-            )
-        else:
-            st.warning("Nenhum aluno com dados completos de notas e tarefas")
-    else:
-        if not hw_data:
-            st.error("Falha ao carregar dados de conclusão de tarefas")
-        if not perf_data:
-            st.error("Falha ao carregar dados de desempenho")
+        correlation = correlacao["correlation"] or 0.0
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Correlação", f"{correlation:.2f}", 
+                     delta="Forte" if abs(correlation) > 0.5 else "Moderada" if abs(correlation) > 0.3 else "Fraca")
+        
+        with col2:
+            st.metric("Registros na análise", f"{correlacao['count']:,}")
+        
+        # Tabela por faixa
+        st.subheader("Notas por Faixa de Conclusão")
+        st.dataframe(
+            df_faixas[["Faixa", "count", "mean_exam"]],
+            column_config={
+                "count": "Registros",
+                "mean_exam": st.column_config.NumberColumn("Nota Média", format="%.1f")
+            },
+            hide_index=True
+        )
+    elif correlacao is not None:
+        st.warning("Nenhum registro com nota e conclusão de tarefas para esta disciplina")
 
 # -------------------------
 # Seção 3.5: Conclusão de Tarefas (Nova!)
@@ -298,27 +373,37 @@ with st.expander("🔍 Filtros Avançados", expanded=False):
         key="hw_subject_filter"
     )
 
-# Busca dados do novo endpoint
-hw_completion_data = fetch_api_data(
-    "/performance/homework-completion",
-    params={
+# Registros e histograma ($bucket no servidor) do filtro, num só lote
+consultas_conclusao = {
+    "registros": ("/performance/homework-completion", {
         "min_percentage": min_completion,
         "subject": subject_filter if subject_filter != "Todas" else None
-    }
-)
+    }),
+}
+if min_completion < 100:
+    consultas_conclusao["histograma"] = ("/stats/histogram", {
+        "campo": "Homework_Completion_%",
+        "bins": 20,
+        "minimo": min_completion,
+        "subject": subject_filter if subject_filter != "Todas" else None
+    })
+dados_conclusao = fetch_batch(consultas_conclusao, chamadas_execucao)
+hw_completion_data = dados_conclusao.get("registros")
+hw_histograma = dados_conclusao.get("histograma")
 
-if hw_completion_data:
-    df_hw_completion = pd.DataFrame(hw_completion_data)
-    
-    # Gráfico de distribuição
-    fig_dist = px.histogram(
-        df_hw_completion,
-        x="Homework_Completion",
-        nbins=20,
+if hw_histograma:
+    df_hist = pd.DataFrame(hw_histograma)
+    fig_dist = px.bar(
+        df_hist,
+        x="min",
+        y="count",
         title=f"Distribuição de Conclusão (≥{min_completion}%)",
-        labels={"Homework_Completion": "% de Conclusão"}
+        labels={"min": "% de Conclusão", "count": "Registros"}
     )
     st.plotly_chart(fig_dist, use_container_width=True)
+
+if hw_completion_data:
+    df_hw_completion = pd.DataFrame(hw_completion_data)
     
     # Top alunos
     st.subheader("🏆 Melhores Alunos")
@@ -357,20 +442,27 @@ else:
 # -------------------------
 st.header("📚 Status das Tarefas")
 
-homework_data = fetch_api_data("/homework", {"subject": selected_subjects[0] if selected_subjects else None})
-
-if homework_data:
-    df_homework = pd.DataFrame(homework_data)
-    
-    # Gráfico de status das tarefas
+# Proporção de status sobre todas as tarefas (resumo)
+status_tarefas = pd.DataFrame(summary_data.get("homework_status", []))
+if not status_tarefas.empty:
     fig_homework_status = px.pie(
-        df_homework,
-        names="Status",
+        status_tarefas,
+        names="_id",
+        values="count",
         title="Proporção de Status das Tarefas",
         hole=0.4
     )
     st.plotly_chart(fig_homework_status, use_container_width=True)
-    
+
+# Todas as tarefas da disciplina em Arrow: as mais recentes saem da coleção inteira, não de uma página
+df_homework = fetch_dataframe(
+    "homework",
+    ["Due_Date", "Subject", "Status"],
+    {"Subject": selected_subjects[0]} if selected_subjects else None,
+    chamadas_execucao
+)
+
+if df_homework is not None and not df_homework.empty:
     # Tabela de tarefas recentes
     st.subheader("Últimas Tarefas")
     st.dataframe(
@@ -387,7 +479,7 @@ if homework_data:
 # -------------------------
 st.header("📨 Comunicação Pais-Professores")
 
-comms_data = fetch_api_data("/communications", {"last_days": 30})
+comms_data = dados_secoes.get("comms")
 
 if comms_data:
     df_comms = pd.DataFrame(comms_data)
@@ -401,14 +493,16 @@ if comms_data:
     )
     st.plotly_chart(fig_comms, use_container_width=True)
     
-    # Últimas comunicações
-    st.subheader("Registros Recentes")
-    for _, row in df_comms.head(3).iterrows():
-        with st.expander(f"{row.get('Date', 'N/D')} - {row.get('Message_Type', 'N/D')}"):
-            st.write(row.get("Message_Content", "Sem conteúdo disponível"))
+# Últimas comunicações (resumo, ordenadas por data)
+st.subheader("Registros Recentes")
+for row in summary_data.get("recent_comms", []):
+    with st.expander(f"{row.get('Date', 'N/D')} - {row.get('Message_Type', 'N/D')}"):
+        st.write(row.get("Message_Content", "Sem conteúdo disponível"))
 
 # -------------------------
 # Rodapé
 # -------------------------
 st.markdown("---")
-st.caption("Dashboard desenvolvido para análise educacional - Dados atualizados em tempo real")
\ No newline at end of file
+st.caption("Dashboard desenvolvido para análise educacional - Dados atualizados em tempo real")
+
+mostrar_latencias()
\ No newline at end of file